@@ -0,0 +1,135 @@
+import argparse
+import base64
+import hashlib
+import hmac
+import os
+import time
+from functools import lru_cache
+
+from DataAccess import unit_of_work
+
+# Stored hashes look like "scrypt$16384$8$1$<salt>$<hash>" or "pbkdf2_sha256$600000$<salt>$<hash>".
+# Anything without a known prefix is a plaintext password from before hashing existed.
+SCHEMES = ('scrypt', 'pbkdf2_sha256')
+SCHEME = os.environ.get('COSMIC_PASSWORD_SCHEME', 'scrypt')
+# Work factor: scrypt N (a power of two) or PBKDF2 iterations
+DEFAULT_COST = {'scrypt': 2 ** 14, 'pbkdf2_sha256': 600_000}
+COST = int(os.environ.get('COSMIC_PASSWORD_COST', DEFAULT_COST[SCHEME]))
+SCRYPT_R, SCRYPT_P = 8, 1
+SALT_BYTES = 16
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+
+def _derive(scheme, password, salt, cost, r=SCRYPT_R, p=SCRYPT_P):
+    if scheme == 'scrypt':
+        # scrypt needs 128 * r * N bytes; raise OpenSSL's 32 MB default to fit larger costs
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=cost, r=r, p=p,
+                              maxmem=256 * r * cost + 2 ** 20)
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, cost)
+
+
+def hash_password(password, scheme=None, cost=None):
+    scheme = scheme or SCHEME
+    cost = cost or (COST if scheme == SCHEME else DEFAULT_COST[scheme])
+    salt = os.urandom(SALT_BYTES)
+    digest = _b64(_derive(scheme, password, salt, cost))
+    if scheme == 'scrypt':
+        return f"scrypt${cost}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${digest}"
+    return f"{scheme}${cost}${_b64(salt)}${digest}"
+
+
+def _parse(stored):
+    parts = (stored or '').split('$')
+    if parts[0] == 'scrypt' and len(parts) == 6:
+        return 'scrypt', int(parts[1]), int(parts[2]), int(parts[3]), parts[4], parts[5]
+    if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+        return 'pbkdf2_sha256', int(parts[1]), None, None, parts[2], parts[3]
+    return None
+
+
+def is_hashed(stored):
+    return _parse(stored) is not None
+
+
+def verify_password(password, stored):
+    parsed = _parse(stored)
+    if parsed is None:
+        # Legacy plaintext row
+        return stored is not None and hmac.compare_digest(password.encode('utf-8'), stored.encode('utf-8'))
+    scheme, cost, r, p, salt, digest = parsed
+    derived = _derive(scheme, password, base64.b64decode(salt), cost, r or SCRYPT_R, p or SCRYPT_P)
+    return hmac.compare_digest(_b64(derived), digest)
+
+
+def needs_rehash(stored):
+    """True for plaintext rows and hashes made with another scheme or cost than the current one."""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] != SCHEME or parsed[1] != COST
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash():
+    return hash_password('')
+
+
+def authenticate(conn, username, password, role):
+    """Return the users row if the credentials match, else None. Slow on purpose: run it off the Tk thread.
+
+    A plaintext or outdated hash is replaced with a current one after a successful check.
+    """
+    user = conn.execute('SELECT * FROM users WHERE username=? AND role=?', (username, role)).fetchone()
+    if user is None:
+        # Same amount of work as a real check, so timing does not reveal which usernames exist
+        verify_password(password, _dummy_hash())
+        return None
+    stored = user[2]
+    if not verify_password(password, stored):
+        return None
+    if needs_rehash(stored):
+        # Part of the caller's transaction if there is one (a DbWorker job), committed here if not
+        with unit_of_work(conn):
+            conn.execute('UPDATE users SET password=? WHERE id=?', (hash_password(password), user[0]))
+    return user
+
+
+def benchmark(scheme, costs, rounds=5):
+    """Median latency in ms of one password check (a login) at every cost."""
+    results = []
+    for cost in costs:
+        stored = hash_password('benchmark', scheme, cost)
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            verify_password('benchmark', stored)
+            timings.append((time.perf_counter() - start) * 1000)
+        results.append((cost, sorted(timings)[len(timings) // 2]))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Login latency at each password hashing cost.")
+    parser.add_argument('--scheme', default=SCHEME, choices=SCHEMES)
+    parser.add_argument('--costs', type=int, nargs='*',
+                        help="costs to try (default: scrypt N 2^12..2^17, PBKDF2 100k..1.2M iterations)")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=250, help="latency budget for one login")
+    args = parser.parse_args(argv)
+
+    costs = args.costs or ([2 ** e for e in range(12, 18)] if args.scheme == 'scrypt'
+                           else [100_000, 200_000, 400_000, 600_000, 1_200_000])
+    print(f"{'cost':>10}  {'login ms':>9}")
+    best = None
+    for cost, ms in benchmark(args.scheme, costs, args.rounds):
+        print(f"{cost:>10}  {ms:>9.1f}{'  <- within budget' if ms <= args.budget_ms else ''}")
+        if ms <= args.budget_ms:
+            best = cost
+    if best:
+        print(f"Highest cost within {args.budget_ms:g} ms: COSMIC_PASSWORD_SCHEME={args.scheme} "
+              f"COSMIC_PASSWORD_COST={best}")
+
+
+if __name__ == "__main__":
+    main()
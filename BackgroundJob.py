@@ -0,0 +1,63 @@
+import threading
+
+
+class BackgroundJob:
+    """Long-running work (exports, reports, imports) on a daemon thread, watched from Tk.
+
+    Subclasses implement run(), which returns the job's result and may report
+    progress(done, total) and check cancelled(). The thread only sets plain
+    attributes; watch() reads them from the Tk thread with widget.after, so no
+    widget is ever touched off the Tk thread.
+    """
+    name = 'background-job'
+
+    def __init__(self):
+        self.done = 0
+        self.total = 0
+        self.result = None
+        self.error = None
+        self.finished = False
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+
+    def run(self):
+        raise NotImplementedError
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def progress(self, done, total):
+        self.done, self.total = done, total
+
+    def watch(self, widget, on_progress=None, on_finished=None, interval_ms=100):
+        """Call on_progress(job) every interval_ms and on_finished(job) once, on the Tk thread.
+
+        Stops quietly if widget is destroyed first (the dialog was closed).
+        """
+        def poll():
+            if not widget.winfo_exists():
+                return
+            if on_progress:
+                on_progress(self)
+            if not self.finished:
+                widget.after(interval_ms, poll)
+            elif on_finished:
+                on_finished(self)
+
+        poll()
+        return self
+
+    def _run(self):
+        try:
+            self.result = self.run()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished = True
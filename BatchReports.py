@@ -0,0 +1,122 @@
+import argparse
+import csv
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import DataAccess
+from BackgroundJob import BackgroundJob
+from Export import FORMATS, export_repairs
+from Timestamps import month_bounds
+
+INDEX_FILENAME = 'index.csv'
+
+_conn = None  # read-only connection of a pool worker process
+
+
+def month_range(start, end):
+    """Every (year, month) from start to end inclusive; both are (year, month) tuples."""
+    (year, month), months = start, []
+    if not (1 <= month <= 12 and 1 <= end[1] <= 12):
+        raise ValueError("month must be in 1..12")
+    while (year, month) <= tuple(end):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def report_filename(mechanic, year, month, fmt='CSV'):
+    return f"repair_report_{mechanic.replace(' ', '_')}_{year}_{month:02d}{FORMATS[fmt].extension}"
+
+
+def _open_worker(db_path):
+    global _conn
+    _conn = DataAccess.connect(db_path, read_only=True)
+
+
+def _mechanic_reports(out_dir, mechanic, months, fmt):
+    # One task per mechanic: its months are consecutive ranges of the same index
+    results = []
+    for year, month in months:
+        path = os.path.join(out_dir, report_filename(mechanic, year, month, fmt))
+        start, end = month_bounds(year, month)
+        rows = export_repairs(_conn, path, fmt, start=start, end=end, mechanic=mechanic)
+        if not rows:
+            os.remove(path)  # Няма ремонти за този месец
+        results.append((mechanic, year, month, rows, os.path.basename(path) if rows else ''))
+    return results
+
+
+def list_mechanics(conn):
+    return [row[0] for row in conn.execute("SELECT full_name FROM users WHERE role='mechanic' ORDER BY full_name")]
+
+
+def generate_reports(out_dir, months, mechanics=None, fmt='CSV', db_path=None, workers=None, progress=None):
+    """Write one report per mechanic and month into out_dir, plus an index.csv summary.
+
+    The work is spread over a process pool; every worker opens its own read-only
+    connection, so the reports never block the app's writers. progress(done, total)
+    is called from the calling thread after each mechanic. Returns the index rows.
+    """
+    db_path = db_path or DataAccess.DB_PATH
+    if mechanics is None:
+        conn = DataAccess.connect(db_path, read_only=True)
+        try:
+            mechanics = list_mechanics(conn)
+        finally:
+            conn.close()
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    # spawn: the workers must not inherit the Tk state of the GUI process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_open_worker, initargs=(db_path,)) as pool:
+        futures = [pool.submit(_mechanic_reports, out_dir, mechanic, months, fmt) for mechanic in mechanics]
+        for done, future in enumerate(as_completed(futures), 1):
+            results += future.result()
+            if progress:
+                progress(done, len(futures))
+    results.sort(key=lambda r: (r[0], r[1], r[2]))
+    with open(os.path.join(out_dir, INDEX_FILENAME), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Mechanic', 'Year', 'Month', 'Repairs', 'File'])
+        writer.writerows(results)
+    return results
+
+
+class BatchReportJob(BackgroundJob):
+    """Runs generate_reports in the background; result is the index rows."""
+    name = 'batch-reports'
+
+    def __init__(self, out_dir, months, fmt='CSV'):
+        super().__init__()
+        self.out_dir = out_dir
+        self.months = months
+        self.fmt = fmt
+
+    def run(self):
+        return generate_reports(self.out_dir, self.months, fmt=self.fmt, progress=self.progress)
+
+
+def _parse_month(text):
+    year, month = text.split('-')
+    return int(year), int(month)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a repair report for every mechanic and month.")
+    parser.add_argument('out_dir')
+    parser.add_argument('--from', dest='start', type=_parse_month, required=True, help="first month, YYYY-MM")
+    parser.add_argument('--to', dest='end', type=_parse_month, required=True, help="last month, YYYY-MM")
+    parser.add_argument('--format', default='CSV', choices=list(FORMATS))
+    parser.add_argument('--db', default=None, help="database file (default: the app's database)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    results = generate_reports(args.out_dir, month_range(args.start, args.end), fmt=args.format,
+                               db_path=args.db, workers=args.workers)
+    written = sum(1 for r in results if r[3])
+    print(f"{written} reports written to {args.out_dir} ({len(results)} mechanic-months checked)")
+
+
+if __name__ == "__main__":
+    main()
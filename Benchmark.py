@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import Fixtures
+from DataAccess import (connect, fetch_repairs_page, repair_list_key, fetch_month_calendar, search_repairs,
+                        fetch_login_logs_page, login_log_key, fetch_login_rollup)
+from Export import export_repairs
+from Migrations import MIGRATIONS
+from Replenishment import compute_reorder_plan
+from ScheduleIndex import load_schedule
+from StockLedger import supplier_valuation, stale_parts, monthly_movements
+from Timestamps import month_bounds
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+CALENDAR_MONTH = (2025, 3)
+
+
+def _deep_key(conn, fetch, key_of, pages):
+    # Key of the last row after scrolling `pages` pages down
+    after = None
+    for _ in range(pages):
+        rows = fetch(conn, after=after, limit=100)
+        if not rows:
+            break
+        after = key_of(rows[-1])
+    return after
+
+
+def gui_paths(conn, scratch_dir):
+    """(name, callable) for every data path the GUI runs, ready to time on `conn`."""
+    mechanic = Fixtures.mechanic_names(0)[0]
+    year, month = CALENDAR_MONTH
+    start, end = month_bounds(year, month)
+    deep_repair = _deep_key(conn, fetch_repairs_page, repair_list_key, 20)
+    deep_log = _deep_key(conn, fetch_login_logs_page, login_log_key, 20)
+    since = (datetime(2026, 1, 1) - timedelta(days=30)).strftime('%Y-%m-%d')
+    report = os.path.join(scratch_dir, 'report.csv')
+    fixture_end = (Fixtures.FIRST_DAY + timedelta(days=Fixtures.DAYS)).date()
+    schedule = load_schedule(conn, mechanic)
+    slot_from = datetime(year, month, 1, 9)
+    return [
+        ('repairs: first page', lambda: fetch_repairs_page(conn, limit=100)),
+        ('repairs: refresh window', lambda: fetch_repairs_page(conn, limit=300)),
+        ('repairs: page 21', lambda: fetch_repairs_page(conn, after=deep_repair, limit=100)),
+        ('repairs: mechanic page', lambda: fetch_repairs_page(conn, mechanic, limit=100)),
+        ('repairs: search', lambda: search_repairs(conn, 'transmission')),
+        ('calendar: month', lambda: fetch_month_calendar(conn, mechanic, year, month)),
+        ('schedules: load index', lambda: load_schedule(conn, mechanic)),
+        ('schedules: next free slot', lambda: schedule.next_free_slot(slot_from, 2)),
+        ('report: mechanic month', lambda: export_repairs(conn, report, 'CSV', start=start, end=end,
+                                                          mechanic=mechanic)),
+        ('login logs: first page', lambda: fetch_login_logs_page(conn, limit=100)),
+        ('login logs: page 21', lambda: fetch_login_logs_page(conn, after=deep_log, limit=100)),
+        ('login logs: rollup', lambda: fetch_login_rollup(conn, since)),
+        ('inventory: list', lambda: conn.execute(
+            'SELECT id, part_name, quantity, price, supplier, last_ordered FROM inventory').fetchall()),
+        ('inventory: reorder plan', lambda: compute_reorder_plan(conn, today=fixture_end)),
+        ('inventory: dashboard', lambda: (supplier_valuation(conn), stale_parts(conn, now=fixture_end),
+                                          monthly_movements(conn, now=fixture_end))),
+        ('mechanics: list', lambda: conn.execute(
+            'SELECT id, full_name, username, role FROM users WHERE role="mechanic"').fetchall()),
+    ]
+
+
+def time_call(fn, repeat):
+    """Median and best wall time of fn() in milliseconds."""
+    fn()  # warm the page cache and the statement cache
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2], timings[0]
+
+
+def fixture_path(fixture_dir, rows, seed):
+    # Cached per schema version, so a new migration regenerates the fixtures
+    path = os.path.join(fixture_dir, f"garage_{rows}_seed{seed}_v{MIGRATIONS[-1][0]}.db")
+    if not os.path.exists(path):
+        print(f"Generating {rows} rows into {path} ...")
+        Fixtures.generate(path, rows, seed)
+    return path
+
+
+def run(sizes, seed=0, repeat=7, fixture_dir=None):
+    fixture_dir = fixture_dir or os.path.join(tempfile.gettempdir(), 'cosmic_garage_fixtures')
+    os.makedirs(fixture_dir, exist_ok=True)
+    results = []
+    with tempfile.TemporaryDirectory() as scratch_dir:
+        for rows in sizes:
+            conn = connect(fixture_path(fixture_dir, rows, seed), read_only=True)
+            try:
+                for name, fn in gui_paths(conn, scratch_dir):
+                    median, best = time_call(fn, repeat)
+                    results.append({'path': name, 'rows': rows, 'median_ms': round(median, 3),
+                                    'best_ms': round(best, 3)})
+            finally:
+                conn.close()
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_table(results, baseline=None):
+    sizes = sorted({r['rows'] for r in results})
+    before = {(r['path'], r['rows']): r['median_ms'] for r in (baseline or [])}
+    print(f"{'median ms':<28}" + ''.join(f"{rows:>18,}" for rows in sizes))
+    for path in dict.fromkeys(r['path'] for r in results):
+        cells = []
+        for rows in sizes:
+            r = next((r for r in results if r['path'] == path and r['rows'] == rows), None)
+            cell = f"{r['median_ms']:.2f}" if r else '-'
+            if r and before.get((path, rows)):
+                cell += f" ({r['median_ms'] / before[(path, rows)]:.2f}x)"
+            cells.append(f"{cell:>18}")
+        print(f"{path:<28}" + ''.join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time every GUI data path on seeded databases of several sizes.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--fixtures', default=None, help="directory the generated databases are kept in")
+    parser.add_argument('--json', default='benchmark.json', help="where to save the results")
+    parser.add_argument('--compare', default=None, help="earlier results JSON to show ratios against")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.seed, args.repeat, args.fixtures)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_table(results, baseline)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump({'commit': _git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+                   'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                   'seed': args.seed, 'repeat': args.repeat, 'results': results}, f, indent=2)
+    print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import calendar
+import tkinter as tk
+
+DAY_NAMES = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+_WEEKS = calendar.Calendar(firstweekday=6)  # Sunday first, like DAY_NAMES
+
+
+class MonthCalendar(tk.Canvas):
+    """Month grid drawn on a single Canvas instead of a frame per day.
+
+    render() repaints only the day cells whose entries changed since the last call.
+    Clicks on the ✓ / ✎ / 🗑 marks of a schedule are hit-tested and routed to
+    on_action(action, schedule_id) with action in 'done', 'edit', 'delete'.
+    Entries are (entry_type, id, start_dt, end_dt, description, status, late) tuples.
+    Colours come from a Theme palette (its calendar_* roles); set_palette() repaints.
+    """
+
+    HEADER_HEIGHT = 30
+    GAP = 4
+    ENTRY_HEIGHT = 32
+    BUTTON_HEIGHT = 18
+
+    def __init__(self, master, on_action, palette, **kwargs):
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(master, bg=palette['bg'], **kwargs)
+        self.on_action = on_action
+        self.palette = palette
+        self._weeks = []
+        self._cells = {}  # (row, col) -> signature currently drawn
+        self._actions = {}  # canvas item id -> (action, schedule_id)
+        self._size = None
+        self.bind('<Configure>', self._on_resize)
+        self.bind('<Button-1>', self._on_click)
+
+    def render(self, year, month, entries_by_day, today=None):
+        """Show a month; entries_by_day maps day of month to its entries."""
+        weeks = _WEEKS.monthdayscalendar(year, month)
+        # A different number of weeks changes every cell's geometry
+        full = len(weeks) != len(self._weeks)
+        self._weeks = weeks
+        self._entries = entries_by_day
+        self._today = today
+        self._draw(full)
+
+    def set_palette(self, palette):
+        self.palette = palette
+        self.configure(bg=palette['bg'])
+        self._draw(full=True)
+
+    def _on_resize(self, event):
+        size = (event.width, event.height)
+        if size != self._size:
+            self._size = size
+            self._draw(full=True)
+
+    def _geometry(self):
+        width, height = self._size or (self.winfo_width(), self.winfo_height())
+        rows = max(len(self._weeks), 1)
+        cell_w = (width - self.GAP * 8) / 7
+        cell_h = (height - self.HEADER_HEIGHT - self.GAP * (rows + 2)) / rows
+        return cell_w, cell_h
+
+    def _cell_box(self, row, col, cell_w, cell_h):
+        x0 = self.GAP + col * (cell_w + self.GAP)
+        y0 = self.HEADER_HEIGHT + self.GAP * 2 + row * (cell_h + self.GAP)
+        return x0, y0, x0 + cell_w, y0 + cell_h
+
+    def _draw(self, full):
+        if not self._size or not self._weeks:
+            return
+        cell_w, cell_h = self._geometry()
+        if full:
+            self.delete('all')
+            self._cells.clear()
+            self._actions.clear()
+            self._draw_header(cell_w)
+        for row, week in enumerate(self._weeks):
+            for col, day in enumerate(week):
+                entries = tuple(self._entries.get(day, ())) if day else ()
+                signature = (day, day != 0 and day == self._today, entries)
+                if self._cells.get((row, col)) == signature:
+                    continue
+                self._draw_cell(row, col, signature, self._cell_box(row, col, cell_w, cell_h))
+                self._cells[(row, col)] = signature
+
+    def _draw_header(self, cell_w):
+        for col, name in enumerate(DAY_NAMES):
+            x0 = self.GAP + col * (cell_w + self.GAP)
+            self.create_rectangle(x0, self.GAP, x0 + cell_w, self.HEADER_HEIGHT + self.GAP,
+                                  fill=self.palette['calendar_header_bg'], outline='', tags='header')
+            self.create_text(x0 + cell_w / 2, self.GAP + self.HEADER_HEIGHT / 2, text=name,
+                             font=('Orbitron', 12, 'bold'), fill=self.palette['calendar_header_fg'], tags='header')
+
+    def _draw_cell(self, row, col, signature, box):
+        tag = f'cell{row}_{col}'
+        for item in self.find_withtag(tag):
+            self._actions.pop(item, None)
+        self.delete(tag)
+        tags = ('cell', tag)
+        day, is_today, entries = signature
+        x0, y0, x1, y1 = box
+        p = self.palette
+        ink = p['calendar_text']
+        cell_bg = p['calendar_today'] if is_today else p['calendar_cell']
+        self.create_rectangle(x0, y0, x1, y1, fill=cell_bg, width=2,
+                              outline=p['calendar_today_outline'] if is_today else p['calendar_border'], tags=tags)
+        if not day:
+            return
+        self.create_text(x1 - 4, y0 + 3, text=str(day), anchor='ne',
+                         font=('Orbitron', 11, 'bold'), fill=ink, tags=tags)
+
+        y = y0 + 22
+        for shown, entry in enumerate(entries):
+            entry_type, eid, start_dt, end_dt, desc, status, late = entry
+            needed = self.ENTRY_HEIGHT + (self.BUTTON_HEIGHT + 2 if entry_type == 'schedule' else 0)
+            if y + needed > y1 - 2:
+                self.create_text(x0 + 4, y, text=f"+{len(entries) - shown} more", anchor='nw',
+                                 font=('Orbitron', 9), fill=ink, tags=tags)
+                break
+            # Color code for status
+            if status == 'done' and late:
+                bg, fg = p['calendar_done'], ink
+            elif status == 'done':
+                bg, fg = p['calendar_done_strong'], p['calendar_done_text']
+            elif late:
+                bg, fg = p['calendar_late'], ink
+            else:
+                bg = p['calendar_task'] if entry_type == 'schedule' else p['calendar_service']
+                fg = ink
+            label_prefix = "Service:" if entry_type == 'repair' else "Task:"
+            self.create_rectangle(x0 + 2, y, x1 - 2, y + self.ENTRY_HEIGHT, fill=bg, outline=p['calendar_outline'], tags=tags)
+            self.create_text((x0 + x1) / 2, y + self.ENTRY_HEIGHT / 2,
+                             text=f"{label_prefix} {desc}\n{start_dt:%H:%M}", justify='center',
+                             width=x1 - x0 - 8, font=('Orbitron', 9), fill=fg, tags=tags)
+            y += self.ENTRY_HEIGHT + 2
+            # Only schedules get buttons, not repairs
+            if entry_type == 'schedule':
+                bx = x0 + 2
+                if status != 'done':
+                    bx = self._draw_button(bx, y, "✓", p['calendar_button'], ink, tags, ('done', eid))
+                else:
+                    bx = self._draw_button(bx, y, "Done", p['calendar_done_strong'], p['calendar_done_text'], tags, None)
+                bx = self._draw_button(bx, y, "✎", p['calendar_cell'], ink, tags, ('edit', eid))
+                self._draw_button(bx, y, "🗑", p['calendar_cell'], ink, tags, ('delete', eid))
+                y += self.BUTTON_HEIGHT + 2
+
+    def _draw_button(self, x, y, text, bg, fg, tags, action):
+        width = 14 + 8 * len(text)
+        rect = self.create_rectangle(x, y, x + width, y + self.BUTTON_HEIGHT, fill=bg,
+                                     outline=self.palette['calendar_outline'], tags=tags)
+        label = self.create_text(x + width / 2, y + self.BUTTON_HEIGHT / 2, text=text,
+                                 font=("Arial", 9, "bold"), fill=fg, tags=tags)
+        if action:
+            self._actions[rect] = self._actions[label] = action
+        return x + width + 2
+
+    def _on_click(self, event):
+        for item in reversed(self.find_overlapping(event.x, event.y, event.x, event.y)):
+            if item in self._actions:
+                action, schedule_id = self._actions[item]
+                self.on_action(action, schedule_id)
+                return
@@ -1,158 +1,67 @@
 import tkinter as tk
+from datetime import datetime, timedelta
 from tkinter import messagebox
-from PIL import Image, ImageTk
 import sqlite3
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import datetime
-
-# Brighter Terran color palette
-TERRAN_TEXT2 = 	"#FFFFFF"
-TERRAN_BG = "#22304a"
-TERRAN_ACCENT = "#4a6fa5"
-TERRAN_HIGHLIGHT = "#00cfff"
-TERRAN_TEXT = "#222"  # Use dark text for contrast
-CALENDAR_CELL_GRAY = "#e0e0e0"
-CALENDAR_CELL_TODAY = "#b0b0b0"
-CALENDAR_CELL_DONE = "#a8ffb0"
-CALENDAR_CELL_LATE = "#ffe066"
-CALENDAR_CELL_TASK = "#5ecfff"
-CALENDAR_CELL_SERVICE = "#ffd580"
-
-def add_custom_titlebar(window, title="Terran Garage Manager", exit_callback=None):
-    window.overrideredirect(True)
-    titlebar = tk.Frame(window, bg=TERRAN_ACCENT, relief="raised", bd=0, highlightthickness=0)
-    titlebar.pack(fill=tk.X, side=tk.TOP)
-    title_label = tk.Label(titlebar, text=title, bg=TERRAN_ACCENT, fg=TERRAN_TEXT, font=("Orbitron", 14, "bold"))
-    title_label.pack(side=tk.LEFT, padx=10, pady=2)
-    exit_btn = tk.Button(
-        titlebar, text="✕", bg=TERRAN_ACCENT, fg=TERRAN_TEXT, borderwidth=0, font=("Arial", 14, "bold"),
-        activebackground="#b22222", activeforeground="#fff",
-        command=exit_callback if exit_callback else window.quit
-    )
-    exit_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
-    min_btn = tk.Button(
-        titlebar, text="—", bg=TERRAN_ACCENT, fg=TERRAN_TEXT, borderwidth=0, font=("Arial", 14, "bold"),
-        activebackground=TERRAN_BG, activeforeground=TERRAN_HIGHLIGHT,
-        command=lambda: window.iconify()
-    )
-    min_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
-    def start_move(event):
-        window._drag_start_x = event.x_root
-        window._drag_start_y = event.y_root
-        window._win_x = window.winfo_x()
-        window._win_y = window.winfo_y()
-    def do_move(event):
-        dx = event.x_root - window._drag_start_x
-        dy = event.y_root - window._drag_start_y
-        new_x = window._win_x + dx
-        new_y = window._win_y + dy
-        window.geometry(f"+{new_x}+{new_y}")
-    titlebar.bind("<ButtonPress-1>", start_move)
-    titlebar.bind("<B1-Motion>", do_move)
-    spacer = tk.Frame(window, height=16, bg=TERRAN_BG)
-    spacer.pack(fill=tk.X)
+from DataAccess import (get_connection, fetch_repairs_page, repair_list_key, fetch_month_calendar,
+                        search_repairs, fetch_login_logs_page, login_log_key, fetch_login_rollup)
+from Timestamps import now_timestamp, parse_timestamp, to_canonical
+from VirtualList import VirtualTreeview
+from TreeSync import TreeSync
+from CalendarCanvas import MonthCalendar
+from ScheduleCache import MonthScheduleCache
+from DbWorker import DbWorker
+from LazyTabs import LazyTabs
+from Auth import hash_password
+from LoginLogs import archive_login_logs
+from Export import FORMATS as EXPORT_FORMATS, ExportJob, ExportCancelled
+from BatchReports import BatchReportJob, month_range
+from Importer import ImportJob, VIN_PATTERN, VIN_RULE
+from RepairParts import OutOfStock, attach_parts, detach_part, repair_parts
+from StockLedger import record_movements, supplier_valuation, stale_parts, monthly_movements, STALE_DAYS
+from Theme import Theme, add_titlebar
+from ScheduleIndex import ScheduleIndex, ScheduleConflict, check_free
+
+LOGIN_ROLLUP_DAYS = 30
 
 class CosmicApp:
     def __init__(self, root, user_role, mechanic_name=None, terran_style=True):
-        add_custom_titlebar(root, "Garage Manager", exit_callback=root.quit)
         self.root = root
         self.user_role = user_role
         self.mechanic_name = mechanic_name
-        self.terran_style = terran_style
-        self.current_theme = "dark" if self.terran_style else "light"
         self.root.title("Garage Manager")
-        self.root.state('zoomed')
-        self.style = ttk.Style(theme='cyborg')
-        self.conn = sqlite3.connect('cosmic_garage.db')
-
-        if terran_style:
-            self.root.configure(bg=TERRAN_BG)
+        try:
+            self.root.state('zoomed')
+        except tk.TclError:
+            self.root.attributes('-zoomed', True)  # X11 has no 'zoomed' state
+        self.style = ttk.Style()  # the root Window has already built 'cyborg'; don't build it again
+        self.theme = Theme(self.style, name='dark' if terran_style else 'light')
+        self.theme.register(self.root, bg='bg')
+        self.theme.apply_styles()
+        add_titlebar(root, self.theme, "Garage Manager", exit_callback=root.quit)
+        self.conn = get_connection()
 
-        self._configure_styles()
         self.cal_year = 2025  # Default to year 2025
         self.cal_month = 1
+        self.month_cache = MonthScheduleCache(fetch_month_calendar)
+        # Busy intervals per mechanic for overlap checks and free-slot search
+        self.schedule_index = ScheduleIndex()
+        # Writes and slow reads run here; self.conn only serves the quick reads that fill views
+        self.db = DbWorker(self.root, on_busy=self._set_busy, on_error=self._show_db_error)
         self.create_widgets()
         self.animate_header()
 
-    def _configure_styles(self):
-        self.style.configure('.', font=('Orbitron', 14))
-        self.style.configure('Header.TLabel', font=('Orbitron', 28, 'bold'), background=TERRAN_ACCENT, foreground=TERRAN_TEXT)
-        self.style.configure('TButton', font=('Orbitron', 14))
-        self.style.configure('Treeview.Heading', font=('Orbitron', 16, 'bold'))
-        self.style.configure('Treeview', font=('Orbitron', 14), rowheight=35)
-        self.style.configure('TEntry', font=('Orbitron', 14))
+    def _set_busy(self, busy):
+        self.root.configure(cursor='watch' if busy else '')
+        self.status_label.config(text="Working..." if busy else "")
 
-    def apply_bg_recursive(self, widget, bg):
-        try:
-            widget.configure(bg=bg)
-        except:
-            pass
-        for child in widget.winfo_children():
-            self.apply_bg_recursive(child, bg)
+    def _show_db_error(self, error):
+        messagebox.showerror("Database Error", f"An error occurred with the database: {error}")
 
     def toggle_theme(self):
-        if self.current_theme == "dark":
-            self.current_theme = "light"
-            self.terran_style = False
-            self.root.configure(bg="white")
-            self.style.theme_use('flatly')
-            self.apply_bg_recursive(self.root, "white")
-            self.theme_btn.config(text="🌙")
-        else:
-            self.current_theme = "dark"
-            self.terran_style = True
-            self.root.configure(bg=TERRAN_BG)
-            self.style.theme_use('cyborg')
-            self.apply_bg_recursive(self.root, TERRAN_BG)
-            self.theme_btn.config(text="☀️")
-
-        self._configure_styles()
-
-    def _configure_styles(self):
-        self.style.configure('.', font=('Orbitron', 14))
-        self.style.configure('TButton', font=('Orbitron', 14))
-        self.style.configure('Treeview.Heading', font=('Orbitron', 16, 'bold'))
-        self.style.configure('Treeview', font=('Orbitron', 14), rowheight=35)
-        self.style.configure('TEntry', font=('Orbitron', 14))
-
-        if self.current_theme == "dark":
-            self.style.configure('Header.TLabel',
-                                 font=('Orbitron', 28, 'bold'),
-                                 background=TERRAN_ACCENT,
-                                 foreground=TERRAN_TEXT2)
-
-            self.style.configure('TLabel',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2)
-
-            self.style.configure('TLabelframe',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2,
-                                 bordercolor=TERRAN_HIGHLIGHT)
-
-            self.style.configure('TLabelframe.Label',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2)
-
-        else:  # светла тема
-            self.style.configure('Header.TLabel',
-                                 font=('Orbitron', 28, 'bold'),
-                                 background="#f0f0f0",
-                                 foreground="#222")
-
-            self.style.configure('TLabel',
-                                 background="white",
-                                 foreground="#222")
-
-            self.style.configure('TLabelframe',
-                                 background="white",
-                                 foreground="#222",
-                                 bordercolor="gray")
-
-            self.style.configure('TLabelframe.Label',
-                                 background="white",
-                                 foreground="#222")
+        self.theme.toggle()
+        self.theme_btn.config(text="🌙" if self.theme.name == 'dark' else "☀️")
 
     def create_widgets(self):
         self.header = ttk.Label(
@@ -173,29 +82,33 @@ class CosmicApp:
                 self.root,
                 text=f"Welcome, {self.mechanic_name}!",
                 font=('Orbitron', 18, 'bold'),
-                background=TERRAN_BG,
-                foreground=TERRAN_HIGHLIGHT
+                style='Highlight.TLabel'
             ).pack(pady=(0, 10))
 
+        self.status_label = ttk.Label(self.root, text="", font=('Orbitron', 10))
+        self.status_label.pack(side=tk.BOTTOM, anchor='e', padx=20, pady=(0, 5))
+
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
 
-        self._create_customer_tab()
-        self._create_repairs_tab()
-        self._create_inventory_tab()
+        # Tabs are built when first shown; the rest warm up once the window is on screen
+        self.tabs = LazyTabs(self.notebook)
+        self.tabs.add("Customers", self._create_customer_tab)
+        self.tabs.add("Repairs", self._create_repairs_tab)
+        self.tabs.add("Inventory", self._create_inventory_tab)
 
         if self.user_role == 'admin':
-            self._create_mechanics_tab()
-            self._create_schedule_tab()
-            self._create_login_logs_tab()
+            self.tabs.add("Mechanics", self._create_mechanics_tab)
+            self.tabs.add("Schedules", self._create_schedule_tab)
+            self.tabs.add("Login Logs", self._create_login_logs_tab)
         elif self.user_role == 'mechanic':
-            self._create_my_schedule_tab()
+            self.tabs.add("My Schedule", self._create_my_schedule_tab)
 
-    # ================== CUSTOMER TAB ==================
-    def _create_customer_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Customers")
+        self.tabs.build_selected()
+        self.tabs.warm_up()
 
+    # ================== CUSTOMER TAB ==================
+    def _create_customer_tab(self, tab):
         form_frame = ttk.LabelFrame(tab, text="Add New Customer", padding=20)
         form_frame.pack(pady=20, padx=30, fill=tk.BOTH, expand=True)
 
@@ -210,19 +123,27 @@ class CosmicApp:
         for label, key in entries:
             frame = ttk.Frame(form_frame)
             frame.pack(pady=10, fill=tk.X)
-            ttk.Label(frame, text=label, width=15, background=TERRAN_BG, foreground=TERRAN_TEXT2).pack(side=tk.LEFT, padx=10)
+            ttk.Label(frame, text=label, width=15).pack(side=tk.LEFT, padx=10)
             entry = ttk.Entry(frame, width=30)
             entry.pack(side=tk.RIGHT, expand=True, fill=tk.X, padx=10)
             self.customer_entries[key] = entry
 
         ttk.Button(form_frame, text="Add Customer", command=self.add_customer).pack(pady=20)
+        ttk.Button(form_frame, text="Import from CSV...", command=self.import_customers_csv).pack()
 
     # ================== REPAIRS TAB ==================
-    def _create_repairs_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Repairs")
-
-        self.repairs_tree = ttk.Treeview(tab, columns=(
+    def _create_repairs_tab(self, tab):
+        search_frame = ttk.Frame(tab)
+        search_frame.pack(fill=tk.X, padx=20, pady=(20, 0))
+        ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+        self.repair_search = ttk.Entry(search_frame, width=50)
+        self.repair_search.pack(side=tk.LEFT, padx=10)
+        self.repair_search.bind('<KeyRelease>', self._schedule_repair_search)
+        self._repair_search_job = None
+
+        tree_frame = ttk.Frame(tab)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        self.repairs_tree = ttk.Treeview(tree_frame, columns=(
             'Vehicle', 'Status', 'Start Date', 'Issue', 'Mechanic', 'Priority', 'Hours'
         ), show='headings')
 
@@ -240,9 +161,20 @@ class CosmicApp:
             self.repairs_tree.heading(col_id, text=heading, anchor=tk.W)
             self.repairs_tree.column(col_id, width=width, minwidth=width - 50)
 
-        self.repairs_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        repairs_scroll = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        repairs_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.repairs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.repairs_tree.bind('<<TreeviewSelect>>', self.show_repair_details)
 
+        # Only a window of pages lives in the tree; more are fetched on scroll
+        mechanic = self.mechanic_name if self.user_role == 'mechanic' else None
+        self.repairs_mechanic = mechanic
+        self.repairs_view = VirtualTreeview(
+            self.repairs_tree, repairs_scroll,
+            lambda **page: fetch_repairs_page(self.conn, mechanic, **page),
+            repair_list_key
+        )
+
         btn_frame = ttk.Frame(tab)
         btn_frame.pack(pady=10)
 
@@ -259,10 +191,7 @@ class CosmicApp:
         self.update_repairs_display()
 
     # ================== SCHEDULE MANAGEMENT ==================
-    def _create_schedule_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Schedules")
-
+    def _create_schedule_tab(self, tab):
         # Mechanic selector for admin
         self.selected_mechanic = tk.StringVar()
         cursor = self.conn.cursor()
@@ -284,9 +213,8 @@ class CosmicApp:
         self.month_label.pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text=">>", command=lambda: self.change_month(1)).pack(side=tk.LEFT, padx=5)
 
-        # Calendar frame
-        self.calendar_frame = ttk.Frame(tab)
-        self.calendar_frame.pack(fill=tk.BOTH, expand=True, padx=40, pady=10)
+        # Calendar canvas
+        self.calendar_view = self._create_calendar(tab, None)
         self.update_monthly_calendar_display()
 
         # Add schedule button
@@ -295,67 +223,174 @@ class CosmicApp:
         ttk.Button(btn_frame, text="Add Schedule", command=self.open_add_schedule_dialog).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Export Monthly Report", command=self.export_mechanic_report_csv).pack(side=tk.LEFT,
                                                                                                           padx=5)
+        ttk.Button(btn_frame, text="Export All Reports", command=self.open_batch_report_dialog).pack(side=tk.LEFT,
+                                                                                                     padx=5)
 
     def export_mechanic_report_csv(self):
-        import csv
-        from datetime import datetime
-        from tkinter import filedialog
-
         mechanic = self.selected_mechanic.get() if hasattr(self, 'selected_mechanic') else None
         if not mechanic:
             messagebox.showerror("Error", "Please select a mechanic.")
             return
-
         # Вземи текущия месец и година от календара
-        year = self.cal_year
-        month = self.cal_month
+        self.open_export_dialog(mechanic, self.cal_year, self.cal_month)
 
-        # Определи началото и края на месеца
-        first_day = datetime(year, month, 1).date()
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1).date()
-        else:
-            next_month = datetime(year, month + 1, 1).date()
+    def open_export_dialog(self, mechanic=None, year=None, month=None):
+        from datetime import date, timedelta
+        from tkinter import filedialog
 
-        # Извлечи данни от repairs
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT vehicle, car_model, vin, issue, estimated_hours, estimated_cost, start_date, end_date
-            FROM repairs
-            WHERE assigned_mechanic = ?
-              AND date(start_date) >= ? AND date(start_date) < ?
-        ''', (mechanic, first_day.isoformat(), next_month.isoformat()))
-        rows = cursor.fetchall()
-
-        if not rows:
-            messagebox.showinfo("No Data", f"No repairs found for {mechanic} in {month:02d}/{year}.")
-            return
+        win = tk.Toplevel(self.root)
+        win.title("Export Repairs")
+        self.theme.register(win, bg='bg')
+
+        # Определи началото и края на месеца (включително)
+        today = date.today()
+        first = date(year or today.year, month or today.month, 1)
+        last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+        mechanics = [row[0] for row in self.conn.execute('SELECT full_name FROM users WHERE role="mechanic"')]
+
+        ttk.Label(win, text="From (YYYY-MM-DD):").grid(row=0, column=0, padx=10, pady=5, sticky='e')
+        from_entry = ttk.Entry(win)
+        from_entry.insert(0, first.isoformat())
+        from_entry.grid(row=0, column=1, padx=10, pady=5)
+        ttk.Label(win, text="To (YYYY-MM-DD):").grid(row=1, column=0, padx=10, pady=5, sticky='e')
+        to_entry = ttk.Entry(win)
+        to_entry.insert(0, last.isoformat())
+        to_entry.grid(row=1, column=1, padx=10, pady=5)
+        ttk.Label(win, text="Mechanic:").grid(row=2, column=0, padx=10, pady=5, sticky='e')
+        mechanic_combo = ttk.Combobox(win, values=['All'] + mechanics, state='readonly')
+        mechanic_combo.set(mechanic or 'All')
+        mechanic_combo.grid(row=2, column=1, padx=10, pady=5)
+        ttk.Label(win, text="Status:").grid(row=3, column=0, padx=10, pady=5, sticky='e')
+        status_combo = ttk.Combobox(win, values=['Any', 'Pending', 'Repaired'], state='readonly')
+        status_combo.set('Any')
+        status_combo.grid(row=3, column=1, padx=10, pady=5)
+        ttk.Label(win, text="Format:").grid(row=4, column=0, padx=10, pady=5, sticky='e')
+        format_combo = ttk.Combobox(win, values=list(EXPORT_FORMATS), state='readonly')
+        format_combo.set('CSV')
+        format_combo.grid(row=4, column=1, padx=10, pady=5)
+
+        progress = ttk.Progressbar(win, mode='determinate', length=300)
+        progress.grid(row=5, column=0, columnspan=2, padx=10, pady=5)
+        progress_label = ttk.Label(win, text="")
+        progress_label.grid(row=6, column=0, columnspan=2)
+        job = None
+
+        def show_progress(job):
+            if job.total:
+                progress.configure(maximum=job.total, value=job.done)
+                progress_label.config(text=f"{job.done} / {job.total} rows")
+
+        def finished(job):
+            export_button.config(state='normal')
+            if isinstance(job.error, ExportCancelled):
+                progress_label.config(text="Export cancelled.")
+            elif job.error:
+                messagebox.showerror("Error", f"Failed to save report:\n{job.error}", parent=win)
+            elif not job.result:
+                messagebox.showinfo("No Data", "No repairs match the selected filters.", parent=win)
+            else:
+                messagebox.showinfo("Success", f"{job.result} repairs saved to:\n{job.path}", parent=win)
+                win.destroy()
 
-        # Покажи "Save As" диалог
-        default_filename = f"repair_report_{mechanic.replace(' ', '_')}_{year}_{month:02d}.csv"
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
-            initialfile=default_filename,
-            title="Save Repair Report"
-        )
+        def start():
+            nonlocal job
+            try:
+                start_day = date.fromisoformat(from_entry.get().strip())
+                end_day = date.fromisoformat(to_entry.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format.", parent=win)
+                return
+            writer = EXPORT_FORMATS[format_combo.get()]
+            who = mechanic_combo.get()
+            default_name = f"repair_report_{who.replace(' ', '_')}_{start_day:%Y%m%d}_{end_day:%Y%m%d}"
+            # Покажи "Save As" диалог
+            filepath = filedialog.asksaveasfilename(
+                parent=win,
+                defaultextension=writer.extension,
+                filetypes=[(f"{format_combo.get()} files", f"*{writer.extension}")],
+                initialfile=default_name + writer.extension,
+                title="Save Repair Report"
+            )
+            if not filepath:
+                return  # Потребителят е натиснал Cancel
+            job = ExportJob(filepath, format_combo.get(),
+                            # A bare date sorts before every timestamp of that day
+                            start=start_day.isoformat(),
+                            end=(end_day + timedelta(days=1)).isoformat(),
+                            mechanic=None if who == 'All' else who,
+                            status=None if status_combo.get() == 'Any' else status_combo.get()).start()
+            export_button.config(state='disabled')
+            progress.configure(value=0)
+            progress_label.config(text="Exporting...")
+            job.watch(win, show_progress, finished)
+
+        def cancel():
+            if job and not job.finished:
+                job.cancel()
+            else:
+                win.destroy()
 
-        if not filepath:
-            return  # Потребителят е натиснал Cancel
+        btns = ttk.Frame(win)
+        btns.grid(row=7, column=0, columnspan=2, pady=10)
+        export_button = ttk.Button(btns, text="Export", command=start)
+        export_button.pack(side=tk.LEFT, padx=5)
+        ttk.Button(btns, text="Cancel", command=cancel).pack(side=tk.LEFT, padx=5)
 
-        # Запиши в CSV
-        try:
-            with open(filepath, "w", newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(
-                    ["Vehicle", "Car Model", "VIN", "Issue", "Estimated Hours", "Estimated Cost", "Start Date",
-                     "End Date"])
-                for row in rows:
-                    writer.writerow(row)
-
-            messagebox.showinfo("Success", f"Report saved to:\n{filepath}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save report:\n{e}")
+    def open_batch_report_dialog(self):
+        from tkinter import filedialog
+
+        win = tk.Toplevel(self.root)
+        win.title("Export All Reports")
+        self.theme.register(win, bg='bg')
+
+        ttk.Label(win, text="From (YYYY-MM):").grid(row=0, column=0, padx=10, pady=5, sticky='e')
+        from_entry = ttk.Entry(win)
+        from_entry.insert(0, f"{self.cal_year}-01")
+        from_entry.grid(row=0, column=1, padx=10, pady=5)
+        ttk.Label(win, text="To (YYYY-MM):").grid(row=1, column=0, padx=10, pady=5, sticky='e')
+        to_entry = ttk.Entry(win)
+        to_entry.insert(0, f"{self.cal_year}-12")
+        to_entry.grid(row=1, column=1, padx=10, pady=5)
+        ttk.Label(win, text="Format:").grid(row=2, column=0, padx=10, pady=5, sticky='e')
+        format_combo = ttk.Combobox(win, values=list(EXPORT_FORMATS), state='readonly')
+        format_combo.set('CSV')
+        format_combo.grid(row=2, column=1, padx=10, pady=5)
+        progress = ttk.Progressbar(win, mode='determinate', length=300)
+        progress.grid(row=3, column=0, columnspan=2, padx=10, pady=5)
+        progress_label = ttk.Label(win, text="")
+        progress_label.grid(row=4, column=0, columnspan=2)
+
+        def show_progress(job):
+            if job.total:
+                progress.configure(maximum=job.total, value=job.done)
+                progress_label.config(text=f"{job.done} / {job.total} mechanics")
+
+        def finished(job):
+            start_button.config(state='normal')
+            if job.error:
+                messagebox.showerror("Error", f"Failed to write reports:\n{job.error}", parent=win)
+            else:
+                written = sum(1 for r in job.result if r[3])
+                messagebox.showinfo("Success", f"{written} reports and index.csv saved to:\n{job.out_dir}", parent=win)
+                win.destroy()
+
+        def start():
+            try:
+                months = month_range(*(tuple(int(p) for p in e.get().strip().split('-')) for e in (from_entry, to_entry)))
+            except ValueError:
+                months = []
+            if not months:
+                messagebox.showerror("Error", "Enter a valid month range as YYYY-MM.", parent=win)
+                return
+            out_dir = filedialog.askdirectory(parent=win, title="Choose Report Folder")
+            if not out_dir:
+                return
+            start_button.config(state='disabled')
+            progress_label.config(text="Exporting...")
+            BatchReportJob(out_dir, months, format_combo.get()).start().watch(win, show_progress, finished)
+
+        start_button = ttk.Button(win, text="Export", command=start)
+        start_button.grid(row=5, column=0, columnspan=2, pady=10)
 
     def open_add_schedule_dialog(self):
         self.add_schedule(mechanic=self.selected_mechanic.get())
@@ -363,23 +398,25 @@ class CosmicApp:
     def add_schedule(self, mechanic, tab=None):
         win = tk.Toplevel(self.root)
         win.title("Add Schedule")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
 
-        tk.Label(win, text="Task:").grid(row=0, column=0, padx=10, pady=5, sticky='e')
-        task_entry = tk.Entry(win)
+        ttk.Label(win, text="Task:").grid(row=0, column=0, padx=10, pady=5, sticky='e')
+        task_entry = ttk.Entry(win)
         task_entry.grid(row=0, column=1, padx=10, pady=5)
 
-        tk.Label(win, text="Start (YYYY-MM-DD HH:MM):").grid(row=1, column=0, padx=10, pady=5, sticky='e')
-        start_entry = tk.Entry(win)
+        ttk.Label(win, text="Start (YYYY-MM-DD HH:MM):").grid(row=1, column=0, padx=10, pady=5, sticky='e')
+        start_entry = ttk.Entry(win)
         start_entry.grid(row=1, column=1, padx=10, pady=5)
 
-        tk.Label(win, text="End (YYYY-MM-DD HH:MM):").grid(row=2, column=0, padx=10, pady=5, sticky='e')
-        end_entry = tk.Entry(win)
+        ttk.Label(win, text="End (YYYY-MM-DD HH:MM):").grid(row=2, column=0, padx=10, pady=5, sticky='e')
+        end_entry = ttk.Entry(win)
         end_entry.grid(row=2, column=1, padx=10, pady=5)
 
+        ttk.Label(win, text="Hours:").grid(row=3, column=0, padx=10, pady=5, sticky='e')
+        hours_entry = ttk.Entry(win)
+        hours_entry.grid(row=3, column=1, padx=10, pady=5)
+        self._add_slot_finder(win, 4, mechanic, start_entry, end_entry, hours_entry)
+
         def save():
             task = task_entry.get().strip()
             start = start_entry.get().strip()
@@ -387,28 +424,101 @@ class CosmicApp:
             if not (task and start and end):
                 tk.messagebox.showerror("Error", "All fields are required.")
                 return
-            try:
-                cursor = self.conn.cursor()
-                cursor.execute(
+            start, end = to_canonical(start), to_canonical(end)
+            if not (start and end):
+                tk.messagebox.showerror("Error", "Dates must be in YYYY-MM-DD HH:MM format.")
+                return
+            if not self._check_slot(mechanic, start, end):
+                return
+
+            def insert(conn):
+                # Checked again against the committed schedule: another window may have booked it since
+                check_free(conn, mechanic, start, end)
+                conn.execute(
                     '''INSERT INTO schedules (mechanic, start_time, end_time, task, status)
                        VALUES (?, ?, ?, ?, ?)''',
                     (mechanic, start, end, task, 'pending')
                 )
-                self.conn.commit()
-                if tab:
-                    self.update_monthly_calendar_display(tab=tab)
-                else:
-                    self.update_monthly_calendar_display()
+
+            def added(_):
+                self._schedule_written(tab, (mechanic, start))
                 win.destroy()
-            except Exception as e:
-                tk.messagebox.showerror("Error", f"Failed to add schedule: {e}")
 
-        tk.Button(win, text="Save", command=save).grid(row=3, columnspan=2, pady=10)
+            self.db.submit(insert, on_done=added,
+                           on_error=lambda e: tk.messagebox.showerror("Error", f"Failed to add schedule: {e}"))
+
+        ttk.Button(win, text="Save", command=save).grid(row=5, columnspan=2, pady=10)
+
+    def _check_slot(self, mechanic, start, end, ignore=None):
+        """Tell the user and return False if [start, end) overlaps the mechanic's schedule."""
+        start_dt, end_dt = parse_timestamp(start), parse_timestamp(end)
+        if end_dt <= start_dt:
+            tk.messagebox.showerror("Error", "End must be after start.")
+            return False
+        clash = self.schedule_index.get(self.conn, mechanic, ignore).conflict(start_dt, end_dt)
+        if clash:
+            tk.messagebox.showerror("Schedule Conflict", str(ScheduleConflict(*clash)))
+            return False
+        return True
+
+    def _add_slot_finder(self, win, row, mechanic, start_entry, end_entry, hours_entry=None, ignore=None):
+        """Live overlap check and next free slot under a start/end form, updated on every key."""
+        hint = ttk.Label(win, text="", style='Highlight.TLabel')
+        hint.grid(row=row, column=0, padx=10, pady=5, sticky='e')
+        found = {}
+
+        def use():
+            if found:
+                for entry, value in ((start_entry, found['start']), (end_entry, found['end'])):
+                    entry.delete(0, tk.END)
+                    entry.insert(0, f"{value:%Y-%m-%d %H:%M}")
+                refresh()
+
+        use_button = ttk.Button(win, text="Use", command=use, state='disabled')
+        use_button.grid(row=row, column=1, padx=10, pady=5, sticky='w')
+
+        def refresh(event=None):
+            found.clear()
+            use_button.config(state='disabled')
+            if not mechanic:
+                hint.config(text="")
+                return
+            start = parse_timestamp(start_entry.get().strip())
+            end = parse_timestamp(end_entry.get().strip())
+            try:
+                hours = float(hours_entry.get()) if hours_entry and hours_entry.get().strip() else None
+            except ValueError:
+                hours = None
+            if hours is None:
+                hours = (end - start).total_seconds() / 3600 if start and end and end > start else 1.0
+            if hours <= 0:
+                hint.config(text="")
+                return
+            # The index is built once per mechanic; every key press is a few binary searches
+            schedule = self.schedule_index.get(self.conn, mechanic, ignore)
+            if start and end and end > start:
+                clash = schedule.conflict(start, end)
+                if clash is None:
+                    hint.config(text="Free")
+                    return
+                busy = f"Overlaps {clash[0]} #{clash[1]}. "
+            else:
+                busy = ""
+            after = max(start or datetime.now(), datetime.now()).replace(second=0, microsecond=0)
+            slot = schedule.next_free_slot(after, hours)
+            if slot is None:
+                hint.config(text=busy + "No free slot of that length")
+                return
+            found.update(start=slot, end=slot + timedelta(hours=hours))
+            use_button.config(state='normal')
+            hint.config(text=busy + f"Next free: {slot:%Y-%m-%d %H:%M}")
 
-    def _create_my_schedule_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="My Schedule")
+        for entry in (start_entry, end_entry, hours_entry):
+            if entry is not None:
+                entry.bind('<KeyRelease>', refresh, add='+')
+        refresh()
 
+    def _create_my_schedule_tab(self, tab):
         nav_frame = ttk.Frame(tab)
         nav_frame.pack(anchor='center', pady=(10,5))
         ttk.Button(nav_frame, text="<<", command=lambda: self.change_month(-1, tab)).pack(side=tk.LEFT, padx=5)
@@ -416,8 +526,7 @@ class CosmicApp:
         self.my_month_label.pack(side=tk.LEFT, padx=5)
         ttk.Button(nav_frame, text=">>", command=lambda: self.change_month(1, tab)).pack(side=tk.LEFT, padx=5)
 
-        self.my_calendar_frame = ttk.Frame(tab)
-        self.my_calendar_frame.pack(fill=tk.BOTH, expand=True, padx=40, pady=10)
+        self.my_calendar_view = self._create_calendar(tab, tab)
         self.update_monthly_calendar_display(tab=tab)
 
         btn_frame = ttk.Frame(tab)
@@ -444,160 +553,162 @@ class CosmicApp:
                 self.cal_year += 1
             self.update_monthly_calendar_display()
 
+    def _create_calendar(self, tab, my_tab):
+        calendar_view = MonthCalendar(
+            tab,
+            on_action=lambda action, sid: self._on_calendar_action(action, sid, my_tab),
+            palette=self.theme.palette
+        )
+        self.theme.on_change(calendar_view.set_palette)
+        calendar_view.pack(fill=tk.BOTH, expand=True, padx=40, pady=10)
+        return calendar_view
+
+    def _on_calendar_action(self, action, schedule_id, tab=None):
+        if action == 'done':
+            self.mark_schedule_done(schedule_id, tab)
+        elif action == 'edit':
+            self.edit_schedule(schedule_id, tab)
+        elif action == 'delete':
+            self.delete_schedule_by_id(schedule_id, tab)
+
     def update_monthly_calendar_display(self, tab=None):
         import calendar
         from datetime import datetime
         year, month = self.cal_year, self.cal_month
-        month_days = calendar.monthcalendar(year, month)
-        days = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
 
-        if tab and hasattr(self, 'my_calendar_frame'):
-            cal_frame = self.my_calendar_frame
-            for widget in cal_frame.winfo_children():
-                widget.destroy()
+        if tab and hasattr(self, 'my_calendar_view'):
+            calendar_view = self.my_calendar_view
             self.my_month_label.config(text=f"{calendar.month_name[month]} {year}")
             mechanic = self.mechanic_name
         else:
-            cal_frame = self.calendar_frame
-            for widget in cal_frame.winfo_children():
-                widget.destroy()
+            calendar_view = self.calendar_view
             self.month_label.config(text=f"{calendar.month_name[month]} {year}")
             mechanic = self.selected_mechanic.get() if hasattr(self,
                                                                'selected_mechanic') and self.selected_mechanic.get() else None
-            if not mechanic:
-                return
 
-        # Draw day headers
-        for col, day in enumerate(days):
-            tk.Label(cal_frame, text=day, anchor='center', width=18, font=('Orbitron', 12, 'bold'),
-                     bg=TERRAN_ACCENT, fg=TERRAN_HIGHLIGHT, bd=0).grid(row=0, column=col, padx=2, pady=2)
+        now = datetime.now()
+        today = now.day if now.year == year and now.month == month else None
+        if not mechanic:
+            calendar_view.render(year, month, {}, today)
+            return
 
-        cursor = self.conn.cursor()
-        start_date = f"{year}-{month:02d}-01"
-        end_date = f"{year}-{month:02d}-31"
-        # Fetch schedules
-        cursor.execute('''SELECT id, mechanic, start_time, end_time, task, status FROM schedules
-                           WHERE mechanic=? AND date(start_time) BETWEEN ? AND ?''', (mechanic, start_date, end_date))
-        schedules = cursor.fetchall()
-        # Fetch ALL repairs (services) for this mechanic and month, regardless of status
-        cursor.execute('''SELECT id, assigned_mechanic, start_date, end_date, issue, status FROM repairs
-                          WHERE assigned_mechanic=? AND date(start_date) BETWEEN ? AND ?''',
-                       (mechanic, start_date, end_date))
-        repairs = cursor.fetchall()
+        # Served from the month cache; the neighbouring months are warmed in the background
+        schedules, repairs = self.month_cache.get(self.conn, mechanic, year, month)
+        self.month_cache.prefetch_adjacent(mechanic, year, month)
 
         sched_map = {}
-        now = datetime.now()
-        # Add schedules
-        for sid, mech, st, et, task, status in schedules:
-            try:
-                day = datetime.strptime(st, "%Y-%m-%d %H:%M").day
-            except Exception:
-                continue
-            sched_map.setdefault(day, []).append(('schedule', sid, st, et, task, status))
-        # Add repairs (services)
-        for rid, mech, st, et, issue, status in repairs:
-            try:
-                # Try several formats for start_date
-                if 'T' in st:
-                    day = datetime.strptime(st, "%Y-%m-%dT%H:%M:%S.%f").day
-                elif len(st) > 10:
-                    day = datetime.strptime(st, "%Y-%m-%d %H:%M:%S").day
-                else:
-                    day = datetime.strptime(st, "%Y-%m-%d").day
-            except Exception:
+        # Add schedules, then repairs (services); each timestamp is parsed once
+        entries = [('schedule',) + row for row in schedules] + [('repair',) + row for row in repairs]
+        for entry_type, eid, mech, st, et, desc, status in entries:
+            start_dt = parse_timestamp(st)
+            if start_dt is None:
                 continue
-            sched_map.setdefault(day, []).append(('repair', rid, st, et, issue, status))
+            end_dt = parse_timestamp(et)
+            late = entry_type == 'schedule' and end_dt is not None and end_dt < now
+            sched_map.setdefault(start_dt.day, []).append(
+                (entry_type, eid, start_dt, end_dt, desc, status, late))
+
+        # Only the day cells whose entries changed are repainted
+        calendar_view.render(year, month, sched_map, today)
+
+    @staticmethod
+    def _schedule_month(conn, schedule_id):
+        return conn.execute('SELECT mechanic, start_time FROM schedules WHERE id=?', (schedule_id,)).fetchone()
+
+    def _schedule_written(self, tab, *months):
+        # months: (mechanic, start_time) rows touched by the write, None if unknown
+        for row in months:
+            if row:
+                self.month_cache.invalidate_at(*row)
+                self.schedule_index.invalidate(row[0])
+        # Several schedule writes in one commit group cost one calendar redraw
+        self.db.after_commit(('calendar', tab), lambda: self.update_monthly_calendar_display(tab=tab))
+
+    def _invalidate_repair_month(self, repair_id):
+        # The Repairs view already holds the row: (vehicle, status, start date, issue, mechanic, ...)
+        shown = self.repairs_view.sync.values(repair_id)
+        if shown:
+            self.month_cache.invalidate_at(shown[4], shown[2])
 
-        today = now.day if now.year == year and now.month == month else None
-        for row, week in enumerate(month_days, start=1):
-            for col, day in enumerate(week):
-                cell_bg = CALENDAR_CELL_GRAY
-                bordercolor = TERRAN_ACCENT
-                if day == today:
-                    cell_bg = CALENDAR_CELL_TODAY
-                    bordercolor = "#fff"
-                cell = tk.Frame(cal_frame, bg=cell_bg, highlightbackground=bordercolor, highlightthickness=2, bd=0)
-                cell.grid(row=row, column=col, padx=2, pady=2, sticky='nsew')
-                cell.grid_propagate(False)
-                cell.config(width=140, height=90)
-                if day != 0:
-                    day_lbl = tk.Label(cell, text=str(day), anchor='ne', font=('Orbitron', 11, 'bold'),
-                                       bg=cell_bg, fg="#222")
-                    day_lbl.pack(anchor='ne', padx=2, pady=2)
-                    if day in sched_map:
-                        for entry in sched_map[day]:
-                            entry_type, eid, st, et, desc, status = entry
-                            late = False
-                            try:
-                                if et:
-                                    end_dt = datetime.strptime(et, "%Y-%m-%d %H:%M")
-                                    if end_dt < now:
-                                        late = True
-                            except Exception:
-                                pass
-                            # Color code for status
-                            if status == 'done' and late:
-                                bg = CALENDAR_CELL_DONE
-                                fg = '#222'
-                            elif status == 'done':
-                                bg = "#4CAF50"
-                                fg = '#fff'
-                            elif late:
-                                bg = CALENDAR_CELL_LATE
-                                fg = '#222'
-                            else:
-                                bg = CALENDAR_CELL_TASK if entry_type == 'schedule' else CALENDAR_CELL_SERVICE
-                                fg = '#222'
-                            label_prefix = "Service:" if entry_type == 'repair' else "Task:"
-                            sched_lbl = tk.Label(cell, text=f"{label_prefix} {desc}\n{st[-5:] if len(st) >= 5 else st}",
-                                                 font=('Orbitron', 9),
-                                                 bg=bg, fg=fg, bd=1, relief="ridge", wraplength=120, justify="center")
-                            sched_lbl.pack(fill=tk.X, padx=1, pady=1)
-                            # Only show buttons for schedules, not repairs
-                            if entry_type == 'schedule':
-                                btns = tk.Frame(cell, bg=cell_bg)
-                                btns.pack(anchor='w', pady=1)
-                                if status != 'done':
-                                    tk.Button(btns, text="✓", width=2, font=("Arial", 10, "bold"),
-                                              bg="#b0b0b0", fg="#222",
-                                              command=lambda s=eid, t=tab: self.mark_schedule_done(s, t)).pack(
-                                        side=tk.LEFT, padx=1)
-                                else:
-                                    tk.Button(btns, text="Done", width=4, state='disabled', bg="#4CAF50",
-                                              fg="#fff").pack(side=tk.LEFT, padx=1)
-                                tk.Button(btns, text="✎", width=2, bg="#e0e0e0", fg="#222",
-                                          command=lambda s=eid, t=tab: self.edit_schedule(s, t)).pack(side=tk.LEFT,
-                                                                                                      padx=1)
-                                tk.Button(btns, text="🗑", width=2, bg="#e0e0e0", fg="#222",
-                                          command=lambda s=eid, t=tab: self.delete_schedule_by_id(s, t)).pack(
-                                    side=tk.LEFT, padx=1)
-                else:
-                    tk.Label(cell, text="", width=12, bg=cell_bg).pack()
+    def mark_schedule_done(self, schedule_id, tab=None):
+        def done(conn):
+            conn.execute('UPDATE schedules SET status=? WHERE id=?', ('done', schedule_id))
+            return self._schedule_month(conn, schedule_id)
 
-        for i in range(7):
-            cal_frame.grid_columnconfigure(i, weight=1)
-        for i in range(len(month_days) + 1):
-            cal_frame.grid_rowconfigure(i, weight=1)
+        self.db.submit(done, on_done=lambda row: self._schedule_written(tab, row))
 
-    def mark_schedule_done(self, schedule_id, tab=None):
+    def edit_schedule(self, schedule_id, tab=None):
         cursor = self.conn.cursor()
-        cursor.execute('UPDATE schedules SET status=? WHERE id=?', ('done', schedule_id))
-        self.conn.commit()
-        if tab:
-            self.update_monthly_calendar_display(tab=tab)
-        else:
-            self.update_monthly_calendar_display()
+        cursor.execute('SELECT mechanic, task, start_time, end_time, status FROM schedules WHERE id=?',
+                       (schedule_id,))
+        row = cursor.fetchone()
+        if not row:
+            return
+        mechanic, task, start, end, status = row
+        win = tk.Toplevel(self.root)
+        win.title("Edit Schedule")
+        self.theme.register(win, bg='bg')
 
-    # ================== MECHANICS MANAGEMENT ==================
-    def _create_mechanics_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Mechanics")
+        fields = [('Task:', task), ('Start (YYYY-MM-DD HH:MM):', start[:16]), ('End (YYYY-MM-DD HH:MM):', end[:16])]
+        entries = []
+        for i, (lbl, value) in enumerate(fields):
+            ttk.Label(win, text=lbl).grid(row=i, column=0, padx=10, pady=5, sticky='e')
+            e = ttk.Entry(win)
+            e.insert(0, value or '')
+            e.grid(row=i, column=1, padx=10, pady=5)
+            entries.append(e)
+        ttk.Label(win, text="Status:").grid(row=3, column=0, padx=10, pady=5, sticky='e')
+        status_combo = ttk.Combobox(win, values=['pending', 'done'], state='readonly')
+        status_combo.set(status)
+        status_combo.grid(row=3, column=1, padx=10, pady=5)
+        self._add_slot_finder(win, 4, mechanic, entries[1], entries[2], ignore=('schedule', schedule_id))
+
+        def save():
+            new_task = entries[0].get().strip()
+            new_start, new_end = to_canonical(entries[1].get().strip()), to_canonical(entries[2].get().strip())
+            if not new_task:
+                tk.messagebox.showerror("Error", "All fields are required.")
+                return
+            if not (new_start and new_end):
+                tk.messagebox.showerror("Error", "Dates must be in YYYY-MM-DD HH:MM format.")
+                return
+            new_status = status_combo.get()
+            if not self._check_slot(mechanic, new_start, new_end, ignore=('schedule', schedule_id)):
+                return
+
+            def update(conn):
+                check_free(conn, mechanic, new_start, new_end, ignore=('schedule', schedule_id))
+                conn.execute('UPDATE schedules SET task=?, start_time=?, end_time=?, status=? WHERE id=?',
+                             (new_task, new_start, new_end, new_status, schedule_id))
+
+            def updated(_):
+                # The entry may have moved to another month
+                self._schedule_written(tab, (mechanic, start), (mechanic, new_start))
+                win.destroy()
+
+            self.db.submit(update, on_done=updated,
+                           on_error=lambda e: tk.messagebox.showerror("Error", f"Failed to update schedule: {e}"))
+
+        ttk.Button(win, text="Save", command=save).grid(row=5, columnspan=2, pady=10)
 
+    def delete_schedule_by_id(self, schedule_id, tab=None):
+        if not messagebox.askyesno("Delete Schedule", "Delete this schedule entry?"):
+            return
+        def delete(conn):
+            row = self._schedule_month(conn, schedule_id)
+            conn.execute('DELETE FROM schedules WHERE id=?', (schedule_id,))
+            return row
+
+        self.db.submit(delete, on_done=lambda row: self._schedule_written(tab, row))
+
+    # ================== MECHANICS MANAGEMENT ==================
+    def _create_mechanics_tab(self, tab):
         self.mechanics_tree = ttk.Treeview(tab, columns=('Full Name', 'Username', 'Role'), show='headings')
         self.mechanics_tree.heading('Full Name', text='Full Name')
         self.mechanics_tree.heading('Username', text='Username')
         self.mechanics_tree.heading('Role', text='Role')
         self.mechanics_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        self.mechanics_sync = TreeSync(self.mechanics_tree)
 
         btn_frame = ttk.Frame(tab)
         btn_frame.pack(pady=10)
@@ -607,10 +718,7 @@ class CosmicApp:
         self.update_mechanics_display()
 
     # ================== INVENTORY TAB ==================
-    def _create_inventory_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Inventory")
-
+    def _create_inventory_tab(self, tab):
         self.inventory_tree = ttk.Treeview(
             tab,
             columns=('Part Name', 'Quantity', 'Price', 'Supplier', 'Last Ordered'),
@@ -622,27 +730,65 @@ class CosmicApp:
         self.inventory_tree.heading('Supplier', text='Supplier')
         self.inventory_tree.heading('Last Ordered', text='Last Ordered')
         self.inventory_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        self.inventory_sync = TreeSync(self.inventory_tree)
 
         btn_frame = ttk.Frame(tab)
         btn_frame.pack(pady=10)
         ttk.Button(btn_frame, text="Order Parts", command=self.order_parts).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Add Part", command=self.add_part_dialog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Reorder...", command=self.open_reorder_dialog).pack(side=tk.LEFT, padx=5)
+        self._create_stock_dashboard(tab)
         self.update_inventory_display()
 
+    def _create_stock_dashboard(self, tab):
+        dashboard = ttk.LabelFrame(tab, text="Stock Overview", padding=10)
+        dashboard.pack(fill=tk.X, padx=20, pady=(0, 20))
+        self.supplier_stock_tree = ttk.Treeview(dashboard, columns=('Supplier', 'Parts', 'Units', 'Value'),
+                                                show='headings', height=5)
+        self.stale_parts_tree = ttk.Treeview(dashboard, columns=('Part', 'Supplier', 'Quantity', 'Value', 'Last Used'),
+                                             show='headings', height=5)
+        for tree in (self.supplier_stock_tree, self.stale_parts_tree):
+            for column in tree['columns']:
+                tree.heading(column, text=column)
+        ttk.Label(dashboard, text="Stock value per supplier").grid(row=0, column=0, sticky='w')
+        ttk.Label(dashboard, text=f"Not used in {STALE_DAYS} days").grid(row=0, column=1, sticky='w', padx=(20, 0))
+        self.supplier_stock_tree.grid(row=1, column=0, sticky='nsew')
+        self.stale_parts_tree.grid(row=1, column=1, sticky='nsew', padx=(20, 0))
+        self.movements_label = ttk.Label(dashboard, text="")
+        self.movements_label.grid(row=2, column=0, columnspan=2, sticky='w', pady=(5, 0))
+        dashboard.columnconfigure(0, weight=1)
+        dashboard.columnconfigure(1, weight=2)
+        self.supplier_stock_sync = TreeSync(self.supplier_stock_tree)
+        self.stale_parts_sync = TreeSync(self.stale_parts_tree)
+
+    def _update_stock_dashboard(self):
+        # Every query reads summary rows kept up to date by triggers, never the ledger itself
+        if not hasattr(self, 'supplier_stock_sync'):
+            return
+        valuation = supplier_valuation(self.conn)
+        self.supplier_stock_sync.sync([(supplier or '-', supplier or '-', parts, units, f"{value or 0:.2f}")
+                                       for supplier, parts, units, value in valuation])
+        self.stale_parts_sync.sync([(pid, name, supplier or '-', qty, f"{value or 0:.2f}", (last_used or 'Never')[:10])
+                                    for pid, name, supplier, qty, value, last_used in stale_parts(self.conn)])
+        this_month = monthly_movements(self.conn, months=1)
+        taken_in = sum(value or 0 for _, _, _, units, value in this_month if units > 0)
+        taken_out = -sum(value or 0 for _, _, _, units, value in this_month if units < 0)
+        total = sum(value or 0 for *_, value in valuation)
+        self.movements_label.config(text=f"Stock worth {total:.2f}; this month {taken_in:.2f} in, {taken_out:.2f} out")
+
     def update_inventory_display(self):
-        self.inventory_tree.delete(*self.inventory_tree.get_children())
+        if not hasattr(self, 'inventory_sync'):
+            return  # Inventory tab not built yet
         cur = self.conn.cursor()
-        for part, qty, price, supplier, lo in cur.execute(
-                'SELECT part_name, quantity, price, supplier, last_ordered FROM inventory'):
-            self.inventory_tree.insert('', 'end', values=(part, qty, price, supplier, lo or 'Never'))
+        cur.execute('SELECT id, part_name, quantity, price, supplier, last_ordered FROM inventory')
+        self.inventory_sync.sync([(pid, part, qty, price, supplier, lo or 'Never')
+                                  for pid, part, qty, price, supplier, lo in cur.fetchall()])
+        self._update_stock_dashboard()
 
     def add_part_dialog(self):
         win = tk.Toplevel(self.root)
         win.title("Add New Part")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
 
         ttk.Label(win, text="Part Name:").grid(row=0, column=0, padx=10, pady=5, sticky='e')
         name_entry = ttk.Entry(win)
@@ -672,18 +818,27 @@ class CosmicApp:
             if not name or not supplier:
                 messagebox.showerror("Error", "All fields are required.")
                 return
-            try:
-                cursor = self.conn.cursor()
-                cursor.execute(
+            def insert(conn):
+                cursor = conn.execute(
                     '''INSERT INTO inventory (part_name, quantity, price, supplier, last_ordered)
                        VALUES (?, ?, ?, ?, ?)''',
                     (name, qty, price, supplier, None)
                 )
-                self.conn.commit()
-                self.update_inventory_display()
+                record_movements(conn, [(cursor.lastrowid, 'added', qty, None)])
+                return cursor.lastrowid
+
+            def added(part_id):
+                self.inventory_sync.upsert((part_id, name, qty, price, supplier, 'Never'))
+                self.db.after_commit('stock dashboard', self._update_stock_dashboard)
                 win.destroy()
-            except sqlite3.IntegrityError:
-                messagebox.showerror("Error", "Part already exists.")
+
+            def failed(error):
+                if isinstance(error, sqlite3.IntegrityError):
+                    messagebox.showerror("Error", "Part already exists.")
+                else:
+                    self._show_db_error(error)
+
+            self.db.submit(insert, on_done=added, on_error=failed)
 
         ttk.Button(win, text="Add", command=add_part).grid(row=4, columnspan=2, pady=10)
 
@@ -695,16 +850,20 @@ class CosmicApp:
         self.root.after(1000, self.animate_header)
 
     def add_customer(self):
-        data = {k: v.get() for k, v in self.customer_entries.items()}
+        data = {k: v.get().strip() for k, v in self.customer_entries.items()}
         if all(data.values()):
-            try:
-                cursor = self.conn.cursor()
+            if not VIN_PATTERN.fullmatch(data['vin']):
+                messagebox.showerror("Error", VIN_RULE)
+                return
+
+            def insert(conn):
+                cursor = conn.cursor()
                 cursor.execute('''INSERT INTO customers 
                                 (name, car_model, vin, issue, date_added)
                                 VALUES (?, ?, ?, ?, ?)''',
                                (data['customer_name'], data['car_model'],
                                 data['vin'], data['issue'],
-                                datetime.datetime.now().isoformat()))
+                                now_timestamp()))
 
                 cursor.execute('''INSERT INTO repairs 
                                 (vehicle, customer_name, car_model, vin, issue, status, start_date)
@@ -712,41 +871,101 @@ class CosmicApp:
                                (f"{data['car_model']} ({data['vin']})",
                                 data['customer_name'], data['car_model'],
                                 data['vin'], data['issue'], 'Pending',
-                                datetime.datetime.now().isoformat()))
+                                now_timestamp()))
 
-                self.conn.commit()
-                self.update_repairs_display()
+            def added(_):
+                self.db.after_commit('repairs', self.update_repairs_display)
                 messagebox.showinfo("Success", "Customer added successfully!")
-            except sqlite3.IntegrityError:
-                messagebox.showerror("Error", "VIN already exists in system")
+
+            def failed(error):
+                if isinstance(error, sqlite3.IntegrityError):
+                    messagebox.showerror("Error", "VIN already exists in system")
+                else:
+                    self._show_db_error(error)
+
+            self.db.submit(insert, on_done=added, on_error=failed)
         else:
             messagebox.showwarning("Error", "All fields are required")
 
+    def import_customers_csv(self):
+        from tkinter import filedialog
+
+        path = filedialog.askopenfilename(title="Import Customers", filetypes=[("CSV files", "*.csv")])
+        if not path:
+            return
+        win = tk.Toplevel(self.root)
+        win.title("Importing Customers")
+        self.theme.register(win, bg='bg')
+        progress = ttk.Progressbar(win, mode='determinate', length=300, maximum=100)
+        progress.pack(padx=20, pady=(20, 5))
+        progress_label = ttk.Label(win, text="Importing...")
+        progress_label.pack(padx=20, pady=(0, 20))
+
+        def show_progress(job):
+            if not win.winfo_exists():
+                return
+            if job.total:
+                progress.configure(value=100 * job.done / job.total)
+            progress_label.config(text=f"{job.result.imported} imported, {job.result.rejected} rejected")
+
+        def finished(job):
+            if win.winfo_exists():
+                win.destroy()
+            result = job.result
+            # Imported repairs can land on any mechanic's month; batches before a failure are kept
+            self.month_cache.clear()
+            self.schedule_index.invalidate()
+            if hasattr(self, 'calendar_view'):
+                self.update_monthly_calendar_display()
+            self.update_repairs_display()
+            if job.error:
+                messagebox.showerror("Import Failed", str(job.error))
+                return
+            message = f"Imported {result.imported} customers."
+            if result.rejected:
+                message += f"\n{result.rejected} rows were rejected, see:\n{job.reject_path}"
+            messagebox.showinfo("Import Finished", message)
+
+        # Watched on the main window: the caches must be dropped even if this one is closed
+        ImportJob(path).start().watch(self.root, show_progress, finished)
+
     def update_repairs_display(self):
-        self.repairs_tree.delete(*self.repairs_tree.get_children())
-        cursor = self.conn.cursor()
-        query = '''SELECT vehicle, status, start_date, issue, 
-                   assigned_mechanic, priority, estimated_hours FROM repairs'''
-        if self.user_role == 'mechanic':
-            query += f" WHERE assigned_mechanic='{self.mechanic_name}'"
-        cursor.execute(query)
-        for row in cursor.fetchall():
-            self.repairs_tree.insert('', 'end', values=row)
+        # Item ids are the repairs primary key, so every action below is a rowid lookup
+        if not hasattr(self, 'repairs_view'):
+            return  # Repairs tab not built yet; it loads fresh data when it is
+        if self.repair_search.get().strip():
+            self._run_repair_search()
+        else:
+            self.repairs_view.refresh()
+
+    def _schedule_repair_search(self, event=None):
+        # Търси чак когато потребителят спре да пише
+        if self._repair_search_job:
+            self.root.after_cancel(self._repair_search_job)
+        self._repair_search_job = self.root.after(250, self._run_repair_search)
+
+    def _run_repair_search(self):
+        self._repair_search_job = None
+        text = self.repair_search.get().strip()
+        if not text:
+            self.repairs_view.reload()
+            return
+        # Issue column shows the best matching snippet, the hit wrapped in «»
+        self.repairs_view.show_rows(search_repairs(self.conn, text, self.repairs_mechanic))
+
+    def _selected_repair_id(self):
+        sel = self.repairs_tree.selection()
+        return int(sel[0]) if sel else None
 
     def update_mechanics_display(self):
-        self.mechanics_tree.delete(*self.mechanics_tree.get_children())
         cursor = self.conn.cursor()
-        cursor.execute('SELECT full_name, username, role FROM users WHERE role="mechanic"')
-        for row in cursor.fetchall():
-            self.mechanics_tree.insert('', 'end', values=(row[0], row[1], row[2]))
+        cursor.execute('SELECT id, full_name, username, role FROM users WHERE role="mechanic"')
+        self.mechanics_sync.sync(cursor.fetchall())
 
     def add_mechanic(self):
         win = tk.Toplevel(self.root)
         win.title("Add Mechanic")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
 
         ttk.Label(win, text="Full Name:").grid(row=0, column=0, padx=5, pady=5)
         full_name = ttk.Entry(win)
@@ -761,43 +980,43 @@ class CosmicApp:
         password.grid(row=2, column=1, padx=5, pady=5)
 
         def save():
-            cursor = self.conn.cursor()
-            cursor.execute('''INSERT INTO users 
-                            (full_name, username, password, role)
-                            VALUES (?, ?, ?, 'mechanic')''',
-                           (full_name.get(), username.get(), password.get()))
-            self.conn.commit()
-            self.update_mechanics_display()
-            win.destroy()
+            values = (full_name.get(), username.get(), password.get())
+
+            def insert(conn):
+                # Hashing is slow on purpose, so it runs on the worker too
+                cursor = conn.execute('''INSERT INTO users 
+                                (full_name, username, password, role)
+                                VALUES (?, ?, ?, 'mechanic')''', (values[0], values[1], hash_password(values[2])))
+                return cursor.lastrowid
+
+            def added(user_id):
+                self.mechanics_sync.upsert((user_id, values[0], values[1], 'mechanic'))
+                win.destroy()
+
+            self.db.submit(insert, on_done=added)
 
         ttk.Button(win, text="Save", command=save).grid(row=3, columnspan=2, pady=10)
 
     def remove_mechanic(self):
         selected = self.mechanics_tree.selection()
         if selected:
-            item = self.mechanics_tree.item(selected[0])
-            username = item['values'][1]  # Username is the second column
-            cursor = self.conn.cursor()
-            cursor.execute('DELETE FROM users WHERE username=?', (username,))
-            self.conn.commit()
-            self.update_mechanics_display()
+            user_id = int(selected[0])  # Item ids are users.id
+            self.db.submit(lambda conn: conn.execute('DELETE FROM users WHERE id=?', (user_id,)),
+                           on_done=lambda _: self.mechanics_sync.remove(user_id))
 
     def show_repair_details(self, event=None):
-        sel = self.repairs_tree.selection()
-        if not sel: return
-        vehicle = self.repairs_tree.item(sel[0])['values'][0]
+        repair_id = self._selected_repair_id()
+        if repair_id is None: return
         cur = self.conn.cursor()
-        cur.execute('SELECT * FROM repairs WHERE vehicle=?', (vehicle,))
+        cur.execute('SELECT * FROM repairs WHERE id=?', (repair_id,))
         r = cur.fetchone()
         win = tk.Toplevel(self.root)
         win.title("Repair Details")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
         # Corrected indices based on your schema:
         # 0: id, 1: vehicle, 2: customer_name, 3: car_model, 4: vin, 5: issue, 6: status,
-        # 7: start_date, 8: assigned_mechanic, 9: priority, 10: estimated_hours, 11: estimated_cost, 12: end_date
+        # 7: start_date, 8: assigned_mechanic, 9: priority, 10: estimated_hours, 11: estimated_cost, 12: end_date,
+        # 13: parts_cost
         fields = [
             ("Customer:", r[2]),
             ("Vehicle:", r[1]),
@@ -808,6 +1027,7 @@ class CosmicApp:
             ("Priority:", r[9]),
             ("Estimated Hours:", r[10]),
             ("Estimated Cost:", r[11]),
+            ("Parts Cost:", r[13]),
             ("Start Date:", r[7]),
             ("End Date:", r[12] or "Ongoing"),
             ("Status:", r[6])
@@ -817,18 +1037,14 @@ class CosmicApp:
             ttk.Label(win, text=val).grid(row=i, column=1, sticky='w', padx=5, pady=2)
 
     def edit_repair(self):
-        sel = self.repairs_tree.selection()
-        if not sel: return
-        vehicle = self.repairs_tree.item(sel[0])['values'][0]
+        repair_id = self._selected_repair_id()
+        if repair_id is None: return
         cur = self.conn.cursor()
-        cur.execute('SELECT * FROM repairs WHERE vehicle=?', (vehicle,))
+        cur.execute('SELECT * FROM repairs WHERE id=?', (repair_id,))
         rd = cur.fetchone()
         win = tk.Toplevel(self.root)
         win.title("Edit Repair Details")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
         # Corrected indices based on your schema:
         # 8: assigned_mechanic, 9: priority, 10: estimated_hours
         fields = [
@@ -857,93 +1073,178 @@ class CosmicApp:
             except ValueError:
                 messagebox.showerror("Error", "Estimated Hours must be a number.")
                 return
-            cur.execute('''UPDATE repairs SET
-                            assigned_mechanic=?, priority=?, estimated_hours=?
-                            WHERE vehicle=?''', (
-                entries['assigned_mechanic'].get(),
-                entries['priority'].get(),
-                hours_val,
-                vehicle
-            ))
-            self.conn.commit()
-            self.update_repairs_display()
-            win.destroy()
+            mechanic = entries['assigned_mechanic'].get()
+            priority = entries['priority'].get()
+
+            def update(conn):
+                conn.execute('''UPDATE repairs SET
+                                assigned_mechanic=?, priority=?, estimated_hours=?
+                                WHERE id=?''', (mechanic, priority, hours_val, repair_id))
+
+            def updated(_):
+                # Both the old and the new mechanic's month show this repair
+                self.month_cache.invalidate_at(rd[8], rd[7])
+                self.month_cache.invalidate_at(mechanic, rd[7])
+                self.schedule_index.invalidate(rd[8])
+                self.schedule_index.invalidate(mechanic)
+                self.repairs_view.patch(repair_id, {
+                    'Mechanic': mechanic,
+                    'Priority': priority,
+                    'Hours': hours_val
+                })
+                win.destroy()
 
-        ttk.Button(win, text="Save Changes", command=save).grid(row=len(fields), columnspan=2, pady=10)
+            self.db.submit(update, on_done=updated)
 
-        def save():
-            # Validate hours as a float
+        ttk.Button(win, text="Save Changes", command=save).grid(row=len(fields), columnspan=2, pady=10)
+        self._create_parts_picker(win, repair_id, rd[11], rd[13]).grid(
+            row=len(fields) + 1, columnspan=2, padx=10, pady=10, sticky='ew')
+
+    def _create_parts_picker(self, win, repair_id, estimated_cost, parts_cost):
+        """Parts used on the repair; new lines are staged and taken from stock together."""
+        frame = ttk.LabelFrame(win, text="Parts", padding=10)
+        tree = ttk.Treeview(frame, columns=('Part', 'Qty', 'Unit Price'), show='headings', height=6)
+        for column in ('Part', 'Qty', 'Unit Price'):
+            tree.heading(column, text=column)
+        tree.tag_configure('staged', foreground=self.theme['highlight'])
+        tree.grid(row=0, column=0, columnspan=4, sticky='ew')
+        cost_label = ttk.Label(frame)
+        cost_label.grid(row=1, column=0, columnspan=4, sticky='w', pady=5)
+
+        parts = {name: (pid, price) for pid, name, price in
+                 self.conn.execute('SELECT id, part_name, price FROM inventory ORDER BY part_name')}
+        part_combo = ttk.Combobox(frame, values=list(parts), width=24)
+        part_combo.grid(row=2, column=0, padx=(0, 5))
+        qty_entry = ttk.Entry(frame, width=5)
+        qty_entry.insert(0, '1')
+        qty_entry.grid(row=2, column=1, padx=5)
+        staged = {}  # part id -> quantity not yet taken from stock
+
+        def show(used, costs):
+            tree.delete(*tree.get_children())
+            for pid, name, qty, price in used:
+                tree.insert('', 'end', iid=str(pid), values=(name, qty, f"{price:.2f}"))
+            names = {pid: name for name, (pid, _) in parts.items()}
+            for pid, qty in staged.items():
+                tree.insert('', 'end', iid=f'new{pid}', values=(names[pid], qty, 'to take'), tags=('staged',))
+            parts_total, estimate = costs
+            cost_label.config(text=f"Parts: {parts_total or 0:.2f}   Estimated cost: {estimate or 0:.2f}")
+
+        def refresh(costs):
+            show(repair_parts(self.conn, repair_id), costs)
+            self.update_inventory_display()
+
+        def stage():
+            if part_combo.get() not in parts:
+                messagebox.showerror("Error", "Please select a part.", parent=win)
+                return
             try:
-                hours_val = float(entries['hours'].get())
+                qty = int(qty_entry.get())
+                if qty <= 0:
+                    raise ValueError
             except ValueError:
-                messagebox.showerror("Error", "Estimated Hours must be a number.")
+                messagebox.showerror("Error", "Invalid quantity.", parent=win)
                 return
-            cur.execute('''UPDATE repairs SET
-                           assigned_mechanic=?, priority=?, estimated_hours=?
-                           WHERE vehicle=?''', (
-                entries['assigned_mechanic'].get(),
-                entries['priority'].get(),
-                hours_val,
-                vehicle
-            ))
-            self.conn.commit()
-            self.update_repairs_display()
-            win.destroy()
+            pid = parts[part_combo.get()][0]
+            staged[pid] = staged.get(pid, 0) + qty
+            show(repair_parts(self.conn, repair_id), current_costs())
+
+        def current_costs():
+            return self.conn.execute('SELECT parts_cost, estimated_cost FROM repairs WHERE id=?',
+                                     (repair_id,)).fetchone()
+
+        def remove():
+            for iid in tree.selection():
+                if iid.startswith('new'):
+                    staged.pop(int(iid[3:]), None)
+                    tree.delete(iid)
+                else:
+                    self.db.submit(lambda conn, pid=int(iid): detach_part(conn, repair_id, pid), on_done=refresh)
 
-        ttk.Button(win, text="Save Changes", command=save).grid(row=len(fields), columnspan=2, pady=10)
+        def take():
+            if not staged:
+                return
+            lines = list(staged.items())
+
+            def taken(costs):
+                staged.clear()
+                refresh(costs)
+
+            def failed(error):
+                if isinstance(error, OutOfStock):
+                    messagebox.showerror("Not Enough Stock", "\n".join(
+                        f"{name}: {available} in stock, {wanted} wanted" for name, available, wanted in error.shortages),
+                        parent=win)
+                else:
+                    self._show_db_error(error)
+
+            self.db.submit(lambda conn: attach_parts(conn, repair_id, lines), on_done=taken, on_error=failed)
+
+        ttk.Button(frame, text="Add", command=stage).grid(row=2, column=2, padx=5)
+        ttk.Button(frame, text="Remove", command=remove).grid(row=2, column=3, padx=5)
+        ttk.Button(frame, text="Use Parts", command=take).grid(row=3, column=0, columnspan=4, pady=(10, 0))
+        show(repair_parts(self.conn, repair_id), (parts_cost, estimated_cost))
+        return frame
 
     def add_repair_notes(self):
-        sel = self.repairs_tree.selection()
-        if not sel: return
-        vehicle = self.repairs_tree.item(sel[0])['values'][0]
+        repair_id = self._selected_repair_id()
+        if repair_id is None: return
         cur = self.conn.cursor()
-        cur.execute('SELECT issue FROM repairs WHERE vehicle=?', (vehicle,))
+        cur.execute('SELECT issue FROM repairs WHERE id=?', (repair_id,))
         text = cur.fetchone()[0]
         win = tk.Toplevel(self.root);
         win.title("Repair Notes")
-        if self.terran_style:
-            win.configure(bg=TERRAN_BG)
-        else:
-            win.configure(bg="white")
+        self.theme.register(win, bg='bg')
         ttk.Label(win, text="Detailed Repair Notes:").pack(pady=10)
-        ta = tk.Text(win, width=60, height=15, font=('Orbitron', 14));
+        ta = self.theme.register(tk.Text(win, width=60, height=15, font=('Orbitron', 14)),
+                                 bg='bg', fg='text', insertbackground='text');
         ta.insert('1.0', text);
         ta.pack(padx=20, pady=10)
 
         def save():
-            cur.execute('UPDATE repairs SET issue=? WHERE vehicle=?', (ta.get('1.0', tk.END).strip(), vehicle))
-            self.conn.commit();
-            self.update_repairs_display();
-            win.destroy()
+            notes = ta.get('1.0', tk.END).strip()
+
+            def saved(_):
+                self._invalidate_repair_month(repair_id)
+                self.repairs_view.patch(repair_id, {'Issue': notes})
+                win.destroy()
+
+            self.db.submit(lambda conn: conn.execute('UPDATE repairs SET issue=? WHERE id=?', (notes, repair_id)),
+                           on_done=saved)
 
         ttk.Button(win, text="Save Notes", command=save).pack(pady=10)
 
     def mark_repaired(self):
-        sel = self.repairs_tree.selection()
-        if sel:
-            veh = self.repairs_tree.item(sel[0])['values'][0]
-            cur = self.conn.cursor()
-            cur.execute('UPDATE repairs SET status=?, end_date=? WHERE vehicle=?',
-                        ('Repaired', datetime.datetime.now().isoformat(), veh))
-            self.conn.commit()
-            self.update_repairs_display()
+        repair_id = self._selected_repair_id()
+        if repair_id is not None:
+            self._set_repair_status(repair_id, 'Repaired', now_timestamp())
+
+    def _set_repair_status(self, repair_id, status, end_date=None):
+        def update(conn):
+            if end_date:
+                conn.execute('UPDATE repairs SET status=?, end_date=? WHERE id=?', (status, end_date, repair_id))
+            else:
+                conn.execute('UPDATE repairs SET status=? WHERE id=?', (status, repair_id))
+
+        def updated(_):
+            self._invalidate_repair_month(repair_id)
+            self.repairs_view.patch(repair_id, {'Status': status})
+
+        self.db.submit(update, on_done=updated)
 
     def mark_pending(self):
-        sel = self.repairs_tree.selection()
-        if sel:
-            veh = self.repairs_tree.item(sel[0])['values'][0]
-            cur = self.conn.cursor()
-            cur.execute('UPDATE repairs SET status=? WHERE vehicle=?', ('Pending', veh))
-            self.conn.commit()
-            self.update_repairs_display()
+        repair_id = self._selected_repair_id()
+        if repair_id is not None:
+            self._set_repair_status(repair_id, 'Pending')
 
     def order_parts(self):
         order_window = tk.Toplevel(self.root)
         order_window.title("Order Parts")
+        self.theme.register(order_window, bg='bg')
 
         ttk.Label(order_window, text="Select Part:").grid(row=0, column=0, padx=10, pady=5)
-        parts = [row[0] for row in self.conn.cursor().execute('SELECT part_name FROM inventory')]
-        part_combo = ttk.Combobox(order_window, values=parts, state='readonly')
+        part_ids = {name: pid for pid, name in self.conn.cursor().execute('SELECT id, part_name FROM inventory')}
+        part_combo = ttk.Combobox(order_window, values=list(part_ids), state='readonly')
         part_combo.grid(row=0, column=1, padx=10, pady=5)
 
         ttk.Label(order_window, text="Quantity to Order:").grid(row=1, column=0, padx=10, pady=5)
@@ -953,17 +1254,30 @@ class CosmicApp:
         def confirm_order():
             try:
                 part = part_combo.get()
+                if part not in part_ids:
+                    messagebox.showerror("Error", "Please select a part.")
+                    return
                 qty = int(qty_entry.get())
                 if qty <= 0:
                     raise ValueError
 
-                cursor = self.conn.cursor()
-                cursor.execute('''UPDATE inventory SET quantity = quantity + ?, last_ordered = ? WHERE part_name = ?''',
-                               (qty, datetime.datetime.now().isoformat(), part))
-                self.conn.commit()
-                self.update_inventory_display()
-                messagebox.showinfo("Order Confirmation", f"Ordered {qty} units of {part}.")
-                order_window.destroy()
+                part_id = part_ids[part]
+                ordered_at = now_timestamp()
+
+                def order(conn):
+                    conn.execute('''UPDATE inventory SET quantity = quantity + ?, last_ordered = ? WHERE id = ?''',
+                                 (qty, ordered_at, part_id))
+                    record_movements(conn, [(part_id, 'ordered', qty, None)], ordered_at)
+
+                def ordered(_):
+                    shown = self.inventory_sync.values(part_id)
+                    if shown:
+                        self.inventory_sync.patch(part_id, {'Quantity': shown[1] + qty, 'Last Ordered': ordered_at})
+                    self.db.after_commit('stock dashboard', self._update_stock_dashboard)
+                    messagebox.showinfo("Order Confirmation", f"Ordered {qty} units of {part}.")
+                    order_window.destroy()
+
+                self.db.submit(order, on_done=ordered)
 
             except ValueError:
                 messagebox.showerror("Error", "Invalid quantity.")
@@ -972,31 +1286,92 @@ class CosmicApp:
 
         ttk.Button(order_window, text="Confirm Order", command=confirm_order).grid(row=2, columnspan=2, pady=10)
 
-    def _create_login_logs_tab(self):
-        tab = ttk.Frame(self.notebook)
-        self.notebook.add(tab, text="Login Logs")
+    def open_reorder_dialog(self):
+        # numpy is only loaded once someone asks for a reorder plan
+        from Replenishment import compute_reorder_plan, place_orders
 
+        win = tk.Toplevel(self.root)
+        win.title("Reorder Parts")
+        self.theme.register(win, bg='bg')
+        columns = ('Part', 'Supplier', 'Stock', 'Reorder At', 'Order')
+        tree = ttk.Treeview(win, columns=columns, show='headings', height=15)
+        for column in columns:
+            tree.heading(column, text=column)
+        tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=(20, 5))
+        summary = ttk.Label(win, text="Working out reorder points...")
+        summary.pack(padx=20, pady=5)
+        place_button = ttk.Button(win, text="Place Orders", state='disabled')
+        place_button.pack(pady=10)
+        plans = []
+
+        def planned(plan):
+            if not win.winfo_exists():
+                return
+            plans.append(plan)
+            rows = plan.rows()
+            for pid, name, supplier, qty, reorder_point, suggested in rows:
+                tree.insert('', 'end', iid=str(pid), values=(name, supplier or '-', qty, reorder_point, suggested))
+            suppliers = plan.by_supplier()
+            summary.config(text=f"{len(rows)} of {len(plan.ids)} parts need ordering, "
+                                f"{len(suppliers)} purchase orders")
+            if suppliers:
+                place_button.config(state='normal')
+
+        def place():
+            place_button.config(state='disabled')
+            orders = plans[-1].by_supplier()
+
+            def placed(order_ids):
+                self.db.after_commit('inventory', self.update_inventory_display)
+                messagebox.showinfo("Orders Placed", "\n".join(f"PO #{order_id}: {supplier}"
+                                                               for supplier, order_id in order_ids.items()))
+                win.destroy()
+
+            self.db.submit(lambda conn: place_orders(conn, orders), on_done=placed)
+
+        place_button.config(command=place)
+        self.db.submit(compute_reorder_plan, on_done=planned)
+
+    def _create_login_logs_tab(self, tab):
+        logs_frame = ttk.Frame(tab)
+        logs_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(20, 10))
         self.logs_tree = ttk.Treeview(
-            tab,
+            logs_frame,
             columns=("Username", "Role", "Login Time"),
             show='headings'
         )
         self.logs_tree.heading("Username", text="Username")
         self.logs_tree.heading("Role", text="Role")
         self.logs_tree.heading("Login Time", text="Login Time")
+        logs_scroll = ttk.Scrollbar(logs_frame, orient=tk.VERTICAL)
+        logs_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.logs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Paged through idx_login_logs_time like the Repairs list
+        self.logs_view = VirtualTreeview(
+            self.logs_tree, logs_scroll,
+            lambda **page: fetch_login_logs_page(self.conn, **page),
+            login_log_key
+        )
 
-        self.logs_tree.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        ttk.Label(tab, text=f"Logins per day (last {LOGIN_ROLLUP_DAYS} days)").pack(anchor='w', padx=20)
+        self.login_rollup_tree = ttk.Treeview(
+            tab,
+            columns=("Day", "Username", "Role", "Logins"),
+            show='headings',
+            height=8
+        )
+        for col in ("Day", "Username", "Role", "Logins"):
+            self.login_rollup_tree.heading(col, text=col)
+        self.login_rollup_tree.pack(fill=tk.X, padx=20, pady=(5, 20))
+        self.login_rollup_sync = TreeSync(self.login_rollup_tree)
 
         self.update_login_logs()
+        # Преместваме старите записи в архива, без да спираме интерфейса
+        self.db.submit(archive_login_logs, on_done=lambda moved: moved and self.db.after_commit('logs', self.update_login_logs))
 
     def update_login_logs(self):
-        for row in self.logs_tree.get_children():
-            self.logs_tree.delete(row)
-
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT username, role, login_time FROM login_logs ORDER BY login_time DESC')
-        for username, role, login_time in cursor.fetchall():
-            self.logs_tree.insert('', 'end', values=(username, role, login_time))
-
-    def __del__(self):
-        self.conn.close()
+        self.logs_view.refresh()
+        since = (datetime.now() - timedelta(days=LOGIN_ROLLUP_DAYS)).strftime('%Y-%m-%d')
+        # Keyed by day|user|role, the summary table's primary key
+        self.login_rollup_sync.sync([('|'.join(row[:3]),) + tuple(row)
+                                     for row in fetch_login_rollup(self.conn, since)])
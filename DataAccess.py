@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import threading
+
+from Timestamps import month_bounds
+from UnitOfWork import UnitOfWork
+
+# Path of the garage database; override with the COSMIC_GARAGE_DB environment variable
+DB_PATH = os.environ.get('COSMIC_GARAGE_DB', 'cosmic_garage.db')
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool = []
+_generation = 0
+
+# Hot queries shared by the GUI and the query-plan tests (tests/test_query_plans.py).
+# Timestamps are canonical (see Timestamps.py), so month filters are plain ranges on the raw column.
+MONTH_SCHEDULES_SQL = '''SELECT id, mechanic, start_time, end_time, task, status FROM schedules
+                         WHERE mechanic=? AND start_time >= ? AND start_time < ?'''
+MONTH_REPAIRS_SQL = '''SELECT id, assigned_mechanic, start_date, end_date, issue, status FROM repairs
+                       WHERE assigned_mechanic=? AND start_date >= ? AND start_date < ?'''
+
+
+class GarageConnection(sqlite3.Connection):
+    """sqlite3 connection that carries the UnitOfWork shared by everything writing through it."""
+    unit = None
+
+
+def unit_of_work(conn):
+    if conn.unit is None:
+        conn.unit = UnitOfWork(conn)
+    return conn.unit
+
+
+def configure(db_path):
+    """Point the data-access layer at another database file and drop pooled connections."""
+    global DB_PATH
+    close_all()
+    DB_PATH = db_path
+
+
+def connect(db_path=None, read_only=False):
+    """Open a new connection tuned for the garage workload (WAL, busy timeout, statement cache)."""
+    path = db_path or DB_PATH
+    if read_only:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True,
+                               timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=STATEMENT_CACHE_SIZE,
+                               factory=GarageConnection)
+    else:
+        conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, cached_statements=STATEMENT_CACHE_SIZE,
+                               factory=GarageConnection)
+        # WAL lets readers keep going while the front desk writes
+        conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA busy_timeout={BUSY_TIMEOUT_MS}')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
+
+def get_connection():
+    """Return the pooled connection of the calling thread, opening it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or getattr(_local, 'generation', None) != _generation:
+        conn = connect()
+        with _pool_lock:
+            _pool.append(conn)
+            _local.conn, _local.generation = conn, _generation
+    return conn
+
+
+def close_all():
+    """Close every pooled connection (called on shutdown or when the path changes)."""
+    global _generation
+    with _pool_lock:
+        _generation += 1
+        while _pool:
+            conn = _pool.pop()
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+REPAIR_LIST_COLUMNS = 'id, vehicle, status, start_date, issue, assigned_mechanic, priority, estimated_hours'
+
+
+def repair_list_key(row):
+    """Pagination key (start_date, id) of a row returned by fetch_repairs_page."""
+    return row[3], row[0]
+
+
+def _page_segments(column, after, before):
+    # Newest first on (column, id); rows where the column is NULL come after every other one.
+    # Each segment is (condition, params, order) and is read until the page is full.
+    if before is not None:
+        value, row_id = before
+        if value is None:
+            return [(f'{column} IS NULL AND id > ?', [row_id], 'id'),
+                    (f'{column} IS NOT NULL', [], f'{column}, id')]
+        return [(f'({column}, id) > (?, ?)', [value, row_id], f'{column}, id')]
+    if after is None:
+        return [(f'{column} IS NOT NULL', [], f'{column} DESC, id DESC'),
+                (f'{column} IS NULL', [], 'id DESC')]
+    value, row_id = after
+    if value is None:
+        return [(f'{column} IS NULL AND id < ?', [row_id], 'id DESC')]
+    return [(f'({column}, id) < (?, ?)', [value, row_id], f'{column} DESC, id DESC'),
+            (f'{column} IS NULL', [], 'id DESC')]
+
+
+def _fetch_page(conn, sql, column, after, before, limit, filters=()):
+    # filters: (condition, params) pairs AND-ed in front of the keyset condition
+    rows = []
+    for condition, params, order in _page_segments(column, after, before):
+        if len(rows) >= limit:
+            break
+        where = ' AND '.join([f for f, _ in filters] + [condition])
+        params = [p for _, fp in filters for p in fp] + params
+        rows += conn.execute(f'{sql} WHERE {where} ORDER BY {order} LIMIT ?',
+                             params + [limit - len(rows)]).fetchall()
+    if before is not None:
+        rows.reverse()
+    return rows
+
+
+def fetch_repairs_page(conn, mechanic=None, after=None, before=None, limit=100):
+    """Return up to `limit` Repairs-list rows in display order.
+
+    `after`/`before` are keys of the last/first row already on screen; with neither,
+    the first page is returned. Only index range scans are used, whatever the page.
+    """
+    filters = [('assigned_mechanic = ?', [mechanic])] if mechanic is not None else []
+    return _fetch_page(conn, f'SELECT {REPAIR_LIST_COLUMNS} FROM repairs', 'start_date',
+                       after, before, limit, filters)
+
+
+LOGIN_LOG_COLUMNS = 'id, username, role, login_time'
+
+
+def login_log_key(row):
+    """Pagination key (login_time, id) of a row returned by fetch_login_logs_page."""
+    return row[3], row[0]
+
+
+def fetch_login_logs_page(conn, after=None, before=None, limit=100):
+    """Newest-first page of login_logs, walked through idx_login_logs_time."""
+    return _fetch_page(conn, f'SELECT {LOGIN_LOG_COLUMNS} FROM login_logs', 'login_time', after, before, limit)
+
+
+def fetch_login_rollup(conn, since, limit=500):
+    """Per-day, per-user login counts from the login_daily summary, newest day first."""
+    return conn.execute('''SELECT day, username, role, logins FROM login_daily
+                           WHERE day >= ? ORDER BY day DESC, username LIMIT ?''', (since, limit)).fetchall()
+
+
+def fts_query(text):
+    """Turn free text typed by a user into a safe FTS5 query: every word must match,
+    the last one as a prefix so results show up while typing."""
+    words = [w.replace('"', '""') for w in text.split()]
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_repairs(conn, text, mechanic=None, limit=200):
+    """Best-ranked repairs matching `text`, shaped like Repairs-list rows with a
+    highlighted snippet in place of the issue."""
+    query = fts_query(text)
+    if query is None:
+        return []
+    where, params = 'repairs_fts MATCH ?', [query]
+    if mechanic is not None:
+        where += ' AND r.assigned_mechanic = ?'
+        params.append(mechanic)
+    return conn.execute(f'''
+        SELECT r.id, r.vehicle, r.status, r.start_date,
+               snippet(repairs_fts, -1, '«', '»', '…', 12),
+               r.assigned_mechanic, r.priority, r.estimated_hours
+        FROM repairs_fts JOIN repairs r ON r.id = repairs_fts.rowid
+        WHERE {where}
+        ORDER BY rank LIMIT ?''', params + [limit]).fetchall()
+
+
+def fetch_month_calendar(conn, mechanic, year, month):
+    """Schedules and repairs (services) of one mechanic's month, as shown on the calendar."""
+    start, end = month_bounds(year, month)
+    schedules = conn.execute(MONTH_SCHEDULES_SQL, (mechanic, start, end)).fetchall()
+    # ALL repairs for this mechanic and month, regardless of status
+    repairs = conn.execute(MONTH_REPAIRS_SQL, (mechanic, start, end)).fetchall()
+    return schedules, repairs
@@ -0,0 +1,123 @@
+import queue
+import threading
+
+from DataAccess import get_connection, unit_of_work
+
+
+class DbWorker:
+    """Runs database jobs on a background thread that owns its own connection.
+
+    submit(job, on_done, on_error) queues job(conn); it runs on the worker and the result
+    (or exception) is handed back on the Tk thread by polling with root.after, so callbacks
+    may touch widgets freely. Jobs that queue up while the worker is busy are run as one
+    group: each in its own savepoint (a failing job only undoes itself), all under one
+    commit, so a burst of clicks costs a single fsync. Jobs must not commit themselves;
+    nested work can use unit_of_work(conn).
+    Callbacks that redraw a view should go through after_commit(key, redraw): each key is
+    redrawn once per poll, however many jobs asked for it.
+    on_busy(True/False) is called when the first job is queued and when the last finishes.
+    """
+
+    def __init__(self, root, on_busy=None, on_error=None, poll_ms=30, max_group=64):
+        self.root = root
+        self.on_busy = on_busy
+        self.on_error = on_error
+        self.poll_ms = poll_ms
+        self.max_group = max_group
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._pending = 0
+        self._redraws = {}
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.poll_ms, self._poll)
+
+    @property
+    def busy(self):
+        return self._pending > 0
+
+    def submit(self, job, on_done=None, on_error=None):
+        self._pending += 1
+        if self._pending == 1 and self.on_busy:
+            self.on_busy(True)
+        self._jobs.put((job, on_done, on_error))
+
+    def after_commit(self, key, redraw):
+        """Run redraw() on the Tk thread after the current poll; repeated keys coalesce."""
+        self._redraws[key] = redraw
+
+    def close(self):
+        """Finish the queued jobs, then stop the thread; polling stops once their results are in."""
+        self._closed = True
+        self._jobs.put(None)
+
+    def _next_group(self):
+        item = self._jobs.get()
+        if item is None:
+            return None
+        group = [item]
+        while len(group) < self.max_group:
+            try:
+                item = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self._jobs.put(None)  # stop after this group
+                break
+            group.append(item)
+        return group
+
+    def _run(self):
+        conn = get_connection()
+        unit = unit_of_work(conn)
+        while True:
+            group = self._next_group()
+            if group is None:
+                break
+            outcomes = []
+            try:
+                with unit:
+                    for job, on_done, on_error in group:
+                        try:
+                            with unit:
+                                outcomes.append((on_done, job(conn), None, on_error))
+                        except Exception as e:
+                            outcomes.append((on_done, None, e, on_error))
+            except Exception as e:
+                # The commit itself failed, so nothing of the group was written
+                outcomes = [(on_done, None, e, on_error) for _, on_done, on_error in group]
+            self._results.put(outcomes)
+
+    def _poll(self):
+        # Checked before dispatching: whatever the thread put before ending is handed out below
+        finished = self._closed and not self._thread.is_alive()
+        try:
+            self._dispatch()
+        finally:
+            if not (finished and self._results.empty()):
+                try:
+                    self.root.after(self.poll_ms, self._poll)
+                except Exception:
+                    pass  # the window is gone
+
+    def _dispatch(self):
+        try:
+            while True:
+                for on_done, result, error, on_error in self._results.get_nowait():
+                    self._pending -= 1
+                    try:
+                        if error is not None:
+                            handler = on_error or self.on_error
+                            if handler:
+                                handler(error)
+                        elif on_done:
+                            on_done(result)
+                    finally:
+                        if self._pending == 0 and self.on_busy:
+                            self.on_busy(False)
+        except queue.Empty:
+            pass
+        redraws, self._redraws = self._redraws, {}
+        for redraw in redraws.values():
+            redraw()
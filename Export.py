@@ -0,0 +1,184 @@
+import csv
+import importlib.util
+import json
+import os
+
+from BackgroundJob import BackgroundJob
+from DataAccess import connect
+
+BATCH_SIZE = 1000
+
+# Column id -> header shown in exported files
+REPAIR_EXPORT_COLUMNS = [
+    ('vehicle', 'Vehicle'), ('car_model', 'Car Model'), ('vin', 'VIN'), ('issue', 'Issue'),
+    ('estimated_hours', 'Estimated Hours'), ('estimated_cost', 'Estimated Cost'),
+    ('start_date', 'Start Date'), ('end_date', 'End Date'),
+    ('assigned_mechanic', 'Mechanic'), ('status', 'Status'), ('priority', 'Priority'),
+]
+
+
+def repairs_export_query(start=None, end=None, mechanic=None, status=None, columns=None):
+    """Build the SELECT for a repairs export; start/end are a half-open canonical range."""
+    columns = columns or [name for name, _ in REPAIR_EXPORT_COLUMNS]
+    conditions, params = [], []
+    if mechanic:
+        conditions.append('assigned_mechanic = ?')
+        params.append(mechanic)
+    if start:
+        conditions.append('start_date >= ?')
+        params.append(start)
+    if end:
+        conditions.append('start_date < ?')
+        params.append(end)
+    if status:
+        conditions.append('status = ?')
+        params.append(status)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f"SELECT {', '.join(columns)} FROM repairs{where} ORDER BY start_date, id", params
+
+
+class CsvWriter:
+    extension = '.csv'
+
+    def __init__(self, path, headers):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(headers)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesWriter:
+    extension = '.jsonl'
+
+    def __init__(self, path, headers):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.headers = headers
+
+    def write(self, rows):
+        self.file.writelines(json.dumps(dict(zip(self.headers, row)), ensure_ascii=False) + '\n' for row in rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Columnar output: every batch becomes one row group, so only one batch is in memory."""
+    extension = '.parquet'
+
+    def __init__(self, path, headers):
+        # pyarrow is heavy; it is only imported once a Parquet file is written
+        import pyarrow
+        import pyarrow.parquet
+        self._pa = pyarrow
+        self.path = path
+        self.headers = headers
+        self.writer = None
+
+    def write(self, rows):
+        pa = self._pa
+        columns = list(zip(*rows))
+        table = pa.table({h: pa.array(list(c)) for h, c in zip(self.headers, columns)})
+        if self.writer is None:
+            # Columns that are NULL throughout the first batch are typed as text
+            schema = pa.schema([pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                                for f in table.schema])
+            self.writer = pa.parquet.ParquetWriter(self.path, schema)
+        if table.schema != self.writer.schema:
+            # A batch of all-NULL values infers a narrower type than the first batch
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        pa = self._pa
+        if self.writer is None:
+            # No rows: still leave an empty file with the expected columns
+            schema = pa.schema([(h, pa.string()) for h in self.headers])
+            self.writer = pa.parquet.ParquetWriter(self.path, schema)
+        self.writer.close()
+
+
+FORMATS = {'CSV': CsvWriter, 'JSON Lines': JsonLinesWriter}
+# Parquet export is optional; pyarrow is heavy, so it is only imported when a Parquet file is written
+if importlib.util.find_spec('pyarrow') is not None:
+    FORMATS['Parquet'] = ParquetWriter
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_query(conn, sql, params, path, fmt='CSV', headers=None, batch_size=BATCH_SIZE,
+                 progress=None, cancelled=None):
+    """Stream the rows of `sql` into `path` batch by batch and return the number written.
+
+    progress(done, total) is called after every batch; if cancelled() turns true the export
+    stops with ExportCancelled. The count and the rows are read in one transaction, so
+    they come from the same snapshot. The file is written next to `path` and only renamed
+    into place once complete, so a failed export never leaves a truncated report behind.
+    """
+    snapshot = not conn.in_transaction
+    if snapshot:
+        conn.execute('BEGIN')
+    try:
+        total = conn.execute(f"SELECT COUNT(*) FROM ({sql})", params).fetchone()[0]
+        cursor = conn.execute(sql, params)
+        headers = headers or [d[0] for d in cursor.description]
+        partial = path + '.part'
+        writer = FORMATS[fmt](partial, headers)
+        done = 0
+        try:
+            while True:
+                if cancelled and cancelled():
+                    raise ExportCancelled()
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                writer.write(rows)
+                done += len(rows)
+                if progress:
+                    progress(done, total)
+            writer.close()
+            os.replace(partial, path)
+        except BaseException:
+            writer.close()
+            os.remove(partial)
+            raise
+        finally:
+            cursor.close()
+    finally:
+        if snapshot:
+            conn.commit()  # only reads; ends the snapshot
+    return done
+
+
+def export_repairs(conn, path, fmt='CSV', start=None, end=None, mechanic=None, status=None, **kwargs):
+    sql, params = repairs_export_query(start, end, mechanic, status)
+    headers = [header for _, header in REPAIR_EXPORT_COLUMNS]
+    return export_query(conn, sql, params, path, fmt, headers=headers, **kwargs)
+
+
+class ExportJob(BackgroundJob):
+    """Runs export_repairs with its own read-only connection; result is the number of rows.
+
+    Under WAL the export's read transaction doesn't hold up writers.
+    """
+    name = 'export'
+
+    def __init__(self, path, fmt='CSV', **filters):
+        super().__init__()
+        self.path = path
+        self.fmt = fmt
+        self.filters = filters
+
+    def run(self):
+        conn = connect(read_only=True)
+        try:
+            return export_repairs(conn, self.path, self.fmt, progress=self.progress,
+                                  cancelled=self.cancelled, **self.filters)
+        finally:
+            conn.close()
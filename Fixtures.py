@@ -0,0 +1,154 @@
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+from Database import create_database
+from DataAccess import connect
+from Timestamps import format_timestamp
+
+# Synthetic data spans these two years
+FIRST_DAY = datetime(2024, 1, 1)
+DAYS = 730
+BATCH_SIZE = 10000
+# Parts usage history covers the last days of the span
+USAGE_DAYS = 120
+
+CAR_MODELS = ['Toyota Corolla', 'Honda Civic', 'Ford Focus', 'VW Golf', 'Škoda Octavia', 'BMW 320d',
+              'Opel Astra', 'Renault Clio', 'Dacia Duster', 'Tesla Model 3']
+ISSUES = ['engine noise', 'brake pads worn', 'oil change', 'transmission slipping', 'coolant leak',
+          'battery dead', 'clutch replacement', 'alternator failure', 'tire rotation', 'AC not cooling',
+          'check engine light', 'suspension knock', 'exhaust rattle', 'timing belt service']
+PARTS = ['Brake Pad', 'Oil Filter', 'Air Filter', 'Spark Plug', 'Timing Belt', 'Alternator', 'Battery',
+         'Clutch Kit', 'Wiper Blade', 'Headlight Bulb', 'Radiator', 'Shock Absorber']
+SUPPLIERS = ['AutoParts Ltd', 'Bosch', 'Febi', 'Mann', 'Valeo']
+FIRST_NAMES = ['Ivan', 'Maria', 'Georgi', 'Elena', 'Peter', 'Anna', 'Nikolay', 'Sofia', 'Dimitar', 'Vesela']
+LAST_NAMES = ['Petrov', 'Ivanova', 'Georgiev', 'Dimitrova', 'Kolev', 'Stoyanova', 'Nikolov', 'Todorova']
+
+
+def mechanic_names(rows):
+    """The mechanics a fixture of `rows` rows has: about one per 2000 repairs, at least 5."""
+    return [f"Mechanic {i:03d}" for i in range(max(5, min(rows // 2000, 500)))]
+
+
+def _timestamp(rng, hour_from=8, hour_to=17):
+    day = FIRST_DAY + timedelta(days=rng.randrange(DAYS), hours=rng.randrange(hour_from, hour_to),
+                                minutes=rng.choice((0, 15, 30, 45)))
+    return day
+
+
+def _batches(rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _customers_and_repairs(rng, rows, mechanics):
+    for i in range(rows):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        model = rng.choice(CAR_MODELS)
+        vin = f"FX{i:015d}"
+        issue = ', '.join(rng.sample(ISSUES, rng.randint(1, 3)))
+        start = _timestamp(rng)
+        done = rng.random() < 0.6
+        end = format_timestamp(start + timedelta(days=rng.randint(0, 5))) if done else None
+        yield ((name, model, vin, issue, format_timestamp(start)),
+               (f"{model} ({vin})", name, model, vin, issue, 'Repaired' if done else 'Pending',
+                format_timestamp(start), rng.choice(mechanics), rng.choice(('Low', 'Medium', 'High')),
+                rng.choice((0.5, 1.0, 2.0, 3.5, 5.0, 8.0)), round(rng.uniform(40, 2500), 2), end))
+
+
+def _schedules(rng, rows, mechanics):
+    for _ in range(rows):
+        start = _timestamp(rng)
+        end = start + timedelta(hours=rng.choice((1, 2, 3, 4)))
+        yield (rng.choice(mechanics), format_timestamp(start), format_timestamp(end),
+               rng.choice(ISSUES), 'done' if rng.random() < 0.5 else 'pending')
+
+
+def _login_logs(rng, rows, mechanics):
+    for _ in range(rows):
+        admin = rng.random() < 0.2
+        yield ('admin' if admin else rng.choice(mechanics).replace(' ', '').lower(),
+               'Admin' if admin else 'Mechanic', format_timestamp(_timestamp(rng, 6, 22)))
+
+
+def _part_usage(rng, part_count, days=USAGE_DAYS):
+    # Each part has its own demand rate; it is used on roughly a third of the days
+    last_day = FIRST_DAY + timedelta(days=DAYS)
+    for part_id in range(1, part_count + 1):
+        rate = rng.choice((1, 1, 2, 3, 5, 8))
+        for offset in range(days):
+            if rng.random() < 0.3:
+                day = (last_day - timedelta(days=days - offset)).strftime('%Y-%m-%d')
+                yield part_id, day, rng.randint(1, rate)
+
+
+def generate(db_path, rows, seed=0):
+    """Create a fresh database at db_path holding `rows` customers, repairs, schedules and
+    login logs (and up to `rows` parts with their usage history). The same seed always produces the same data."""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    create_database(db_path)
+    rng = random.Random(seed)
+    mechanics = mechanic_names(rows)
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany("INSERT INTO users (username, password, role, full_name) VALUES (?, ?, 'mechanic', ?)",
+                             [(m.replace(' ', '').lower(), 'x', m) for m in mechanics])
+            parts = [(f"{PARTS[i % len(PARTS)]} {i // len(PARTS):04d}", rng.randint(0, 200),
+                      round(rng.uniform(2, 400), 2), rng.choice(SUPPLIERS), None)
+                     for i in range(min(rows, 5000))]
+            conn.executemany('INSERT INTO inventory (part_name, quantity, price, supplier, last_ordered) '
+                             'VALUES (?, ?, ?, ?, ?)', parts)
+        for batch in _batches(_part_usage(rng, len(parts))):
+            with conn:
+                conn.executemany('INSERT INTO part_usage (part_id, day, quantity) VALUES (?, ?, ?)', batch)
+        with conn:
+            # Ledger: an opening balance covering everything used since, then the usage itself
+            conn.execute('''INSERT INTO stock_movements (part_id, moved_at, kind, quantity, unit_price)
+                            SELECT id, ?, 'opening', quantity + COALESCE(
+                                (SELECT SUM(quantity) FROM part_usage WHERE part_id = inventory.id), 0), price
+                            FROM inventory''', (format_timestamp(FIRST_DAY),))
+            conn.execute('''INSERT INTO stock_movements (part_id, moved_at, kind, quantity, unit_price)
+                            SELECT u.part_id, u.day || ' 12:00:00', 'used', -u.quantity, i.price
+                            FROM part_usage u JOIN inventory i ON i.id = u.part_id ORDER BY u.day''')
+        for batch in _batches(_customers_and_repairs(rng, rows, mechanics)):
+            with conn:
+                conn.executemany('INSERT INTO customers (name, car_model, vin, issue, date_added) '
+                                 'VALUES (?, ?, ?, ?, ?)', [customer for customer, _ in batch])
+                conn.executemany('''INSERT INTO repairs (vehicle, customer_name, car_model, vin, issue, status,
+                                        start_date, assigned_mechanic, priority, estimated_hours, estimated_cost,
+                                        end_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                                 [repair for _, repair in batch])
+        for batch in _batches(_schedules(rng, rows, mechanics)):
+            with conn:
+                conn.executemany('INSERT INTO schedules (mechanic, start_time, end_time, task, status) '
+                                 'VALUES (?, ?, ?, ?, ?)', batch)
+        for batch in _batches(_login_logs(rng, rows, mechanics)):
+            with conn:
+                conn.executemany('INSERT INTO login_logs (username, role, login_time) VALUES (?, ?, ?)', batch)
+    finally:
+        conn.close()
+    return db_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fill a scratch database with seeded synthetic garage data.")
+    parser.add_argument('db_path')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate(args.db_path, args.rows, args.seed)
+    print(f"Wrote {args.rows} rows per table to {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import ctypes
+import ctypes.util
+import os
+import sys
+
+FONT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Orbitron-Medium.ttf')
+
+_loaded = set()
+
+
+def load_font(path=FONT_FILE):
+    """Make a .ttf usable by Tk for this process only; True if it was registered.
+
+    Talks to the platform font service directly (GDI / fontconfig / CoreText), so no
+    graphics library has to be imported at startup. Call it before the first widget
+    asks for the family.
+    """
+    if path in _loaded:
+        return True
+    try:
+        if sys.platform == 'win32':
+            FR_PRIVATE = 0x10
+            ok = ctypes.windll.gdi32.AddFontResourceExW(path, FR_PRIVATE, 0) > 0
+        elif sys.platform == 'darwin':
+            ok = _load_font_macos(path)
+        else:
+            fontconfig = ctypes.CDLL(ctypes.util.find_library('fontconfig') or 'libfontconfig.so.1')
+            ok = bool(fontconfig.FcConfigAppFontAddFile(None, path.encode(sys.getfilesystemencoding())))
+    except (OSError, AttributeError):
+        ok = False
+    if ok:
+        _loaded.add(path)
+    return ok
+
+
+def _load_font_macos(path):
+    core_text = ctypes.CDLL('/System/Library/Frameworks/CoreText.framework/CoreText')
+    core_foundation = ctypes.CDLL('/System/Library/Frameworks/CoreFoundation.framework/CoreFoundation')
+    core_foundation.CFURLCreateFromFileSystemRepresentation.restype = ctypes.c_void_p
+    core_foundation.CFURLCreateFromFileSystemRepresentation.argtypes = [
+        ctypes.c_void_p, ctypes.c_char_p, ctypes.c_long, ctypes.c_bool]
+    core_text.CTFontManagerRegisterFontsForURL.argtypes = [ctypes.c_void_p, ctypes.c_uint32, ctypes.c_void_p]
+    raw = path.encode('utf-8')
+    url = core_foundation.CFURLCreateFromFileSystemRepresentation(None, raw, len(raw), False)
+    kCTFontManagerScopeProcess = 1
+    return bool(core_text.CTFontManagerRegisterFontsForURL(url, kCTFontManagerScopeProcess, None))
@@ -0,0 +1,202 @@
+import argparse
+import csv
+import os
+import re
+import sqlite3
+
+from BackgroundJob import BackgroundJob
+from DataAccess import connect, get_connection
+from Timestamps import now_timestamp, to_canonical
+
+BATCH_SIZE = 5000
+
+REQUIRED_COLUMNS = ('name', 'car_model', 'vin')
+OPTIONAL_COLUMNS = ('issue', 'date_added', 'status', 'assigned_mechanic', 'priority',
+                    'estimated_hours', 'estimated_cost')
+# Headers used by our exports and the old system, mapped to the column names above
+HEADER_ALIASES = {'customer_name': 'name', 'customer': 'name', 'car model': 'car_model', 'model': 'car_model',
+                  'start_date': 'date_added', 'start date': 'date_added', 'mechanic': 'assigned_mechanic',
+                  'estimated hours': 'estimated_hours', 'estimated cost': 'estimated_cost'}
+# Shared with the Customers form. Registration plates are stored as VINs too ('PB 8492 HF'),
+# so spaces and non-Latin letters are allowed
+VIN_PATTERN = re.compile(r'[\w -]{1,17}')
+VIN_RULE = "VIN must be 1-17 letters, digits, spaces or dashes"
+
+CUSTOMER_INSERT = '''INSERT INTO customers (name, car_model, vin, issue, date_added) VALUES (?, ?, ?, ?, ?)'''
+REPAIR_INSERT = '''INSERT INTO repairs (vehicle, customer_name, car_model, vin, issue, status, start_date,
+                                        assigned_mechanic, priority, estimated_hours, estimated_cost)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.bytes_read = 0
+        self.bytes_total = 0
+
+
+def _column_map(header):
+    columns = {}
+    for index, name in enumerate(header):
+        key = name.strip().lower()
+        key = HEADER_ALIASES.get(key, key)
+        if key in REQUIRED_COLUMNS + OPTIONAL_COLUMNS:
+            columns.setdefault(key, index)
+    missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+    if missing:
+        raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+    return columns
+
+
+def _number(value, field):
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        raise ValueError(f"{field} is not a number")
+
+
+def _parse_row(fields, columns, today):
+    """Validated (customer, repair) parameter tuples for one input row; ValueError says why not."""
+    get = lambda key: fields[columns[key]].strip() if key in columns and columns[key] < len(fields) else ''
+    name, car_model, vin = get('name'), get('car_model'), get('vin')
+    if not name or not car_model or not vin:
+        raise ValueError("name, car_model and vin are required")
+    if not VIN_PATTERN.fullmatch(vin):
+        raise ValueError(VIN_RULE)
+    date = today
+    if get('date_added'):
+        date = to_canonical(get('date_added'))
+        if date is None:
+            raise ValueError("date_added is not a date")
+    issue = get('issue') or None
+    customer = (name, car_model, vin, issue, date)
+    repair = (f"{car_model} ({vin})", name, car_model, vin, issue, get('status') or 'Pending', date,
+              get('assigned_mechanic') or None, get('priority') or None,
+              _number(get('estimated_hours'), 'estimated_hours'), _number(get('estimated_cost'), 'estimated_cost'))
+    return customer, repair
+
+
+def _insert_batch(conn, batch, reject):
+    try:
+        with conn:
+            conn.executemany(CUSTOMER_INSERT, [customer for _, customer, _ in batch])
+            conn.executemany(REPAIR_INSERT, [repair for _, _, repair in batch])
+        return len(batch)
+    except sqlite3.IntegrityError:
+        pass
+    # Someone else added one of these VINs meanwhile: retry row by row to find it
+    inserted = 0
+    for line, customer, repair in batch:
+        try:
+            with conn:
+                conn.execute(CUSTOMER_INSERT, customer)
+                conn.execute(REPAIR_INSERT, repair)
+            inserted += 1
+        except sqlite3.IntegrityError as e:
+            reject(line, f"rejected by the database: {e}", None)
+    return inserted
+
+
+def import_customers(conn, path, reject_path=None, batch_size=BATCH_SIZE, progress=None):
+    """Import a customers+repairs CSV file into the database, streaming it batch by batch.
+
+    Every accepted row adds a customer and a Pending repair, as the Customers form does.
+    VINs already in customers, or repeated within the file, are rejected. Rejected rows go to
+    reject_path (default: <input>.rejects.csv) with their line number and reason.
+    progress(result) is called after every batch. Returns an ImportResult.
+    """
+    reject_path = reject_path or os.path.splitext(path)[0] + '.rejects.csv'
+    result = ImportResult()
+    result.bytes_total = os.path.getsize(path)
+    # customers.vin is not UNIQUE in databases created before the constraint existed,
+    # so duplicates are caught here rather than left to the database
+    seen = {vin for (vin,) in conn.execute('SELECT vin FROM customers')}
+    today = now_timestamp()
+
+    with open(path, newline='', encoding='utf-8-sig') as f, \
+            open(reject_path, 'w', newline='', encoding='utf-8') as rejects_file:
+        reader = csv.reader(f)
+        rejects = csv.writer(rejects_file)
+        header = next(reader, None)
+        if header is None:
+            raise ValueError("The file is empty")
+        columns = _column_map(header)
+        rejects.writerow(['line', 'reason'] + header)
+
+        def reject(line, reason, fields):
+            result.rejected += 1
+            rejects.writerow([line, reason] + (fields or []))
+
+        batch = []
+        for fields in reader:
+            line = reader.line_num
+            if not any(fields):
+                continue
+            try:
+                customer, repair = _parse_row(fields, columns, today)
+            except ValueError as e:
+                reject(line, str(e), fields)
+                continue
+            if customer[2] in seen:
+                reject(line, "VIN already exists", fields)
+                continue
+            seen.add(customer[2])
+            batch.append((line, customer, repair))
+            if len(batch) >= batch_size:
+                result.imported += _insert_batch(conn, batch, reject)
+                batch = []
+                result.bytes_read = f.buffer.tell()
+                if progress:
+                    progress(result)
+        if batch:
+            result.imported += _insert_batch(conn, batch, reject)
+        result.bytes_read = result.bytes_total
+        if progress:
+            progress(result)
+    if not result.rejected:
+        os.remove(reject_path)
+    return result
+
+
+class ImportJob(BackgroundJob):
+    """Runs import_customers with its own connection; result is the ImportResult, updated per batch."""
+    name = 'import'
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.reject_path = os.path.splitext(path)[0] + '.rejects.csv'
+        self.result = ImportResult()
+
+    def _progress(self, result):
+        self.result = result
+        self.progress(result.bytes_read, result.bytes_total)
+
+    def run(self):
+        conn = connect()
+        try:
+            return import_customers(conn, self.path, self.reject_path, progress=self._progress)
+        finally:
+            conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import customers and their repairs from a CSV file.")
+    parser.add_argument('csv_file')
+    parser.add_argument('--rejects', default=None, help="reject report path (default: <csv_file>.rejects.csv)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db) if args.db else get_connection()
+    result = import_customers(conn, args.csv_file, args.rejects, args.batch_size)
+    print(f"Imported {result.imported} rows, rejected {result.rejected}")
+    if result.rejected:
+        print(f"See {args.rejects or os.path.splitext(args.csv_file)[0] + '.rejects.csv'} for the reasons")
+
+
+if __name__ == "__main__":
+    main()
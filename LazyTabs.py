@@ -0,0 +1,49 @@
+import ttkbootstrap as ttk
+
+
+class LazyTabs:
+    """Adds Notebook tabs whose contents are built the first time they are shown.
+
+    add(text, factory) puts an empty frame in the notebook; factory(frame) fills it and
+    loads its data when the tab is first selected. After the first paint, warm_up()
+    builds the remaining tabs one per idle slot, so switching to them later is instant.
+    """
+
+    def __init__(self, notebook):
+        self.notebook = notebook
+        self._factories = {}  # frame path -> factory, until built
+        notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed, add='+')
+
+    def add(self, text, factory):
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        self._factories[str(frame)] = factory
+        return frame
+
+    @property
+    def pending(self):
+        return len(self._factories)
+
+    def build(self, frame):
+        factory = self._factories.pop(str(frame), None)
+        if factory:
+            factory(self.notebook.nametowidget(str(frame)))
+
+    def build_selected(self):
+        selected = self.notebook.select()
+        if selected:
+            self.build(selected)
+
+    def warm_up(self, gap_ms=50):
+        """Build the remaining tabs in the background of the event loop, one at a time."""
+        def step():
+            if not self._factories:
+                return
+            self.build(next(iter(self._factories)))
+            # Let input and redraws in between two tabs
+            self.notebook.after(gap_ms, lambda: self.notebook.after_idle(step))
+
+        self.notebook.after_idle(step)
+
+    def _on_tab_changed(self, event=None):
+        self.build_selected()
@@ -1,17 +1,20 @@
 import tkinter as tk
 from tkinter import messagebox
-from PIL import Image, ImageTk
 import sqlite3
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import sys
 import os
+from DbWorker import DbWorker
+from Auth import authenticate, hash_password
+from Theme import Theme, DARK, LIGHT, add_titlebar
 
-# Terran color palette
-TERRAN_BG = "#1b263b"
-TERRAN_ACCENT = "#415a77"
-TERRAN_HIGHLIGHT = "#00b4d8"
-TERRAN_TEXT = "#e0e1dd"
+# Terran colours for the login screen; the light palette is the app's
+LOGIN_PALETTES = {
+    'dark': dict(DARK, bg="#1b263b", accent="#415a77", highlight="#00b4d8", text="#e0e1dd",
+                 title_text="#e0e1dd", frame_border="#00b4d8"),
+    'light': LIGHT,
+}
 
 class LoginWindow:
     TITLEBAR_MARGIN = 24  # Adjust this for more/less space below the title bar
@@ -19,51 +22,15 @@ class LoginWindow:
     def __init__(self, master, on_login=None, terran_style=True):
         self.master = master
         self.on_login = on_login
-        self.terran_style = terran_style
-        self.current_theme = "dark" if self.terran_style else "light"
         self.master.geometry("620x520")
-        self.style = ttk.Style(theme='cyborg')
-        if terran_style:
-            self.master.configure(bg=TERRAN_BG)
-        self._add_custom_titlebar("Garage Login")
+        self.style = ttk.Style()  # the root Window has already built 'cyborg'; don't build it again
+        self.theme = Theme(self.style, LOGIN_PALETTES, name='dark' if terran_style else 'light')
+        self.theme.register(self.master, bg='bg')
+        self.theme.apply_styles()
+        add_titlebar(self.master, self.theme, "Garage Login", self._full_exit, height=self.TITLEBAR_MARGIN)
         self._create_widgets()
-
-    def _add_custom_titlebar(self, title="Garage Login"):
-        self.master.overrideredirect(True)
-        titlebar = tk.Frame(self.master, bg=TERRAN_ACCENT, relief="raised", bd=0, highlightthickness=0)
-        titlebar.pack(fill=tk.X, side=tk.TOP)
-        title_label = tk.Label(titlebar, text=title, bg=TERRAN_ACCENT, fg=TERRAN_TEXT, font=("Orbitron", 14, "bold"))
-        title_label.pack(side=tk.LEFT, padx=10, pady=2)
-        exit_btn = tk.Button(
-            titlebar, text="✕", bg=TERRAN_ACCENT, fg=TERRAN_TEXT, borderwidth=0, font=("Arial", 14, "bold"),
-            activebackground="#b22222", activeforeground="#fff",
-            command=self._full_exit
-        )
-        exit_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
-        min_btn = tk.Button(
-            titlebar, text="—", bg=TERRAN_ACCENT, fg=TERRAN_TEXT, borderwidth=0, font=("Arial", 14, "bold"),
-            activebackground=TERRAN_BG, activeforeground=TERRAN_HIGHLIGHT,
-            command=lambda: self.master.iconify()
-        )
-        min_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
-        def start_move(event):
-            self.master._drag_start_x = event.x_root
-            self.master._drag_start_y = event.y_root
-            self.master._win_x = self.master.winfo_x()
-            self.master._win_y = self.master.winfo_y()
-        def do_move(event):
-            if hasattr(self.master, '_drag_start_x'):
-                dx = event.x_root - self.master._drag_start_x
-                dy = event.y_root - self.master._drag_start_y
-                new_x = self.master._win_x + dx
-                new_y = self.master._win_y + dy
-                self.master.geometry(f"+{new_x}+{new_y}")
-        titlebar.bind("<ButtonPress-1>", start_move)
-        titlebar.bind("<B1-Motion>", do_move)
-        # Margin below the title bar
-        if self.TITLEBAR_MARGIN > 0:
-            spacer = tk.Frame(self.master, height=self.TITLEBAR_MARGIN, bg=TERRAN_BG)
-            spacer.pack(fill=tk.X)
+        # One connection on one thread for every attempt; password hashing is slow on purpose
+        self.db = DbWorker(self.master, on_busy=self._set_busy, on_error=self._show_error)
 
     def _full_exit(self):
         try:
@@ -77,92 +44,21 @@ class LoginWindow:
         os._exit(0)  # Guaranteed exit
 
     def toggle_theme(self):
-        if self.current_theme == "dark":
-            # Смяна към светла тема
-            self.current_theme = "light"
-            self.terran_style = False
-            self.style.theme_use('flatly')
-            self.master.configure(bg="white")
-        else:
-            # Смяна към тъмна тема — всичко се връща!
-            self.current_theme = "dark"
-            self.terran_style = True
-            self.style.theme_use('cyborg')  # Темата е тъмна
-            self.master.configure(bg=TERRAN_BG)  # Фон на прозореца
-
+        self.theme.toggle()
         # Смени и иконата на бутона
-        self.theme_btn.config(text="☀️" if self.current_theme == "dark" else "🌙")
-
-        # Върни стиловете и цветовете според темата
-        self._configure_styles()
-
-        # Само за тъмна тема – наложи фона на всички widgets
-        if self.current_theme == "dark":
-            self.apply_bg_recursive(self.master, TERRAN_BG)
-
-    def _configure_styles(self):
-        self.style.configure('.', font=('Orbitron', 14))
-        self.style.configure('TButton', font=('Orbitron', 14))
-        self.style.configure('Treeview.Heading', font=('Orbitron', 16, 'bold'))
-        self.style.configure('Treeview', font=('Orbitron', 14), rowheight=35)
-        self.style.configure('TEntry', font=('Orbitron', 14))
-
-        if self.current_theme == "dark":
-            self.style.configure('Header.TLabel',
-                                 font=('Orbitron', 28, 'bold'),
-                                 background=TERRAN_ACCENT,
-                                 foreground=TERRAN_TEXT2)
-
-            self.style.configure('TLabel',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2)
-
-            self.style.configure('TLabelframe',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2,
-                                 bordercolor=TERRAN_HIGHLIGHT)
-
-            self.style.configure('TLabelframe.Label',
-                                 background=TERRAN_BG,
-                                 foreground=TERRAN_TEXT2)
-
-        else:  # светла тема
-            self.style.configure('Header.TLabel',
-                                 font=('Orbitron', 28, 'bold'),
-                                 background="#f0f0f0",
-                                 foreground="#222")
-
-            self.style.configure('TLabel',
-                                 background="white",
-                                 foreground="#222")
-
-            self.style.configure('TLabelframe',
-                                 background="white",
-                                 foreground="#222",
-                                 bordercolor="gray")
-
-            self.style.configure('TLabelframe.Label',
-                                 background="white",
-                                 foreground="#222")
-
-    def apply_bg_recursive(self, widget, bg):
-        try:
-            widget.configure(bg=bg)
-        except:
-            pass
-        for child in widget.winfo_children():
-            self.apply_bg_recursive(child, bg)
+        self.theme_btn.config(text="🌙" if self.theme.name == 'dark' else "☀️")
 
     def _create_widgets(self):
         # Spacer between titlebar and login frame
-        spacer = tk.Frame(self.master, height=36, bg=TERRAN_BG)  # Match background
+        spacer = self.theme.register(tk.Frame(self.master, height=36), bg='bg')  # Match background
         spacer.pack(fill=tk.X)
 
         login_frame = ttk.LabelFrame(
             self.master,
             padding=12,  # Increased padding for larger appearance
             borderwidth=3,
-            relief="groove"
+            relief="groove",
+            style='Panel.TLabelframe'
         )
         self.theme_btn = ttk.Button(
             self.master,
@@ -172,32 +68,30 @@ class LoginWindow:
         self.theme_btn.pack(pady=(0, 10))
         login_frame.pack(pady=(0, 10), padx=10)  # More vertical space and horizontal margin
 
-        self.style.configure("TLabelframe", background=TERRAN_ACCENT, foreground=TERRAN_TEXT,
-                             bordercolor=TERRAN_HIGHLIGHT)
-        self.style.configure("TLabelframe.Label", font=('Orbitron', 18, 'bold'), background=TERRAN_ACCENT,
-                             foreground=TERRAN_TEXT)
-
         self.user_type = ttk.Combobox(
             login_frame, values=['Admin', 'Mechanic'], state='readonly', font=('Orbitron', 12)
         )
         self.user_type.grid(row=0, column=0, columnspan=2, pady=6, padx=10, sticky='ew')
         self.user_type.set('Admin')
 
-        ttk.Label(login_frame, text="Username:", font=('Orbitron', 12), background=TERRAN_ACCENT,
-                  foreground=TERRAN_TEXT).grid(row=1, column=0, padx=5, pady=6, sticky='e')
+        ttk.Label(login_frame, text="Username:", style='Panel.TLabel').grid(row=1, column=0, padx=5, pady=6, sticky='e')
         self.username = ttk.Entry(login_frame, font=('Orbitron', 12), width=22)
         self.username.grid(row=1, column=1, padx=5, pady=6, sticky='w')
 
-        ttk.Label(login_frame, text="Password:", font=('Orbitron', 12), background=TERRAN_ACCENT,
-                  foreground=TERRAN_TEXT).grid(row=2, column=0, padx=5, pady=6, sticky='e')
+        ttk.Label(login_frame, text="Password:", style='Panel.TLabel').grid(row=2, column=0, padx=5, pady=6, sticky='e')
         self.password = ttk.Entry(login_frame, show="*", font=('Orbitron', 12), width=22)
         self.password.grid(row=2, column=1, padx=5, pady=6, sticky='w')
 
-        login_btn = ttk.Button(
+        self.login_btn = ttk.Button(
             login_frame, text="Login", command=self.authenticate,
             width=20
         )
-        login_btn.grid(row=3, column=0, columnspan=2, pady=14, sticky='ew')
+        self.login_btn.grid(row=3, column=0, columnspan=2, pady=14, sticky='ew')
+
+        # Shown while a password is checked on the worker thread
+        self.progress = ttk.Progressbar(login_frame, mode='indeterminate')
+        self.progress.grid(row=5, column=0, columnspan=2, pady=(6, 0), sticky='ew')
+        self.progress.grid_remove()
 
         register_btn = ttk.Button(
             login_frame, text="Register New Mechanic", command=self.open_register,
@@ -213,44 +107,53 @@ class LoginWindow:
         if not username or not password:
             messagebox.showerror("Login Failed", "Please enter username and password")
             return
-
-        try:
-            with sqlite3.connect('cosmic_garage.db') as conn:
-                cursor = conn.cursor()
-                if user_type == 'Admin':
-                    cursor.execute('SELECT * FROM users WHERE username=? AND password=? AND role="admin"', (username, password))
-                    user = cursor.fetchone()
-                    if user:
-                        cursor.execute('''
-                            INSERT INTO login_logs (username, role, login_time)
-                            VALUES (?, ?, datetime('now'))
-                        ''', (username, user_type))
-                        conn.commit()
-                        self.master.destroy()
-                        if self.on_login:
-                            self.on_login(user_role='admin')
-                    else:
-                        messagebox.showerror("Login Failed", "Invalid admin credentials")
-                elif user_type == 'Mechanic':
-                    cursor.execute('SELECT * FROM users WHERE username=? AND password=? AND role="mechanic"', (username, password))
-                    user = cursor.fetchone()
-                    if user:
-                        cursor.execute('''
-                            INSERT INTO login_logs (username, role, login_time)
-                            VALUES (?, ?, datetime('now'))
-                        ''', (username, user_type))
-                        conn.commit()
-                        self.master.destroy()
-                        if self.on_login:
-                            self.on_login(user_role='mechanic', mechanic_name=user[4])
-                    else:
-                        messagebox.showerror("Login Failed", "Invalid mechanic credentials")
+        if user_type not in ('Admin', 'Mechanic'):
+            messagebox.showerror("Login Failed", "Please select a user type")
+            return
+        role = user_type.lower()
+
+        def check(conn):
+            user = authenticate(conn, username, password, role)
+            if user:
+                conn.execute('''
+                    INSERT INTO login_logs (username, role, login_time)
+                    VALUES (?, ?, datetime('now'))
+                ''', (username, user_type))
+            return user
+
+        def checked(user):
+            if not user:
+                messagebox.showerror("Login Failed", f"Invalid {role} credentials")
+                return
+            self.db.close()
+            self.master.destroy()
+            if self.on_login:
+                if role == 'admin':
+                    self.on_login(user_role='admin')
                 else:
-                    messagebox.showerror("Login Failed", "Please select a user type")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"An error occurred with the database: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+                    self.on_login(user_role='mechanic', mechanic_name=user[4])
+
+        self.db.submit(check, on_done=checked)
+
+    def _set_busy(self, busy):
+        if not self.master.winfo_exists():
+            return  # logged in; the window is gone
+        if busy:
+            self.login_btn.config(state='disabled')
+            self.progress.grid()
+            self.progress.start(10)
+        else:
+            self.progress.stop()
+            self.progress.grid_remove()
+            self.login_btn.config(state='normal')
+
+    def _show_error(self, error):
+        if isinstance(error, sqlite3.IntegrityError):
+            messagebox.showerror("Error", "Username already exists")
+        elif isinstance(error, sqlite3.Error):
+            messagebox.showerror("Database Error", f"An error occurred with the database: {error}")
+        else:
+            messagebox.showerror("Error", f"An unexpected error occurred: {error}")
 
     def open_register(self):
         register_win = tk.Toplevel(self.master)
@@ -259,20 +162,18 @@ class LoginWindow:
         register_win.transient(self.master)
         register_win.grab_set()
         register_win.focus_set()
-        if self.terran_style:
-            register_win.configure(bg=TERRAN_BG)
+        self.theme.register(register_win, bg='bg')
 
         reg_frame = ttk.LabelFrame(
             register_win,
             text="Mechanic Registration",
             padding=10,
             borderwidth=3,
-            relief="groove"
+            relief="groove",
+            style='Panel.TLabelframe'
         )
         reg_frame.pack(pady=10, padx=20, fill='x')
 
-        self.style.configure("TLabelframe", background=TERRAN_ACCENT, foreground=TERRAN_TEXT, bordercolor=TERRAN_HIGHLIGHT)
-        self.style.configure("TLabelframe.Label", font=('Orbitron', 14, 'bold'), background=TERRAN_ACCENT, foreground=TERRAN_TEXT)
 
         entries = [
             ('Full Name:', 'full_name'),
@@ -283,7 +184,7 @@ class LoginWindow:
 
         self.register_entries = {}
         for i, (label, key) in enumerate(entries):
-            ttk.Label(reg_frame, text=label, width=15, background=TERRAN_ACCENT, foreground=TERRAN_TEXT).grid(row=i, column=0, sticky='e', padx=5, pady=5)
+            ttk.Label(reg_frame, text=label, width=15, style='Panel.TLabel').grid(row=i, column=0, sticky='e', padx=5, pady=5)
             entry = ttk.Entry(reg_frame, show="*" if "password" in key else "")
             entry.grid(row=i, column=1, sticky='w', padx=5, pady=5)
             self.register_entries[key] = entry
@@ -306,25 +207,12 @@ class LoginWindow:
             messagebox.showerror("Error", "Passwords do not match")
             return
 
-        try:
-            with sqlite3.connect('cosmic_garage.db') as conn:
-                cursor = conn.cursor()
-                cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-                                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                                    username TEXT UNIQUE NOT NULL,
-                                    password TEXT NOT NULL,
-                                    role TEXT NOT NULL,
-                                    full_name TEXT
-                                )''')
-                conn.commit()
-                cursor.execute('''INSERT INTO users (username, password, role, full_name) VALUES (?, ?, ?, ?)''',
-                               (data['username'], data['password'], 'mechanic', data['full_name']))
-                conn.commit()
-                messagebox.showinfo("Success", "Registration successful!\nYou can now login as a mechanic")
-                register_win.destroy()
-        except sqlite3.IntegrityError:
-            messagebox.showerror("Error", "Username already exists")
-        except sqlite3.Error as e:
-            messagebox.showerror("Database Error", f"An error occurred with the database: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"An unexpected error occurred: {e}")
+        def register(conn):
+            conn.execute('''INSERT INTO users (username, password, role, full_name) VALUES (?, ?, ?, ?)''',
+                         (data['username'], hash_password(data['password']), 'mechanic', data['full_name']))
+
+        def registered(_):
+            messagebox.showinfo("Success", "Registration successful!\nYou can now login as a mechanic")
+            register_win.destroy()
+
+        self.db.submit(register, on_done=registered)
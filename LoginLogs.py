@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+from DataAccess import connect, get_connection, unit_of_work
+from Timestamps import format_timestamp
+
+# Rows older than this many days leave login_logs; the login_daily counts are kept forever
+RETENTION_DAYS = int(os.environ.get('COSMIC_LOG_RETENTION_DAYS', 365))
+
+
+def _pack(rows):
+    return zlib.compress('\n'.join(json.dumps(row) for row in rows).encode('utf-8'), 9)
+
+
+def _unpack(data):
+    text = zlib.decompress(data).decode('utf-8')
+    return [tuple(json.loads(line)) for line in text.split('\n')] if text else []
+
+
+def archive_login_logs(conn, retention_days=None, now=None):
+    """Move login_logs rows older than the retention window into login_logs_archive.
+
+    Rows are grouped by month and stored as one compressed blob per month, merged
+    with what an earlier run already archived. Returns the number of rows moved.
+    """
+    days = RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = format_timestamp((now or datetime.now()) - timedelta(days=days))
+    rows = conn.execute('''SELECT id, username, role, login_time FROM login_logs
+                           WHERE login_time < ? ORDER BY login_time, id''', (cutoff,)).fetchall()
+    if not rows:
+        return 0
+    by_month = {}
+    for row in rows:
+        by_month.setdefault(row[3][:7], []).append(row)
+    with unit_of_work(conn):
+        for month, month_rows in by_month.items():
+            old = conn.execute('SELECT data FROM login_logs_archive WHERE month=?', (month,)).fetchone()
+            if old:
+                month_rows = _unpack(old[0]) + month_rows
+            conn.execute('INSERT OR REPLACE INTO login_logs_archive (month, row_count, data) VALUES (?, ?, ?)',
+                         (month, len(month_rows), _pack(month_rows)))
+        conn.execute('DELETE FROM login_logs WHERE login_time < ?', (cutoff,))
+    return len(rows)
+
+
+def archived_months(conn):
+    return conn.execute('SELECT month, row_count FROM login_logs_archive ORDER BY month DESC').fetchall()
+
+
+def read_archived_logs(conn, month):
+    """The (id, username, role, login_time) rows archived for a 'YYYY-MM' month."""
+    row = conn.execute('SELECT data FROM login_logs_archive WHERE month=?', (month,)).fetchone()
+    return _unpack(row[0]) if row else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old login log rows.")
+    parser.add_argument('--days', type=int, default=RETENTION_DAYS, help="keep this many days in login_logs")
+    parser.add_argument('--db', default=None)
+    args = parser.parse_args(argv)
+    conn = connect(args.db) if args.db else get_connection()
+    print(f"Archived {archive_login_logs(conn, args.days)} login log rows")
+
+
+if __name__ == "__main__":
+    main()
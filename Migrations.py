@@ -1,38 +1,477 @@
+from DataAccess import connect, get_connection
+from Timestamps import to_canonical
 
-import sqlite3
 
-def add_columns_if_missing(db_path='cosmic_garage.db'):
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [row[1] for row in cursor.fetchall()]
 
-    # --- Inventory Table Migration ---
-    cursor.execute("PRAGMA table_info(inventory)")
-    inventory_columns = [row[1] for row in cursor.fetchall()]
 
+def _table_exists(cursor, table):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    return cursor.fetchone() is not None
+
+
+def _baseline_schema(cursor):
+    # Users table (admins and mechanics)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            role TEXT NOT NULL CHECK(role IN ('admin', 'mechanic')),
+            full_name TEXT
+        )
+    ''')
+
+    # Customers table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS customers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            car_model TEXT NOT NULL,
+            vin TEXT UNIQUE NOT NULL,
+            issue TEXT,
+            date_added TEXT
+        )
+    ''')
+
+    # Repairs table (vin is NOT unique)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS repairs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            vehicle TEXT NOT NULL,
+            customer_name TEXT NOT NULL,
+            car_model TEXT NOT NULL,
+            vin TEXT NOT NULL,
+            issue TEXT,
+            status TEXT NOT NULL,
+            start_date TEXT,
+            assigned_mechanic TEXT,
+            priority TEXT,
+            estimated_hours REAL,
+            estimated_cost REAL,
+            end_date TEXT
+        )
+    ''')
+
+    # Inventory table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            part_name TEXT UNIQUE NOT NULL,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL,
+            supplier TEXT,
+            last_ordered TEXT
+        )
+    ''')
+
+    # Schedules table (with status)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS schedules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            mechanic TEXT NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            task TEXT,
+            status TEXT NOT NULL DEFAULT 'pending'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS login_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            role TEXT,
+            login_time TEXT
+        )
+    ''')
+
+    # Columns added after the first release
+    inventory_columns = _table_columns(cursor, 'inventory')
     if 'supplier' not in inventory_columns:
         cursor.execute("ALTER TABLE inventory ADD COLUMN supplier TEXT")
-        print("Added 'supplier' column to inventory table.")
-    else:
-        print("'supplier' column already exists.")
-
     if 'last_ordered' not in inventory_columns:
         cursor.execute("ALTER TABLE inventory ADD COLUMN last_ordered TEXT")
-        print("Added 'last_ordered' column to inventory table.")
-    else:
-        print("'last_ordered' column already exists.")
+    if 'status' not in _table_columns(cursor, 'schedules'):
+        cursor.execute("ALTER TABLE schedules ADD COLUMN status TEXT DEFAULT 'pending'")
 
-    # --- Schedules Table Migration ---
-    cursor.execute("PRAGMA table_info(schedules)")
-    schedules_columns = [row[1] for row in cursor.fetchall()]
 
-    if 'status' not in schedules_columns:
-        cursor.execute("ALTER TABLE schedules ADD COLUMN status TEXT DEFAULT 'pending'")
-        print("Added 'status' column to schedules table.")
-    else:
-        print("'status' column already exists.")
+def _retire_repairs_old(cursor):
+    # schedules.repair_id still points at repairs_old: rebuild schedules without it
+    if 'repair_id' in _table_columns(cursor, 'schedules'):
+        cursor.execute('''
+            CREATE TABLE schedules_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mechanic TEXT NOT NULL,
+                start_time TEXT NOT NULL,
+                end_time TEXT NOT NULL,
+                task TEXT,
+                status TEXT NOT NULL DEFAULT 'pending'
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO schedules_new (id, mechanic, start_time, end_time, task, status)
+            SELECT id, COALESCE(mechanic, ''), COALESCE(start_time, ''), COALESCE(end_time, ''),
+                   task, COALESCE(status, 'pending')
+            FROM schedules
+        ''')
+        cursor.execute("DROP TABLE schedules")
+        cursor.execute("ALTER TABLE schedules_new RENAME TO schedules")
+
+    if not _table_exists(cursor, 'repairs_old'):
+        return
+    # Carry over legacy repairs that never made it into the new table.
+    # Old rows often only have "model (VIN)" filled in, so the rest comes from customers.
+    cursor.execute('''
+        INSERT INTO repairs (vehicle, customer_name, car_model, vin, issue, status, start_date,
+                             assigned_mechanic, priority, estimated_hours, estimated_cost, end_date)
+        SELECT o.vehicle,
+               COALESCE(o.customer_name, c.name, ''),
+               COALESCE(o.car_model, c.car_model, ''),
+               o.parsed_vin,
+               COALESCE(o.issue, o.notes, c.issue),
+               COALESCE(o.status, 'Pending'),
+               o.start_date, o.assigned_mechanic, o.priority, o.estimated_hours,
+               COALESCE(o.estimated_cost, o.cost), o.end_date
+        FROM (SELECT *, COALESCE(vin, rtrim(substr(vehicle, instr(vehicle, '(') + 1), ')')) AS parsed_vin
+              FROM repairs_old) AS o
+        LEFT JOIN customers c ON c.id = (SELECT MIN(id) FROM customers WHERE vin = o.parsed_vin)
+        WHERE o.vehicle IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM repairs r WHERE r.vehicle = o.vehicle AND r.start_date IS o.start_date)
+        ORDER BY o.id
+    ''')
+    cursor.execute("DROP TABLE repairs_old")
+
+
+def _add_hot_query_indexes(cursor):
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_repairs_mechanic_start ON repairs(assigned_mechanic, start_date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_schedules_mechanic_start ON schedules(mechanic, start_time)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_repairs_vin ON repairs(vin)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_login_logs_time ON login_logs(login_time)")
+
+
+def _canonical_timestamps(cursor):
+    # Rewrite isoformat()/HH:MM/date-only values into the canonical form; junk text is left as is
+    cursor.connection.create_function('canonical_ts', 1, to_canonical, deterministic=True)
+    columns = [
+        ('repairs', 'start_date'), ('repairs', 'end_date'),
+        ('schedules', 'start_time'), ('schedules', 'end_time'),
+        ('customers', 'date_added'), ('inventory', 'last_ordered'),
+        ('login_logs', 'login_time'),
+    ]
+    for table, column in columns:
+        cursor.execute(f'''UPDATE {table} SET {column} = canonical_ts({column})
+                           WHERE canonical_ts({column}) IS NOT NULL AND canonical_ts({column}) != {column}''')
+
+
+def _add_repair_list_index(cursor):
+    # Keyset pagination of the Repairs tab walks (start_date, id) for admins
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_repairs_start ON repairs(start_date)")
+
+
+def _add_repairs_search(cursor):
+    # External-content FTS5 index: the text lives in repairs only, the triggers keep the index in step
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS repairs_fts USING fts5(
+            issue, vehicle, customer_name, car_model,
+            content='repairs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repairs_fts_insert AFTER INSERT ON repairs BEGIN
+            INSERT INTO repairs_fts(rowid, issue, vehicle, customer_name, car_model)
+            VALUES (new.id, new.issue, new.vehicle, new.customer_name, new.car_model);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repairs_fts_delete AFTER DELETE ON repairs BEGIN
+            INSERT INTO repairs_fts(repairs_fts, rowid, issue, vehicle, customer_name, car_model)
+            VALUES ('delete', old.id, old.issue, old.vehicle, old.customer_name, old.car_model);
+        END
+    ''')
+    # Status/mechanic changes do not touch the indexed text, so they skip the index
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repairs_fts_update
+        AFTER UPDATE OF issue, vehicle, customer_name, car_model ON repairs BEGIN
+            INSERT INTO repairs_fts(repairs_fts, rowid, issue, vehicle, customer_name, car_model)
+            VALUES ('delete', old.id, old.issue, old.vehicle, old.customer_name, old.car_model);
+            INSERT INTO repairs_fts(rowid, issue, vehicle, customer_name, car_model)
+            VALUES (new.id, new.issue, new.vehicle, new.customer_name, new.car_model);
+        END
+    ''')
+    cursor.execute("INSERT INTO repairs_fts(repairs_fts) VALUES ('rebuild')")
+    # ORDER BY rank uses these weights: a hit in the notes counts most
+    cursor.execute("INSERT INTO repairs_fts(repairs_fts, rank) VALUES ('rank', 'bm25(4.0, 2.0, 1.5, 1.0)')")
+
+
+def _add_login_rollup(cursor):
+    # One row per day, user and role; the trigger bumps it as each login is logged
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS login_daily (
+            day TEXT NOT NULL,
+            username TEXT NOT NULL,
+            role TEXT NOT NULL,
+            logins INTEGER NOT NULL,
+            PRIMARY KEY (day, username, role)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS login_daily_insert AFTER INSERT ON login_logs
+        WHEN new.login_time IS NOT NULL BEGIN
+            INSERT INTO login_daily (day, username, role, logins)
+            VALUES (substr(new.login_time, 1, 10), COALESCE(new.username, ''), COALESCE(new.role, ''), 1)
+            ON CONFLICT (day, username, role) DO UPDATE SET logins = logins + 1;
+        END
+    ''')
+    cursor.execute('''
+        INSERT INTO login_daily (day, username, role, logins)
+        SELECT substr(login_time, 1, 10), COALESCE(username, ''), COALESCE(role, ''), COUNT(*)
+        FROM login_logs WHERE login_time IS NOT NULL
+        GROUP BY 1, 2, 3
+    ''')
+    # Old log rows are moved here by LoginLogs.archive_login_logs, one zlib-compressed blob per month
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS login_logs_archive (
+            month TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+    ''')
+
+
+def _add_replenishment(cursor):
+    # Parts used per day; Replenishment forecasts demand from it
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS part_usage (
+            part_id INTEGER NOT NULL REFERENCES inventory(id) ON DELETE CASCADE,
+            day TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            PRIMARY KEY (part_id, day)
+        ) WITHOUT ROWID
+    ''')
+    # Covers the forecast's date-range read without going back to the table
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_part_usage_day ON part_usage(day, quantity)")
+    if 'lead_time_days' not in _table_columns(cursor, 'inventory'):
+        cursor.execute("ALTER TABLE inventory ADD COLUMN lead_time_days INTEGER NOT NULL DEFAULT 7")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS purchase_orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            supplier TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            total REAL NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS purchase_order_lines (
+            order_id INTEGER NOT NULL REFERENCES purchase_orders(id) ON DELETE CASCADE,
+            part_id INTEGER NOT NULL REFERENCES inventory(id),
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            PRIMARY KEY (order_id, part_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _add_repair_parts(cursor):
+    # Parts used on a repair, priced when they were taken from stock
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS repair_parts (
+            repair_id INTEGER NOT NULL REFERENCES repairs(id) ON DELETE CASCADE,
+            part_id INTEGER NOT NULL REFERENCES inventory(id),
+            quantity INTEGER NOT NULL CHECK (quantity > 0),
+            unit_price REAL NOT NULL,
+            PRIMARY KEY (repair_id, part_id)
+        ) WITHOUT ROWID
+    ''')
+    if 'parts_cost' not in _table_columns(cursor, 'repairs'):
+        cursor.execute("ALTER TABLE repairs ADD COLUMN parts_cost REAL NOT NULL DEFAULT 0")
+    # parts_cost and estimated_cost follow every change by its delta, so nothing is ever re-summed
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repair_parts_insert AFTER INSERT ON repair_parts BEGIN
+            UPDATE repairs SET parts_cost = round(parts_cost + new.quantity * new.unit_price, 2),
+                               estimated_cost = round(COALESCE(estimated_cost, 0) + new.quantity * new.unit_price, 2)
+            WHERE id = new.repair_id;
+            INSERT INTO part_usage (part_id, day, quantity) VALUES (new.part_id, date('now', 'localtime'), new.quantity)
+            ON CONFLICT (part_id, day) DO UPDATE SET quantity = quantity + excluded.quantity;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repair_parts_update AFTER UPDATE OF quantity, unit_price ON repair_parts BEGIN
+            UPDATE repairs SET
+                parts_cost = round(parts_cost + new.quantity * new.unit_price - old.quantity * old.unit_price, 2),
+                estimated_cost = round(COALESCE(estimated_cost, 0)
+                                       + new.quantity * new.unit_price - old.quantity * old.unit_price, 2)
+            WHERE id = new.repair_id;
+            INSERT INTO part_usage (part_id, day, quantity)
+            VALUES (new.part_id, date('now', 'localtime'), new.quantity - old.quantity)
+            ON CONFLICT (part_id, day) DO UPDATE SET quantity = quantity + excluded.quantity;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repair_parts_delete AFTER DELETE ON repair_parts BEGIN
+            UPDATE repairs SET parts_cost = round(parts_cost - old.quantity * old.unit_price, 2),
+                               estimated_cost = round(COALESCE(estimated_cost, 0) - old.quantity * old.unit_price, 2)
+            WHERE id = old.repair_id;
+        END
+    ''')
+    # Foreign keys are not enforced, so a deleted repair drops its part lines here
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS repairs_delete_parts AFTER DELETE ON repairs BEGIN
+            DELETE FROM repair_parts WHERE repair_id = old.id;
+        END
+    ''')
+
+
+def _add_stock_ledger(cursor):
+    # Append-only record of every change to a part's stock (StockLedger.record_movements writes it)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            part_id INTEGER NOT NULL REFERENCES inventory(id),
+            moved_at TEXT NOT NULL,
+            kind TEXT NOT NULL CHECK (kind IN ('opening', 'added', 'ordered', 'used', 'returned')),
+            quantity INTEGER NOT NULL,
+            unit_price REAL NOT NULL,
+            reference INTEGER
+        )
+    ''')
+    for action in ('UPDATE', 'DELETE'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS stock_movements_no_{action.lower()} BEFORE {action} ON stock_movements
+            BEGIN SELECT RAISE(ABORT, 'stock_movements is append-only'); END
+        ''')
+
+    # Summaries the Inventory dashboard reads; each is one row per part, supplier or month
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS part_activity (
+            part_id INTEGER PRIMARY KEY,
+            units_in INTEGER NOT NULL DEFAULT 0,
+            units_out INTEGER NOT NULL DEFAULT 0,
+            last_in_at TEXT,
+            last_out_at TEXT
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_part_activity_last_out ON part_activity(last_out_at)")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS stock_movement_monthly (
+            month TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            movements INTEGER NOT NULL,
+            units INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (month, kind)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS stock_movements_summaries AFTER INSERT ON stock_movements BEGIN
+            INSERT INTO part_activity (part_id, units_in, units_out, last_in_at, last_out_at)
+            VALUES (new.part_id, max(new.quantity, 0), max(-new.quantity, 0),
+                    CASE WHEN new.quantity > 0 THEN new.moved_at END,
+                    CASE WHEN new.quantity < 0 THEN new.moved_at END)
+            ON CONFLICT (part_id) DO UPDATE SET
+                units_in = units_in + excluded.units_in,
+                units_out = units_out + excluded.units_out,
+                last_in_at = COALESCE(max(last_in_at, excluded.last_in_at), last_in_at, excluded.last_in_at),
+                last_out_at = COALESCE(max(last_out_at, excluded.last_out_at), last_out_at, excluded.last_out_at);
+            INSERT INTO stock_movement_monthly (month, kind, movements, units, value)
+            VALUES (substr(new.moved_at, 1, 7), new.kind, 1, new.quantity, round(new.quantity * new.unit_price, 2))
+            ON CONFLICT (month, kind) DO UPDATE SET
+                movements = movements + 1,
+                units = units + excluded.units,
+                value = round(value + excluded.value, 2);
+        END
+    ''')
+
+    # Stock worth per supplier follows inventory itself, so price changes are counted too
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS supplier_stock (
+            supplier TEXT PRIMARY KEY,
+            parts INTEGER NOT NULL,
+            units INTEGER NOT NULL,
+            value REAL NOT NULL
+        )
+    ''')
+    add = '''
+            INSERT INTO supplier_stock (supplier, parts, units, value)
+            VALUES (COALESCE(new.supplier, ''), 1, COALESCE(new.quantity, 0),
+                    round(COALESCE(new.quantity * new.price, 0), 2))
+            ON CONFLICT (supplier) DO UPDATE SET parts = parts + 1, units = units + excluded.units,
+                                                 value = round(value + excluded.value, 2);'''
+    remove = '''
+            UPDATE supplier_stock SET parts = parts - 1, units = units - COALESCE(old.quantity, 0),
+                                      value = round(value - COALESCE(old.quantity * old.price, 0), 2)
+            WHERE supplier = COALESCE(old.supplier, '');
+            DELETE FROM supplier_stock WHERE supplier = COALESCE(old.supplier, '') AND parts = 0;'''
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS inventory_supplier_insert AFTER INSERT ON inventory BEGIN {add} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS inventory_supplier_delete AFTER DELETE ON inventory BEGIN {remove} END")
+    cursor.execute(f'''CREATE TRIGGER IF NOT EXISTS inventory_supplier_update
+                      AFTER UPDATE OF quantity, price, supplier ON inventory BEGIN {remove} {add} END''')
+
+    # Opening balances, so the ledger adds up to the stock that is already there.
+    # Older databases have parts without a price; those are valued at 0
+    cursor.execute('''
+        INSERT INTO stock_movements (part_id, moved_at, kind, quantity, unit_price)
+        SELECT id, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'), 'opening', quantity, COALESCE(price, 0)
+        FROM inventory WHERE quantity != 0
+    ''')
+    cursor.execute('''
+        INSERT INTO supplier_stock (supplier, parts, units, value)
+        SELECT COALESCE(supplier, ''), COUNT(*), COALESCE(SUM(quantity), 0), round(TOTAL(quantity * price), 2)
+        FROM inventory GROUP BY 1
+    ''')
+    # Last use before the ledger existed comes from the daily usage history
+    cursor.execute('''
+        INSERT INTO part_activity (part_id, last_out_at)
+        SELECT part_id, max(day) || ' 00:00:00' FROM part_usage WHERE quantity > 0 GROUP BY part_id
+        ON CONFLICT (part_id) DO UPDATE SET last_out_at = excluded.last_out_at
+    ''')
+
+
+# Ordered list of (version, description, step). Append only; never renumber.
+MIGRATIONS = [
+    (1, "baseline schema", _baseline_schema),
+    (2, "retire repairs_old and its foreign key", _retire_repairs_old),
+    (3, "indexes for calendar, report and login log queries", _add_hot_query_indexes),
+    (4, "canonical timestamps", _canonical_timestamps),
+    (5, "index for the paginated Repairs list", _add_repair_list_index),
+    (6, "full-text search over repairs", _add_repairs_search),
+    (7, "daily login rollup and log archive", _add_login_rollup),
+    (8, "part usage history and purchase orders", _add_replenishment),
+    (9, "parts used on repairs", _add_repair_parts),
+    (10, "stock movement ledger and inventory summaries", _add_stock_ledger),
+]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path=None):
+    """Apply every pending migration, each in its own transaction, and return the new version."""
+    conn = connect(db_path) if db_path else get_connection()
+    try:
+        version = schema_version(conn)
+        for target, description, step in MIGRATIONS:
+            if target <= version:
+                continue
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                step(cursor)
+                cursor.execute(f"PRAGMA user_version={target}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            print(f"Applied migration {target}: {description}")
+            version = target
+        return version
+    finally:
+        if db_path:
+            conn.close()
 
-    conn.commit()
-    conn.close()
 
 if __name__ == "__main__":
-    add_columns_if_missing()
+    migrate()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import Benchmark
+import DataAccess
+import Fixtures
+
+
+def start_virtual_display(size='1920x1080x24'):
+    """Start Xvfb on a free display and point DISPLAY at it; returns the process to stop later."""
+    for number in range(99, 140):
+        if not os.path.exists(f'/tmp/.X11-unix/X{number}') and not os.path.exists(f'/tmp/.X{number}-lock'):
+            break
+    display = f':{number}'
+    proc = subprocess.Popen(['Xvfb', display, '-screen', '0', size, '-nolisten', 'tcp'],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while not os.path.exists(f'/tmp/.X11-unix/X{number}'):
+        if proc.poll() is not None or time.time() > deadline:
+            proc.kill()
+            raise RuntimeError("Xvfb did not start")
+        time.sleep(0.05)
+    os.environ['DISPLAY'] = display
+    return proc
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+class RenderRun:
+    """Drives a CosmicApp and records wall time, widget count and calendar canvas items per operation."""
+
+    def __init__(self, root, app):
+        self.root = root
+        self.app = app
+        self.results = []
+
+    def settle(self):
+        # Let queued database jobs finish, then flush geometry and redraws
+        while self.app.db.busy:
+            self.root.update()
+            time.sleep(0.001)
+        self.root.update_idletasks()
+        self.root.update()
+
+    def wait_for_tabs(self):
+        while self.app.tabs.pending:
+            self.root.update()
+            time.sleep(0.001)
+
+    def measure(self, name, operation):
+        start = time.perf_counter()
+        operation()
+        self.settle()
+        elapsed = (time.perf_counter() - start) * 1000
+        canvas = getattr(self.app, 'calendar_view', None) or getattr(self.app, 'my_calendar_view', None)
+        self.results.append({'operation': name, 'ms': round(elapsed, 2),
+                             'widgets': count_widgets(self.root),
+                             'canvas_items': len(canvas.find_all()) if canvas else 0})
+
+    def run_all(self, months=12):
+        app = self.app
+        tabs = app.notebook.tabs()
+        names = {app.notebook.tab(tab, 'text'): tab for tab in tabs}
+        for tab in tabs:
+            self.measure(f"tab: {app.notebook.tab(tab, 'text')}", lambda tab=tab: app.notebook.select(tab))
+        for tab in tabs:
+            self.measure(f"tab again: {app.notebook.tab(tab, 'text')}", lambda tab=tab: app.notebook.select(tab))
+
+        # Admins page the Schedules tab, mechanics their own My Schedule tab
+        if 'Schedules' in names:
+            schedule_tab, calendar_tab = names['Schedules'], None
+        else:
+            schedule_tab = names['My Schedule']
+            calendar_tab = app.notebook.nametowidget(schedule_tab)
+        app.notebook.select(schedule_tab)
+        self.settle()
+        for _ in range(months):
+            self.measure("month: next", lambda: app.change_month(1, calendar_tab))
+        for _ in range(months):
+            self.measure("month: previous (cached)", lambda: app.change_month(-1, calendar_tab))
+
+        app.notebook.select(names['Repairs'])
+        self.settle()
+        self.measure("repairs: scroll to end of window", lambda: app.repairs_tree.yview_moveto(1.0))
+        self.measure("repairs: scroll to top", lambda: app.repairs_tree.yview_moveto(0.0))
+        first = app.repairs_tree.get_children()[:1]
+        if first:
+            app.repairs_tree.selection_set(first)
+            self.measure("repairs: mark repaired", app.mark_repaired)
+            self.measure("repairs: mark pending", app.mark_pending)
+        self.measure("repairs: refresh", app.update_repairs_display)
+
+        self.measure("theme: light", app.toggle_theme)
+        self.measure("theme: dark", app.toggle_theme)
+
+
+def run(rows, seed=0, fixture_dir=None, user_role='admin'):
+    import ttkbootstrap as ttk
+    from CosmicApp import CosmicApp
+
+    fixture_dir = fixture_dir or os.path.join(tempfile.gettempdir(), 'cosmic_garage_fixtures')
+    os.makedirs(fixture_dir, exist_ok=True)
+    # Status changes write, so work on a copy and keep the cached fixture pristine
+    source = Benchmark.fixture_path(fixture_dir, rows, seed)
+    db_path = os.path.join(fixture_dir, f"render_{rows}_seed{seed}.db")
+    with open(source, 'rb') as src, open(db_path, 'wb') as dst:
+        dst.write(src.read())
+    DataAccess.configure(db_path)
+
+    root = ttk.Window(themename="cyborg")
+    try:
+        start = time.perf_counter()
+        mechanic = None if user_role == 'admin' else Fixtures.mechanic_names(rows)[0]
+        app = CosmicApp(root, user_role=user_role, mechanic_name=mechanic)
+        # Time to interactive: the first tab is built and painted, the others are still pending
+        root.update_idletasks()
+        bench = RenderRun(root, app)
+        bench.results.append({'operation': 'startup', 'ms': round((time.perf_counter() - start) * 1000, 2),
+                              'widgets': count_widgets(root), 'canvas_items': 0})
+        bench.measure("idle warm-up of the other tabs", bench.wait_for_tabs)
+        # Selecting a repair would open its details window and skew the timings
+        app.repairs_tree.unbind('<<TreeviewSelect>>')
+        bench.run_all()
+        return bench.results
+    finally:
+        root.destroy()
+        DataAccess.close_all()
+
+
+def print_table(results, baseline=None):
+    before = {}
+    for r in baseline or []:
+        before.setdefault(r['operation'], r['ms'])
+    print(f"{'operation':<34}{'ms':>10}{'widgets':>10}{'canvas':>10}")
+    for r in results:
+        ratio = f"  ({r['ms'] / before[r['operation']]:.2f}x)" if before.get(r['operation']) else ''
+        print(f"{r['operation']:<34}{r['ms']:>10.1f}{r['widgets']:>10}{r['canvas_items']:>10}{ratio}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time CosmicApp's UI operations under a virtual X server.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--role', default='admin', choices=('admin', 'mechanic'))
+    parser.add_argument('--fixtures', default=None)
+    parser.add_argument('--use-display', action='store_true', help="render on $DISPLAY instead of starting Xvfb")
+    parser.add_argument('--json', default='render_benchmark.json')
+    parser.add_argument('--compare', default=None, help="earlier results JSON to show ratios against")
+    args = parser.parse_args(argv)
+
+    xvfb = None if args.use_display else start_virtual_display()
+    try:
+        results = run(args.rows, args.seed, args.fixtures, args.role)
+    finally:
+        if xvfb:
+            xvfb.terminate()
+            xvfb.wait()
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+    print_table(results, baseline)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump({'commit': Benchmark._git_commit(), 'date': datetime.now().isoformat(timespec='seconds'),
+                   'python': platform.python_version(), 'rows': args.rows, 'seed': args.seed,
+                   'role': args.role, 'results': results}, f, indent=2)
+    print(f"Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
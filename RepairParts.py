@@ -0,0 +1,66 @@
+from DataAccess import unit_of_work
+from StockLedger import record_movements, record_usage
+
+
+class OutOfStock(Exception):
+    """Raised with the (part name, in stock, wanted) of every part there is not enough of."""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(', '.join(f"{name}: {available} in stock, {wanted} wanted"
+                                   for name, available, wanted in shortages))
+
+
+def repair_parts(conn, repair_id):
+    """(part id, part name, quantity, unit price) of the parts used on a repair; the price is
+    averaged over the quantities taken when a part was added more than once."""
+    return conn.execute('''SELECT rp.part_id, i.part_name, rp.quantity, rp.unit_price
+                           FROM repair_parts rp JOIN inventory i ON i.id = rp.part_id
+                           WHERE rp.repair_id = ? ORDER BY i.part_name''', (repair_id,)).fetchall()
+
+
+def attach_parts(conn, repair_id, lines):
+    """Take the parts in lines [(part id, quantity)] from stock and add them to a repair.
+
+    Either every part is available and all of them are booked, or OutOfStock is raised
+    and nothing changes. Costs and usage follow through the repair_parts triggers.
+    Returns the repair's new (parts_cost, estimated_cost).
+    """
+    wanted = {}
+    for part_id, quantity in lines:
+        wanted[part_id] = wanted.get(part_id, 0) + quantity
+    with unit_of_work(conn):
+        # One statement per part; a row is only updated if there is enough of it
+        cursor = conn.executemany('UPDATE inventory SET quantity = quantity - ? WHERE id = ? AND quantity >= ?',
+                                  [(qty, part_id, qty) for part_id, qty in wanted.items()])
+        if cursor.rowcount != len(wanted):
+            marks = ','.join('?' * len(wanted))
+            stock = {pid: (name, qty) for pid, name, qty in conn.execute(
+                f'SELECT id, part_name, quantity FROM inventory WHERE id IN ({marks})', list(wanted))}
+            # The failed rows were not updated, so their quantity is still what is in stock
+            raise OutOfStock([(stock[pid][0], stock[pid][1], qty) if pid in stock else (f"#{pid}", 0, qty)
+                              for pid, qty in wanted.items() if pid not in stock or stock[pid][1] < qty])
+        conn.executemany('''INSERT INTO repair_parts (repair_id, part_id, quantity, unit_price)
+                            SELECT ?, id, ?, COALESCE(price, 0) FROM inventory WHERE id = ?
+                            ON CONFLICT (repair_id, part_id) DO UPDATE SET
+                                quantity = quantity + excluded.quantity,
+                                -- Quantity-weighted, so earlier parts keep the price they were taken at
+                                unit_price = (quantity * unit_price + excluded.quantity * excluded.unit_price)
+                                             / (quantity + excluded.quantity)''',
+                         [(repair_id, qty, part_id) for part_id, qty in wanted.items()])
+        record_movements(conn, [(part_id, 'used', -qty, repair_id) for part_id, qty in wanted.items()])
+        return conn.execute('SELECT parts_cost, estimated_cost FROM repairs WHERE id = ?', (repair_id,)).fetchone()
+
+
+def detach_part(conn, repair_id, part_id):
+    """Put a repair's part back into stock. Returns the repair's new (parts_cost, estimated_cost)."""
+    with unit_of_work(conn):
+        row = conn.execute('SELECT quantity, unit_price FROM repair_parts WHERE repair_id = ? AND part_id = ?',
+                           (repair_id, part_id)).fetchone()
+        if row:
+            conn.execute('DELETE FROM repair_parts WHERE repair_id = ? AND part_id = ?', (repair_id, part_id))
+            conn.execute('UPDATE inventory SET quantity = quantity + ? WHERE id = ?', (row[0], part_id))
+            record_movements(conn, [(part_id, 'returned', row[0], repair_id, row[1])])
+            # Returned parts were not used after all
+            record_usage(conn, part_id, -row[0])
+        return conn.execute('SELECT parts_cost, estimated_cost FROM repairs WHERE id = ?', (repair_id,)).fetchone()
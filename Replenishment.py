@@ -0,0 +1,144 @@
+import argparse
+import os
+import time
+from datetime import date, timedelta
+from statistics import NormalDist
+
+import numpy as np
+
+from DataAccess import connect, get_connection, unit_of_work
+from StockLedger import record_movements
+from Timestamps import now_timestamp
+
+# Demand is forecast from this many days of part_usage, recent days weighing more
+HISTORY_DAYS = int(os.environ.get('COSMIC_REORDER_HISTORY_DAYS', 90))
+HALF_LIFE_DAYS = 30
+# Chance of not running out before a reorder arrives
+SERVICE_LEVEL = 0.95
+# Stock bought on top of the reorder point: this many days of demand
+REVIEW_DAYS = 14
+
+
+class ReorderPlan:
+    """Reorder point and suggested quantity for every part; columns are numpy arrays in part id order."""
+
+    def __init__(self, ids, names, suppliers, quantity, price, daily_demand, reorder_point, suggested):
+        self.ids = ids
+        self.names = names
+        self.suppliers = suppliers
+        self.quantity = quantity
+        self.price = price
+        self.daily_demand = daily_demand
+        self.reorder_point = reorder_point
+        self.suggested = suggested
+
+    def rows(self):
+        """(id, name, supplier, quantity, reorder point, suggested) for the parts that need ordering."""
+        return [(int(self.ids[i]), self.names[i], self.suppliers[i], int(self.quantity[i]),
+                 round(float(self.reorder_point[i]), 1), int(self.suggested[i]))
+                for i in np.flatnonzero(self.suggested)]
+
+    def by_supplier(self):
+        """{supplier: [(part id, quantity, unit price)]}; parts without a supplier can't be ordered."""
+        orders = {}
+        for i in np.flatnonzero(self.suggested):
+            if self.suppliers[i]:
+                orders.setdefault(self.suppliers[i], []).append(
+                    (int(self.ids[i]), int(self.suggested[i]), float(self.price[i])))
+        return orders
+
+
+def usage_matrix(conn, ids, first_day, days):
+    """Parts x days array of quantities used, rows in the order of the sorted `ids`."""
+    matrix = np.zeros((len(ids), days))
+    usage = conn.execute('''SELECT part_id, CAST(julianday(day) - julianday(?) AS INTEGER), quantity
+                            FROM part_usage WHERE day >= ? AND day < ?''',
+                         (first_day.isoformat(), first_day.isoformat(),
+                          (first_day + timedelta(days=days)).isoformat())).fetchall()
+    if usage and len(ids):
+        part_ids, offsets, quantities = np.array(usage, dtype=np.int64).T
+        rows = np.minimum(np.searchsorted(ids, part_ids), len(ids) - 1)
+        known = ids[rows] == part_ids  # usage of parts that were deleted since
+        matrix[rows[known], offsets[known]] = quantities[known]
+    return matrix
+
+
+def compute_reorder_plan(conn, today=None, history_days=HISTORY_DAYS, half_life=HALF_LIFE_DAYS,
+                         service_level=SERVICE_LEVEL, review_days=REVIEW_DAYS):
+    """Forecast daily demand of every part and work out what to order.
+
+    Demand is the exponentially weighted mean (and spread) of the last `history_days`
+    days of usage. A part is reordered once its stock is at or below
+    demand * lead time + safety stock, and then topped up with `review_days` of demand.
+    """
+    today = today or date.today()
+    parts = conn.execute('SELECT id, part_name, supplier, quantity, COALESCE(price, 0), lead_time_days '
+                         'FROM inventory ORDER BY id').fetchall()
+    ids = np.array([p[0] for p in parts], dtype=np.int64)
+    names = [p[1] for p in parts]
+    suppliers = [p[2] for p in parts]
+    quantity = np.array([p[3] for p in parts], dtype=float)
+    price = np.array([p[4] for p in parts], dtype=float)
+    lead_time = np.array([p[5] for p in parts], dtype=float)
+
+    matrix = usage_matrix(conn, ids, today - timedelta(days=history_days), history_days)
+    age = np.arange(history_days - 1, -1, -1)
+    weights = 0.5 ** (age / half_life)
+    weights /= weights.sum()
+    demand = matrix @ weights
+    spread = np.sqrt(np.square(matrix - demand[:, None]) @ weights)
+
+    z = NormalDist().inv_cdf(service_level)
+    reorder_point = demand * lead_time + z * spread * np.sqrt(lead_time)
+    target = reorder_point + demand * review_days
+    suggested = np.where((quantity <= reorder_point) & (demand > 0), np.ceil(target - quantity), 0)
+    return ReorderPlan(ids, names, suppliers, quantity, price, demand, reorder_point,
+                       np.maximum(suggested, 0).astype(np.int64))
+
+
+def place_orders(conn, orders, ordered_at=None):
+    """Raise one purchase order per supplier and book the parts into stock, all in one transaction.
+
+    orders is {supplier: [(part id, quantity, unit price)]}, as ReorderPlan.by_supplier() gives.
+    Returns {supplier: purchase order id}.
+    """
+    ordered_at = ordered_at or now_timestamp()
+    placed = {}
+    with unit_of_work(conn):
+        for supplier, lines in orders.items():
+            total = sum(qty * price for _, qty, price in lines)
+            cursor = conn.execute('INSERT INTO purchase_orders (supplier, created_at, total) VALUES (?, ?, ?)',
+                                  (supplier, ordered_at, round(total, 2)))
+            order_id = cursor.lastrowid
+            conn.executemany('INSERT INTO purchase_order_lines (order_id, part_id, quantity, unit_price) '
+                             'VALUES (?, ?, ?, ?)', [(order_id, pid, qty, price) for pid, qty, price in lines])
+            conn.executemany('UPDATE inventory SET quantity = quantity + ?, last_ordered = ? WHERE id = ?',
+                             [(qty, ordered_at, pid) for pid, qty, _ in lines])
+            record_movements(conn, [(pid, 'ordered', qty, order_id) for pid, qty, _ in lines], ordered_at)
+            placed[supplier] = order_id
+    return placed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Work out reorder points and raise purchase orders.")
+    parser.add_argument('--db', default=None)
+    parser.add_argument('--history-days', type=int, default=HISTORY_DAYS)
+    parser.add_argument('--place', action='store_true', help="raise the purchase orders instead of only listing them")
+    args = parser.parse_args(argv)
+
+    conn = connect(args.db) if args.db else get_connection()
+    start = time.perf_counter()
+    plan = compute_reorder_plan(conn, history_days=args.history_days)
+    elapsed = (time.perf_counter() - start) * 1000
+    rows = plan.rows()
+    print(f"{'part':<28}{'supplier':<18}{'stock':>8}{'reorder at':>12}{'order':>8}")
+    for _, name, supplier, qty, reorder_point, suggested in rows:
+        print(f"{name[:27]:<28}{(supplier or '-')[:17]:<18}{qty:>8}{reorder_point:>12}{suggested:>8}")
+    print(f"{len(rows)} of {len(plan.ids)} parts need ordering (planned in {elapsed:.0f} ms)")
+    if args.place:
+        placed = place_orders(conn, plan.by_supplier())
+        print(f"Raised {len(placed)} purchase orders: {', '.join(f'#{i} {s}' for s, i in placed.items())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import queue
+import threading
+from collections import OrderedDict
+
+from DataAccess import get_connection
+from Timestamps import parse_timestamp
+
+
+def adjacent_months(year, month):
+    previous = (year - 1, 12) if month == 1 else (year, month - 1)
+    following = (year + 1, 1) if month == 12 else (year, month + 1)
+    return previous, following
+
+
+class MonthScheduleCache:
+    """LRU cache of calendar data keyed by (mechanic, year, month).
+
+    loader(conn, mechanic, year, month) reads one month from the database. Writes call
+    one of the invalidate methods for the months they touch; the months either side
+    of the one on screen are loaded by a background thread with its own connection.
+    """
+
+    def __init__(self, loader, capacity=36):
+        self.loader = loader
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._cleared = 0  # bumped by clear(), which invalidates every key at once
+        self._lock = threading.Lock()
+        self._prefetch_queue = queue.Queue()
+        self._prefetch_thread = None
+
+    def get(self, conn, mechanic, year, month):
+        key = (mechanic, year, month)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            version = self._version(key)
+        data = self.loader(conn, mechanic, year, month)
+        self._store(key, version, data)
+        return data
+
+    def invalidate(self, mechanic, year, month):
+        key = (mechanic, year, month)
+        with self._lock:
+            self._entries.pop(key, None)
+            # A prefetch that started before this write must not store its stale result
+            self._versions[key] = self._versions.get(key, 0) + 1
+
+    def clear(self):
+        """Invalidate every month, for writes that touch more than a few (imports)."""
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._cleared += 1
+
+    def invalidate_at(self, mechanic, timestamp):
+        """Invalidate the month a stored timestamp falls in (no-op for unparseable values)."""
+        dt = parse_timestamp(timestamp)
+        if mechanic and dt:
+            self.invalidate(mechanic, dt.year, dt.month)
+
+    def prefetch_adjacent(self, mechanic, year, month):
+        for y, m in adjacent_months(year, month):
+            with self._lock:
+                cached = (mechanic, y, m) in self._entries
+            if not cached:
+                self._prefetch_queue.put((mechanic, y, m))
+        if self._prefetch_thread is None:
+            self._prefetch_thread = threading.Thread(target=self._prefetch_loop, daemon=True)
+            self._prefetch_thread.start()
+
+    def _version(self, key):
+        # Call with the lock held
+        return self._cleared, self._versions.get(key, 0)
+
+    def _store(self, key, version, data):
+        with self._lock:
+            if self._version(key) != version:
+                return
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def _prefetch_loop(self):
+        while True:
+            key = self._prefetch_queue.get()
+            with self._lock:
+                if key in self._entries:
+                    continue
+                version = self._version(key)
+            try:
+                data = self.loader(get_connection(), *key)
+            except Exception:
+                continue
+            self._store(key, version, data)
@@ -0,0 +1,138 @@
+from bisect import bisect_left
+from datetime import datetime, time, timedelta
+
+from Timestamps import parse_timestamp
+
+# Free slots are only offered inside working hours, [start, end) of each day
+WORK_DAY = (time(8, 0), time(18, 0))
+# A repair keeps its mechanic busy for its estimated hours from its start date, or this long
+DEFAULT_REPAIR_HOURS = 1.0
+
+
+class ScheduleConflict(Exception):
+    def __init__(self, key, start, end):
+        self.key = key  # ('schedule', id) or ('repair', id)
+        self.start = start
+        self.end = end
+        super().__init__(f"Overlaps {key[0]} #{key[1]} ({start:%Y-%m-%d %H:%M} - {end:%H:%M})")
+
+
+class MechanicSchedule:
+    """One mechanic's busy intervals, sorted by start, with the running latest end.
+
+    Every interval starting before `end` sits left of bisect(starts, end); one of them
+    overlaps [start, end) exactly when the one among them that ends last ends after
+    `start`. latest[i] is the index of that interval for the first i + 1 entries, so
+    an overlap test is one binary search and one comparison, however the intervals nest.
+    """
+
+    def __init__(self, intervals):
+        self._intervals = intervals = sorted(intervals)
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.keys = [key for _, _, key in intervals]
+        self.latest = []
+        last = -1
+        for i, end in enumerate(self.ends):
+            if last < 0 or end > self.ends[last]:
+                last = i
+            self.latest.append(last)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def without(self, key):
+        """The same schedule minus one entry, e.g. the schedule being edited."""
+        return MechanicSchedule([interval for interval in self._intervals if interval[2] != key])
+
+    def conflict(self, start, end):
+        """The (key, start, end) of an interval overlapping [start, end), or None."""
+        i = bisect_left(self.starts, end) - 1
+        if i < 0:
+            return None
+        j = self.latest[i]
+        if self.ends[j] > start:
+            return self.keys[j], self.starts[j], self.ends[j]
+        return None
+
+    def next_free_slot(self, after, hours, work_day=WORK_DAY, horizon_days=366):
+        """Start of the first free `hours`-long slot at or after `after`, inside working hours.
+
+        Each clash jumps past the latest end that blocks the candidate, so the cost is one
+        conflict() per separate busy stretch (or day) skipped.
+        """
+        length = timedelta(hours=hours)
+        day_start, day_end = work_day
+        if length > datetime.combine(after.date(), day_end) - datetime.combine(after.date(), day_start):
+            return None
+        candidate = after
+        limit = after + timedelta(days=horizon_days)
+        while candidate < limit:
+            opens = datetime.combine(candidate.date(), day_start)
+            if candidate < opens:
+                candidate = opens
+            if candidate + length > datetime.combine(candidate.date(), day_end):
+                candidate = datetime.combine(candidate.date() + timedelta(days=1), day_start)
+                continue
+            clash = self.conflict(candidate, candidate + length)
+            if clash is None:
+                return candidate
+            # Every start before the clashing interval's end overlaps it
+            candidate = clash[2]
+        return None
+
+
+def load_schedule(conn, mechanic):
+    """Build a MechanicSchedule from the mechanic's schedules and dated repairs."""
+    intervals = []
+    for sid, start, end in conn.execute('SELECT id, start_time, end_time FROM schedules WHERE mechanic=?',
+                                        (mechanic,)):
+        start, end = parse_timestamp(start), parse_timestamp(end)
+        if start and end and end > start:
+            intervals.append((start, end, ('schedule', sid)))
+    for rid, start, hours in conn.execute('''SELECT id, start_date, estimated_hours FROM repairs
+                                             WHERE assigned_mechanic=? AND start_date IS NOT NULL''', (mechanic,)):
+        start = parse_timestamp(start)
+        if start:
+            intervals.append((start, start + timedelta(hours=hours or DEFAULT_REPAIR_HOURS), ('repair', rid)))
+    return MechanicSchedule(intervals)
+
+
+class ScheduleIndex:
+    """MechanicSchedules loaded on first use and kept until a write invalidates them (Tk thread only)."""
+
+    def __init__(self):
+        self._schedules = {}  # (mechanic, ignored key or None) -> MechanicSchedule
+
+    def get(self, conn, mechanic, ignore=None):
+        """The mechanic's schedule, minus the entry keyed `ignore` when one is being edited."""
+        schedule = self._schedules.get((mechanic, ignore))
+        if schedule is None:
+            if ignore is None:
+                schedule = load_schedule(conn, mechanic)
+            else:
+                schedule = self.get(conn, mechanic).without(ignore)
+            self._schedules[(mechanic, ignore)] = schedule
+        return schedule
+
+    def invalidate(self, mechanic=None):
+        """Forget one mechanic, or everyone when mechanic is None."""
+        if mechanic is None:
+            self._schedules.clear()
+        else:
+            for key in [key for key in self._schedules if key[0] == mechanic]:
+                del self._schedules[key]
+
+
+def check_free(conn, mechanic, start, end, ignore=None):
+    """Raise ScheduleConflict if [start, end) overlaps the mechanic's schedule as stored right now.
+
+    ignore is the key of the entry being edited, which may overlap its old self.
+    Meant for the write transaction itself, so two dialogs can't book the same time.
+    """
+    schedule = load_schedule(conn, mechanic)
+    if ignore:
+        schedule = schedule.without(ignore)
+    clash = schedule.conflict(parse_timestamp(start), parse_timestamp(end))
+    if clash:
+        raise ScheduleConflict(*clash)
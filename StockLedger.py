@@ -0,0 +1,58 @@
+from datetime import date, datetime, timedelta
+
+from Timestamps import format_timestamp, now_timestamp
+
+# Parts with stock that none has been taken from for this many days count as not moving
+STALE_DAYS = 90
+
+
+def record_movements(conn, movements, moved_at=None):
+    """Append (part id, kind, quantity, reference[, unit price]) rows to the stock ledger.
+
+    quantity is signed: negative for stock leaving. Rows without a unit price are priced
+    at the part's current price, 0 if it has none; returns pass the price the parts
+    were taken at, so a take and its return cancel out. The part_activity and
+    stock_movement_monthly summaries follow through the ledger's trigger. Call it in
+    the transaction that changes the stock.
+    """
+    moved_at = moved_at or now_timestamp()
+    rows = []
+    for part_id, kind, quantity, reference, *unit_price in movements:
+        if quantity:
+            rows.append((moved_at, kind, quantity, unit_price[0] if unit_price else None, reference, part_id))
+    conn.executemany('''INSERT INTO stock_movements (part_id, moved_at, kind, quantity, unit_price, reference)
+                        SELECT id, ?, ?, ?, COALESCE(?, price, 0), ? FROM inventory WHERE id = ?''', rows)
+
+
+def record_usage(conn, part_id, quantity, day=None):
+    """Add `quantity` used parts to the part's part_usage total for `day` (default today)."""
+    conn.execute('''INSERT INTO part_usage (part_id, day, quantity) VALUES (?, ?, ?)
+                    ON CONFLICT (part_id, day) DO UPDATE SET quantity = quantity + excluded.quantity''',
+                 (part_id, (day or date.today()).isoformat(), quantity))
+
+
+def supplier_valuation(conn):
+    """(supplier, parts, units, value) per supplier, most valuable first; '' is no supplier."""
+    return conn.execute('SELECT supplier, parts, units, value FROM supplier_stock ORDER BY value DESC').fetchall()
+
+
+def stale_parts(conn, days=STALE_DAYS, limit=100, now=None):
+    """(id, part, supplier, quantity, value, last used) of parts in stock that have not been used for `days`.
+
+    Parts without a price are valued at 0. Reads one summary row per part, so the
+    cost does not grow with the ledger.
+    """
+    cutoff = format_timestamp((now or datetime.now()) - timedelta(days=days))
+    return conn.execute('''SELECT i.id, i.part_name, i.supplier, i.quantity, round(i.quantity * COALESCE(i.price, 0), 2),
+                                  a.last_out_at
+                           FROM inventory i LEFT JOIN part_activity a ON a.part_id = i.id
+                           WHERE i.quantity > 0 AND (a.last_out_at IS NULL OR a.last_out_at < ?)
+                           ORDER BY 5 DESC LIMIT ?''', (cutoff, limit)).fetchall()
+
+
+def monthly_movements(conn, months=6, now=None):
+    """(month, kind, movements, units, value) for the last `months` months, newest first."""
+    now = now or datetime.now()
+    year, month = divmod(now.year * 12 + now.month - 1 - (months - 1), 12)
+    return conn.execute('''SELECT month, kind, movements, units, value FROM stock_movement_monthly
+                           WHERE month >= ? ORDER BY month DESC, kind''', (f"{year:04d}-{month + 1:02d}",)).fetchall()
@@ -0,0 +1,159 @@
+import tkinter as tk
+
+# Named palettes; every colour the app paints comes from the active one
+DARK = {
+    'ttk_theme': 'cyborg',
+    'bg': "#22304a",
+    'accent': "#4a6fa5",
+    'highlight': "#00cfff",
+    'text': "#FFFFFF",
+    'title_text': "#222",  # dark text on the accent title bar for contrast
+    'danger': "#b22222",
+    'danger_text': "#fff",
+    'frame_border': "#00cfff",
+    # Calendar
+    'calendar_header_bg': "#4a6fa5",
+    'calendar_header_fg': "#00cfff",
+    'calendar_border': "#4a6fa5",
+    'calendar_cell': "#e0e0e0",
+    'calendar_today': "#b0b0b0",
+    'calendar_today_outline': "#fff",
+    'calendar_done': "#a8ffb0",
+    'calendar_late': "#ffe066",
+    'calendar_task': "#5ecfff",
+    'calendar_service': "#ffd580",
+    'calendar_done_strong': "#4CAF50",
+    'calendar_done_text': "#fff",
+    'calendar_button': "#b0b0b0",
+    'calendar_outline': "#888",
+    'calendar_text': "#222",
+}
+
+LIGHT = dict(
+    DARK,
+    ttk_theme='flatly',
+    bg="white",
+    accent="#f0f0f0",
+    highlight="#0077b6",
+    text="#222",
+    title_text="#222",
+    frame_border="gray",
+    calendar_header_bg="#d0d8e4",
+    calendar_header_fg="#22304a",
+    calendar_border="#b0b0b0",
+    calendar_today_outline="#22304a",
+)
+
+PALETTES = {'dark': DARK, 'light': LIGHT}
+
+
+class Theme:
+    """Switches between named palettes with a fixed amount of work.
+
+    ttk widgets follow their styles, so a switch is one theme_use plus the style
+    configures in apply_styles(). Classic tk widgets can't be styled: they are
+    registered with the palette role of each colour option and only those are
+    repainted. Anything else that draws colours (the calendar canvas) subscribes
+    with on_change(callback), which gets the new palette.
+    """
+
+    def __init__(self, style, palettes=None, name='dark'):
+        self.style = style
+        self.palettes = palettes or PALETTES
+        self.name = name
+        self._widgets = {}  # widget path -> (widget, {option: palette role})
+        self._listeners = []
+
+    @property
+    def palette(self):
+        return self.palettes[self.name]
+
+    def __getitem__(self, role):
+        return self.palette[role]
+
+    def register(self, widget, **roles):
+        """Paint widget now and on every switch, e.g. register(label, bg='accent', fg='title_text')."""
+        self._widgets[str(widget)] = (widget, roles)
+        widget.configure(**{option: self.palette[role] for option, role in roles.items()})
+        return widget
+
+    def on_change(self, callback):
+        self._listeners.append(callback)
+
+    def use(self, name):
+        self.name = name
+        palette = self.palette
+        self.style.theme_use(palette['ttk_theme'])
+        self.apply_styles()
+        for path, (widget, roles) in list(self._widgets.items()):
+            try:
+                if not widget.winfo_exists():
+                    del self._widgets[path]
+                    continue
+                widget.configure(**{option: palette[role] for option, role in roles.items()})
+            except tk.TclError:  # destroyed between the check and the configure
+                del self._widgets[path]
+        for callback in self._listeners:
+            callback(palette)
+
+    def toggle(self):
+        self.use('light' if self.name == 'dark' else 'dark')
+
+    def apply_styles(self):
+        p = self.palette
+        style = self.style
+        style.configure('.', font=('Orbitron', 14))
+        style.configure('TButton', font=('Orbitron', 14))
+        style.configure('Treeview.Heading', font=('Orbitron', 16, 'bold'))
+        style.configure('Treeview', font=('Orbitron', 14), rowheight=35)
+        style.configure('TEntry', font=('Orbitron', 14))
+        style.configure('Header.TLabel', font=('Orbitron', 28, 'bold'), background=p['accent'], foreground=p['text'])
+        style.configure('TLabel', background=p['bg'], foreground=p['text'])
+        style.configure('Highlight.TLabel', background=p['bg'], foreground=p['highlight'])
+        style.configure('TLabelframe', background=p['bg'], foreground=p['text'], bordercolor=p['frame_border'])
+        style.configure('TLabelframe.Label', background=p['bg'], foreground=p['text'])
+        # Forms drawn on the accent colour
+        style.configure('Panel.TLabelframe', background=p['accent'], foreground=p['text'],
+                        bordercolor=p['frame_border'])
+        style.configure('Panel.TLabelframe.Label', font=('Orbitron', 14, 'bold'), background=p['accent'],
+                        foreground=p['text'])
+        style.configure('Panel.TLabel', font=('Orbitron', 12), background=p['accent'], foreground=p['text'])
+
+
+def add_titlebar(window, theme, title, exit_callback, height=16):
+    """Borderless title bar with close/minimise and window dragging, painted from the theme."""
+    window.overrideredirect(True)
+    titlebar = theme.register(tk.Frame(window, relief="raised", bd=0, highlightthickness=0), bg='accent')
+    titlebar.pack(fill=tk.X, side=tk.TOP)
+    title_label = theme.register(tk.Label(titlebar, text=title, font=("Orbitron", 14, "bold")),
+                                 bg='accent', fg='title_text')
+    title_label.pack(side=tk.LEFT, padx=10, pady=2)
+    exit_btn = theme.register(
+        tk.Button(titlebar, text="✕", borderwidth=0, font=("Arial", 14, "bold"), command=exit_callback),
+        bg='accent', fg='title_text', activebackground='danger', activeforeground='danger_text'
+    )
+    exit_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
+    min_btn = theme.register(
+        tk.Button(titlebar, text="—", borderwidth=0, font=("Arial", 14, "bold"), command=window.iconify),
+        bg='accent', fg='title_text', activebackground='bg', activeforeground='highlight'
+    )
+    min_btn.pack(side=tk.RIGHT, padx=(0, 2), pady=2)
+
+    def start_move(event):
+        window._drag_start_x = event.x_root
+        window._drag_start_y = event.y_root
+        window._win_x = window.winfo_x()
+        window._win_y = window.winfo_y()
+
+    def do_move(event):
+        if hasattr(window, '_drag_start_x'):
+            dx = event.x_root - window._drag_start_x
+            dy = event.y_root - window._drag_start_y
+            window.geometry(f"+{window._win_x + dx}+{window._win_y + dy}")
+
+    titlebar.bind("<ButtonPress-1>", start_move)
+    titlebar.bind("<B1-Motion>", do_move)
+    # Margin below the title bar
+    if height > 0:
+        theme.register(tk.Frame(window, height=height), bg='bg').pack(fill=tk.X)
+    return titlebar
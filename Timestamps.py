@@ -0,0 +1,47 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Every stored timestamp uses this sortable form, so range predicates work on the raw column
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Only needed for values written before the canonical format existed
+_LEGACY_FORMATS = ('%Y-%m-%d-%H:%M', '%d.%m.%Y %H:%M', '%d.%m.%Y')
+
+
+def now_timestamp():
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def format_timestamp(dt):
+    return dt.strftime(TIMESTAMP_FORMAT)
+
+
+@lru_cache(maxsize=8192)
+def parse_timestamp(value):
+    """Parse a stored timestamp into a datetime, or return None if it is not a date at all."""
+    if not value:
+        return None
+    try:
+        # C fast path: handles the canonical form as well as isoformat() and plain dates
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+    for fmt in _LEGACY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def to_canonical(value):
+    """Normalize any accepted timestamp text to TIMESTAMP_FORMAT; None if it cannot be parsed."""
+    dt = parse_timestamp(value)
+    return dt.replace(microsecond=0).strftime(TIMESTAMP_FORMAT) if dt else None
+
+
+def month_bounds(year, month):
+    """Half-open [start, end) canonical bounds of a calendar month."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return format_timestamp(start), format_timestamp(end)
@@ -0,0 +1,75 @@
+class TreeSync:
+    """Keeps a flat Treeview in step with rows keyed by primary key.
+
+    Rows are (key, *values) and the key becomes the item id. Instead of deleting and
+    re-inserting everything, only the insert/item/move/delete calls that turn the
+    current items into the new rows are issued. All changes to the tree should go
+    through this object so that it can tell which values actually changed.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.columns = list(tree['columns'])
+        self._values = {}
+
+    def sync(self, rows):
+        """Reconcile the whole tree with `rows`, given in display order."""
+        new_ids = [str(row[0]) for row in rows]
+        wanted = set(new_ids)
+        stale = [iid for iid in self.tree.get_children() if iid not in wanted]
+        self._delete(stale)
+
+        order = list(self.tree.get_children())
+        for index, row in enumerate(rows):
+            iid, values = new_ids[index], tuple(row[1:])
+            if index < len(order) and order[index] == iid:
+                self._set_values(iid, values)
+                continue
+            if iid in self._values:
+                self.tree.move(iid, '', index)
+                order.remove(iid)
+                self._set_values(iid, values)
+            else:
+                self.tree.insert('', index, iid=iid, values=values)
+                self._values[iid] = values
+            order.insert(index, iid)
+
+    def upsert(self, row, index='end'):
+        """Insert one row, or update its values in place if it is already shown."""
+        iid, values = str(row[0]), tuple(row[1:])
+        if iid in self._values:
+            self._set_values(iid, values)
+        else:
+            self.tree.insert('', index, iid=iid, values=values)
+            self._values[iid] = values
+
+    def patch(self, key, changes):
+        """Change some columns ({column id: value}) of a shown row; False if it is not shown."""
+        iid = str(key)
+        if iid not in self._values:
+            return False
+        values = list(self._values[iid])
+        for column, value in changes.items():
+            values[self.columns.index(column)] = value
+        self._set_values(iid, tuple(values))
+        return True
+
+    def remove(self, *keys):
+        self._delete([str(key) for key in keys if str(key) in self._values])
+
+    def clear(self):
+        self._delete(list(self.tree.get_children()))
+
+    def values(self, key):
+        return self._values.get(str(key))
+
+    def _set_values(self, iid, values):
+        if self._values.get(iid) != values:
+            self.tree.item(iid, values=values)
+            self._values[iid] = values
+
+    def _delete(self, iids):
+        if iids:
+            self.tree.delete(*iids)
+            for iid in iids:
+                self._values.pop(iid, None)
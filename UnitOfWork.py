@@ -0,0 +1,51 @@
+class UnitOfWork:
+    """Groups the writes made on one connection into a single transaction.
+
+    The outermost `with` opens the transaction and commits it on exit; nested ones
+    become savepoints, so an inner failure only rolls back its own writes.
+    after_commit(key, callback) queues a callback to run once the outermost
+    transaction commits; callbacks with the same key run only once.
+    Code sharing a connection should share its instance: see DataAccess.unit_of_work.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._depth = 0
+        self._callbacks = {}
+
+    @property
+    def active(self):
+        return self._depth > 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            if not self.conn.in_transaction:
+                self.conn.execute('BEGIN IMMEDIATE')
+        else:
+            self.conn.execute(f'SAVEPOINT uow_{self._depth}')
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        if self._depth:
+            name = f'uow_{self._depth}'
+            if exc_type is not None:
+                self.conn.execute(f'ROLLBACK TO {name}')
+            self.conn.execute(f'RELEASE {name}')
+            return False
+        callbacks, self._callbacks = self._callbacks, {}
+        if exc_type is not None:
+            self.conn.rollback()
+            return False
+        self.conn.commit()
+        for callback in callbacks.values():
+            callback()
+        return False
+
+    def after_commit(self, key, callback):
+        if self._depth:
+            self._callbacks[key] = callback
+        else:
+            callback()
+
@@ -0,0 +1,120 @@
+from TreeSync import TreeSync
+
+
+class VirtualTreeview:
+    """Shows a sliding window of a keyset-paginated result set in a Treeview.
+
+    fetch_page(after=key, before=key, limit=n) returns rows in display order and key_of(row)
+    the pagination key of a row. row[0] becomes the item id, the rest its values.
+    At most max_pages pages are held; scrolling near an edge loads the next page
+    and drops one from the opposite end, so memory stays flat whatever the table size.
+    """
+
+    def __init__(self, tree, scrollbar, fetch_page, key_of, page_size=100, max_pages=3, edge=0.1):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.key_of = key_of
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+        self.edge = edge
+        self.sync = TreeSync(tree)
+        self._keys = {}
+        self._at_start = True
+        self._at_end = True
+        self._loading = False
+        tree.configure(yscrollcommand=self._on_view_changed)
+        scrollbar.configure(command=tree.yview)
+
+    def reload(self):
+        """Go back to the first page."""
+        rows = self.fetch_page(limit=self.page_size)
+        self._show(rows)
+        self._at_start = True
+        self._at_end = len(rows) < self.page_size
+        self.tree.yview_moveto(0)
+
+    def refresh(self):
+        """Re-read the rows of the current window and apply only the differences."""
+        children = self.tree.get_children()
+        limit = max(len(children), self.page_size)
+        previous = []
+        if children and not self._at_start:
+            previous = self.fetch_page(before=self._keys[children[0]], limit=1)
+        if previous:
+            rows = self.fetch_page(after=self.key_of(previous[0]), limit=limit)
+        else:
+            rows = self.fetch_page(limit=limit)
+            self._at_start = True
+        self._at_end = len(rows) < limit
+        self._show(rows)
+
+    def show_rows(self, rows):
+        """Show a fixed list of rows (e.g. search results) with no paging; reload() goes back."""
+        self._show(rows)
+        self._at_start = self._at_end = True
+        self.tree.yview_moveto(0)
+
+    def patch(self, key, changes):
+        """Push new column values of one row straight into the view."""
+        return self.sync.patch(key, changes)
+
+    def _show(self, rows):
+        self._keys = {str(row[0]): self.key_of(row) for row in rows}
+        self.sync.sync(rows)
+
+    def _insert(self, rows, index):
+        for row in rows:
+            self.sync.upsert(row, index)
+            self._keys[str(row[0])] = self.key_of(row)
+            if index != 'end':
+                index += 1
+
+    def _drop(self, iids):
+        self.sync.remove(*iids)
+        for iid in iids:
+            del self._keys[iid]
+
+    def _on_view_changed(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._loading:
+            return
+        if float(last) >= 1 - self.edge and not self._at_end:
+            self._loading = True
+            self.tree.after_idle(self._load_next)
+        elif float(first) <= self.edge and not self._at_start:
+            self._loading = True
+            self.tree.after_idle(self._load_previous)
+
+    def _load_next(self):
+        try:
+            children = self.tree.get_children()
+            if not children:
+                return
+            rows = self.fetch_page(after=self._keys[children[-1]], limit=self.page_size)
+            self._at_end = len(rows) < self.page_size
+            self._insert(rows, 'end')
+            excess = len(children) + len(rows) - self.max_rows
+            if excess > 0:
+                self._drop(children[:excess])
+                self._at_start = False
+                # Rows vanished above the viewport: scroll back so the content does not jump
+                self.tree.yview_scroll(-excess, 'units')
+        finally:
+            self._loading = False
+
+    def _load_previous(self):
+        try:
+            children = self.tree.get_children()
+            if not children:
+                return
+            rows = self.fetch_page(before=self._keys[children[0]], limit=self.page_size)
+            self._at_start = len(rows) < self.page_size
+            self._insert(rows, 0)
+            excess = len(children) + len(rows) - self.max_rows
+            if excess > 0:
+                self._drop(children[-excess:])
+                self._at_end = False
+            self.tree.yview_scroll(len(rows), 'units')
+        finally:
+            self._loading = False
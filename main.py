@@ -1,22 +1,53 @@
+import sys
+import time
+
+# python main.py --profile-startup: print where the time to the first login paint goes, then exit
+PROFILE = '--profile-startup' in sys.argv
+_started = time.perf_counter()
+_stages = []
+
+
+def mark(stage):
+    if PROFILE:
+        _stages.append((stage, time.perf_counter(), len(sys.modules)))
+
+
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-import pyglet
-
-pyglet.font.add_file('Orbitron-Medium.ttf')
+mark("import tkinter, ttkbootstrap")
 
+from Fonts import load_font
 from Database import create_database
 from Login import LoginWindow
-from CosmicApp import CosmicApp
+from DataAccess import close_all
+mark("import login modules")
+
+
+def print_startup_profile():
+    print(f"{'stage':<34}{'ms':>9}{'total ms':>10}{'modules':>9}")
+    previous, modules = _started, 0
+    for stage, at, loaded in _stages:
+        print(f"{stage:<34}{(at - previous) * 1000:>9.1f}{(at - _started) * 1000:>10.1f}{loaded - modules:>+9}")
+        previous, modules = at, loaded
+    heavy = [name for name in ('PIL', 'pyglet', 'numpy', 'pyarrow', 'CosmicApp') if name in sys.modules]
+    print(f"Loaded before the login was shown: {', '.join(heavy) or 'none of PIL, pyglet, numpy, pyarrow, CosmicApp'}")
+
 
 def launch_main_app(root, user_role, mechanic_name=None):
+    # The main window's modules are only needed once someone has logged in
+    from CosmicApp import CosmicApp
     root.deiconify()
     CosmicApp(root, user_role=user_role, mechanic_name=mechanic_name)
 
 def main():
+    load_font()
+    mark("register Orbitron font")
     create_database()
+    mark("migrate database")
     root = ttk.Window(themename="cyborg")
     root.withdraw()
+    mark("create root, build theme")
 
     # Show login as a Toplevel
     login_win = tk.Toplevel(root)
@@ -27,8 +58,18 @@ def main():
             launch_main_app(root, user_role, mechanic_name)
         )
     )
+    mark("build login window")
+
+    if PROFILE:
+        login_win.update()
+        mark("first login paint")
+        print_startup_profile()
+        root.destroy()
+        close_all()
+        return
 
     root.mainloop()
+    close_all()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
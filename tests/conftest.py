@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+import pytest
+
+# The modules live at the top of the repository, next to main.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import DataAccess  # noqa: E402
+from Database import create_database  # noqa: E402
+
+
+class FakeRoot:
+    """Stands in for the Tk root: after() callbacks only run when the test pumps them."""
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def pump(self, until, timeout=10):
+        """Run due callbacks until until() is true, as the Tk main loop would."""
+        deadline = time.monotonic() + timeout
+        while not until():
+            if time.monotonic() > deadline:
+                raise TimeoutError("callbacks never finished")
+            pending, self.pending = self.pending, []
+            for callback in pending:
+                callback()
+            time.sleep(0.005)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A migrated scratch database that get_connection() (and so DbWorker) uses."""
+    path = str(tmp_path / 'garage.db')
+    create_database(path)
+    previous = DataAccess.DB_PATH
+    DataAccess.configure(path)
+    yield path
+    DataAccess.configure(previous)
@@ -0,0 +1,42 @@
+from Auth import authenticate, is_hashed
+from DataAccess import connect
+from DbWorker import DbWorker
+
+from conftest import FakeRoot
+
+
+def test_plaintext_login_through_db_worker(db_path):
+    conn = connect(db_path)
+    conn.execute("INSERT INTO users (username, password, role, full_name) VALUES ('ivan', 'secret', 'mechanic', 'Ivan')")
+    conn.commit()
+
+    def check(conn):
+        # What Login.authenticate submits
+        user = authenticate(conn, 'ivan', 'secret', 'mechanic')
+        if user:
+            conn.execute("INSERT INTO login_logs (username, role, login_time) VALUES (?, ?, datetime('now'))",
+                         ('ivan', 'Mechanic'))
+        return user
+
+    root = FakeRoot()
+    worker = DbWorker(root)
+    outcome = {}
+    worker.submit(check, on_done=lambda user: outcome.update(user=user),
+                  on_error=lambda e: outcome.update(error=e))
+    root.pump(lambda: outcome)
+    worker.close()
+
+    assert 'error' not in outcome, outcome.get('error')
+    assert outcome['user'][1] == 'ivan'
+    assert is_hashed(conn.execute("SELECT password FROM users WHERE username='ivan'").fetchone()[0])
+    assert conn.execute("SELECT COUNT(*) FROM login_logs WHERE username='ivan'").fetchone()[0] == 1
+    conn.close()
+
+
+def test_rehash_commits_without_a_transaction(db_path):
+    conn = connect(db_path)
+    conn.execute("INSERT INTO users (username, password, role, full_name) VALUES ('ivan', 'secret', 'mechanic', 'Ivan')")
+    conn.commit()
+    assert authenticate(conn, 'ivan', 'secret', 'mechanic')
+    assert not conn.in_transaction
+    conn.close()
@@ -0,0 +1,55 @@
+import os
+
+from BackgroundJob import BackgroundJob
+from Export import ExportCancelled, ExportJob
+
+from conftest import FakeRoot
+
+
+class FakeWidget(FakeRoot):
+    exists = True
+
+    def winfo_exists(self):
+        return self.exists
+
+
+class Countdown(BackgroundJob):
+    def run(self):
+        for done in range(1, 4):
+            self.progress(done, 3)
+        if self.cancelled():
+            raise ExportCancelled()
+        return 'done'
+
+
+def test_watch_reports_progress_then_finishes_once():
+    widget, seen, finished = FakeWidget(), [], []
+    Countdown().start().watch(widget, lambda job: seen.append(job.done), finished.append)
+    widget.pump(lambda: finished)
+    assert seen[-1] == 3
+    assert [(job.result, job.error) for job in finished] == [('done', None)]
+
+
+def test_errors_and_cancellation_are_kept_on_the_job():
+    job = Countdown()
+    job.cancel()
+    widget, finished = FakeWidget(), []
+    job.start().watch(widget, on_finished=finished.append)
+    widget.pump(lambda: finished)
+    assert isinstance(job.error, ExportCancelled) and job.result is None
+
+
+def test_watch_stops_when_the_dialog_is_closed():
+    widget = FakeWidget()
+    widget.exists = False
+    Countdown().start().watch(widget, on_finished=lambda job: 1 / 0)
+    assert widget.pending == []
+
+
+def test_export_job_result_is_the_row_count(db_path, tmp_path):
+    path = str(tmp_path / 'repairs.csv')
+    widget, finished = FakeWidget(), []
+    ExportJob(path).start().watch(widget, on_finished=finished.append)
+    widget.pump(lambda: finished)
+    assert finished[0].error is None and finished[0].result == 0
+    assert os.path.exists(path)
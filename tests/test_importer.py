@@ -0,0 +1,29 @@
+from DataAccess import connect
+from Importer import ImportJob, import_customers
+
+from conftest import FakeRoot
+
+
+def test_plate_style_vins_are_accepted(db_path, tmp_path):
+    path = tmp_path / 'customers.csv'
+    path.write_text("name,car_model,vin\n"
+                    "Ivan,Golf,PB 8492 HF\n"
+                    "Maria,Corsa,PB-2345-PG\n"
+                    "Georgi,Astra,x;drop\n", encoding='utf-8')
+    conn = connect(db_path)
+    result = import_customers(conn, str(path))
+    assert (result.imported, result.rejected) == (2, 1)
+    assert {vin for (vin,) in conn.execute('SELECT vin FROM customers')} == {'PB 8492 HF', 'PB-2345-PG'}
+    conn.close()
+
+
+def test_import_job_reports_bytes_and_result(db_path, tmp_path):
+    path = tmp_path / 'customers.csv'
+    path.write_text("name,car_model,vin\nIvan,Golf,PB 8492 HF\n", encoding='utf-8')
+    widget, finished = FakeRoot(), []
+    widget.winfo_exists = lambda: True
+    ImportJob(str(path)).start().watch(widget, on_finished=finished.append)
+    widget.pump(lambda: finished)
+    job = finished[0]
+    assert job.error is None and job.result.imported == 1
+    assert job.done == job.total == path.stat().st_size
@@ -0,0 +1,37 @@
+import pytest
+
+from DataAccess import connect, MONTH_SCHEDULES_SQL, MONTH_REPAIRS_SQL, LOGIN_LOG_COLUMNS
+from Database import create_database
+from Export import repairs_export_query
+from Timestamps import month_bounds
+
+MONTH = month_bounds(2025, 1)
+
+# name -> (sql, params, index it must search)
+HOT_QUERIES = {
+    'calendar schedules': (MONTH_SCHEDULES_SQL, ('x',) + MONTH, 'idx_schedules_mechanic_start'),
+    'calendar repairs': (MONTH_REPAIRS_SQL, ('x',) + MONTH, 'idx_repairs_mechanic_start'),
+    # Any non-empty name; an empty one means every mechanic and drops the predicate
+    'mechanic report': repairs_export_query(*MONTH, mechanic='x') + ('idx_repairs_mechanic_start',),
+    'repairs export': repairs_export_query(*MONTH) + ('idx_repairs_start',),
+    'login logs page': (f"SELECT {LOGIN_LOG_COLUMNS} FROM login_logs WHERE (login_time, id) < (?, ?) "
+                        "ORDER BY login_time DESC, id DESC LIMIT 100", ('2025-01-01 00:00:00', 0),
+                        'idx_login_logs_time'),
+}
+
+
+@pytest.fixture(scope='module')
+def conn(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('db') / 'garage.db')
+    create_database(path)
+    conn = connect(path)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_index(conn, name):
+    sql, params, index = HOT_QUERIES[name]
+    details = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    assert any(f"USING INDEX {index} " in d or f"USING COVERING INDEX {index} " in d for d in details), details
+    assert not any(d.startswith('SCAN') for d in details), details
@@ -0,0 +1,43 @@
+import sqlite3
+
+from Database import create_database
+from DataAccess import connect
+from RepairParts import attach_parts, detach_part
+from StockLedger import stale_parts, supplier_valuation
+
+
+def test_parts_without_a_price_are_valued_at_zero(tmp_path):
+    # Databases from before the migrations have no NOT NULL on price, and rows without one
+    path = str(tmp_path / 'legacy.db')
+    legacy = sqlite3.connect(path)
+    legacy.execute('''CREATE TABLE inventory (id INTEGER PRIMARY KEY, part_name TEXT, quantity INTEGER,
+                                              last_ordered TEXT, price REAL, supplier TEXT)''')
+    legacy.execute("INSERT INTO inventory (id, part_name, quantity, price) VALUES (3, 'Oil Filter', 35, NULL)")
+    legacy.commit()
+    legacy.close()
+    create_database(path)
+
+    conn = connect(path)
+    assert [row[4] for row in stale_parts(conn)] == [0.0]
+    assert supplier_valuation(conn) == [('', 1, 35, 0.0)]
+    assert conn.execute("SELECT unit_price FROM stock_movements WHERE kind='opening'").fetchall() == [(0.0,)]
+    conn.close()
+
+
+def test_returned_parts_cancel_their_take_after_a_price_change(db_path):
+    conn = connect(db_path)
+    conn.execute("INSERT INTO inventory (part_name, quantity, price, supplier) VALUES ('Brake Disc', 10, 5.0, 'Acme')")
+    part_id = conn.execute("SELECT id FROM inventory WHERE part_name='Brake Disc'").fetchone()[0]
+    conn.execute("INSERT INTO repairs (vehicle, customer_name, car_model, vin, status) "
+                 "VALUES ('PB 1975 JK', 'Ivan', 'Golf', 'PB 1975 JK', 'Pending')")
+    repair_id = conn.execute('SELECT max(id) FROM repairs').fetchone()[0]
+    conn.commit()
+
+    attach_parts(conn, repair_id, [(part_id, 5)])
+    conn.execute('UPDATE inventory SET price = 5.5 WHERE id = ?', (part_id,))
+    detach_part(conn, repair_id, part_id)
+    conn.commit()
+
+    values = dict(conn.execute("SELECT kind, value FROM stock_movement_monthly WHERE kind IN ('used', 'returned')"))
+    assert values == {'used': -25.0, 'returned': 25.0}
+    conn.close()
@@ -0,0 +1,124 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import DataAccess
+import DbWorker as DbWorkerModule
+from DataAccess import connect, unit_of_work
+from DbWorker import DbWorker
+
+from conftest import FakeRoot
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = connect(db_path)
+    conn.execute('CREATE TABLE notes (text TEXT)')
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def notes(conn):
+    return sorted(text for (text,) in conn.execute('SELECT text FROM notes'))
+
+
+def test_nested_units_are_one_transaction_and_a_failure_undoes_only_itself(conn):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    unit = unit_of_work(conn)
+    with unit:
+        conn.execute("INSERT INTO notes VALUES ('kept')")
+        with pytest.raises(ValueError):
+            with unit:
+                conn.execute("INSERT INTO notes VALUES ('undone')")
+                raise ValueError()
+        with unit:
+            conn.execute("INSERT INTO notes VALUES ('also kept')")
+    assert notes(conn) == ['also kept', 'kept']
+    assert statements.count('COMMIT') == 1
+
+
+def test_after_commit_callbacks_run_once_per_key_after_the_commit(conn):
+    unit, calls = unit_of_work(conn), []
+    with unit:
+        conn.execute("INSERT INTO notes VALUES ('a')")
+        unit.after_commit('redraw', lambda: calls.append(conn.in_transaction))
+        unit.after_commit('redraw', lambda: calls.append(conn.in_transaction))
+        assert calls == []
+    assert calls == [False]
+
+
+@pytest.fixture
+def worker(conn, monkeypatch):
+    """A DbWorker pumped by the test, and the statements its connection ran."""
+    statements = []
+
+    def traced_connection():
+        worker_conn = DataAccess.connect()
+        worker_conn.set_trace_callback(statements.append)
+        return worker_conn
+
+    monkeypatch.setattr(DbWorkerModule, 'get_connection', traced_connection)
+    root = FakeRoot()
+    worker = DbWorker(root)
+    yield SimpleNamespace(db=worker, root=root, statements=statements)
+    worker.close()
+
+
+def run_group(worker, jobs):
+    """Submit jobs while the worker is held busy, so they run as one group; wait for all of them."""
+    release, outcomes = threading.Event(), {}
+    worker.db.submit(lambda conn: release.wait(5))
+    worker.root.pump(lambda: any(s.startswith('BEGIN') for s in worker.statements))
+    commits = worker.statements.count('COMMIT')
+    for name, job in jobs:
+        worker.db.submit(job, on_done=lambda result, name=name: outcomes.update({name: result}),
+                         on_error=lambda error, name=name: outcomes.update({name: error}))
+    release.set()
+    worker.root.pump(lambda: len(outcomes) == len(jobs))
+    return outcomes, worker.statements.count('COMMIT') - commits
+
+
+def insert(text, fail=False):
+    def job(conn):
+        conn.execute('INSERT INTO notes VALUES (?)', (text,))
+        if fail:
+            raise ValueError(text)
+        return text
+    return job
+
+
+def test_a_failed_job_undoes_only_its_own_writes_and_the_group_commits_once(worker, conn):
+    outcomes, commits = run_group(worker, [('a', insert('a')), ('b', insert('b', fail=True)), ('c', insert('c'))])
+    assert outcomes['a'] == 'a' and outcomes['c'] == 'c'
+    assert isinstance(outcomes['b'], ValueError)
+    assert notes(conn) == ['a', 'c']
+    # The held first job's group, then this group
+    assert commits == 2
+
+
+def test_a_job_that_commits_itself_is_reported_as_failed(worker, conn):
+    def commits(conn):
+        conn.execute("INSERT INTO notes VALUES ('committed')")
+        conn.commit()
+
+    outcomes, _ = run_group(worker, [('bad', commits)])
+    assert 'no such savepoint' in str(outcomes['bad'])
+
+
+def test_redraws_requested_in_one_poll_run_once(worker):
+    redraws = []
+    for _ in range(3):
+        worker.db.after_commit('calendar', lambda: redraws.append('calendar'))
+    worker.root.pump(lambda: redraws)
+    assert redraws == ['calendar']
+
+
+def test_a_closed_worker_stops_polling_after_its_last_result(worker):
+    results = []
+    worker.db.submit(lambda conn: 'last', on_done=results.append)
+    worker.db.close()
+    worker.root.pump(lambda: results and not worker.root.pending)
+    assert results == ['last']